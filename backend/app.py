@@ -13,6 +13,8 @@ from routes.RegexBuilder_route import regex_bp
 from routes.UnitConverter_route import uc_bp
 from routes.UserFeedback_routes import feedback_bp
 from routes.SqlConverter_route import sql_bp
+from routes.LLM_route import llm_bp
+from routes.TextFormatter_route import tf_bp
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
@@ -33,6 +35,8 @@ app.register_blueprint(regex_bp)
 app.register_blueprint(uc_bp)
 app.register_blueprint(feedback_bp)
 app.register_blueprint(sql_bp)
+app.register_blueprint(llm_bp)
+app.register_blueprint(tf_bp)
 
 @app.route('/api', methods=['GET'])
 def api():
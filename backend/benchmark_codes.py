@@ -0,0 +1,86 @@
+"""
+Benchmark QR code and barcode rendering, PNG against SVG, per code.
+
+Every symbology is rendered for --count distinct payloads in each output format
+with the render cache off; the report lists milliseconds per code and average
+output size. --baseline adds the library writers qrnbarcodegen used before
+(qrcode's PIL and SVG image factories, python-barcode's SVG writer) for
+comparison with the direct matrix and path writers.
+
+    python benchmark_codes.py
+    python benchmark_codes.py --count 2000 --symbologies qr ean13 --baseline
+"""
+import argparse
+import io
+import time
+
+import qrcode
+from qrcode.image.svg import SvgImage
+from barcode import Code128
+
+import qrnbarcodegen
+
+# Payloads each symbology accepts, numbered so every code is distinct.
+PAYLOADS = {
+    'qr': lambda i: f"https://example.com/products/{i:08d}?ref=catalog",
+    'datamatrix': lambda i: f"SKU-{i:08d}",
+    'code128': lambda i: f"SKU-{i:08d}",
+    'code39': lambda i: f"SKU-{i:08d}",
+    'ean13': lambda i: f"590{i:09d}",
+    'upca': lambda i: f"036{i:08d}",
+}
+
+
+def _legacy_qr(text, output_format):
+    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4,
+                       image_factory=SvgImage if output_format == 'svg' else None)
+    qr.add_data(text)
+    qr.make(fit=True)
+    buffer = io.BytesIO()
+    qr.make_image().save(buffer)
+    return buffer.getvalue()
+
+
+def _legacy_code128_svg(text):
+    buffer = io.BytesIO()
+    Code128(text).write(buffer)
+    return buffer.getvalue()
+
+
+BASELINES = {
+    ('qr', 'png'): lambda text: _legacy_qr(text, 'png'),
+    ('qr', 'svg'): lambda text: _legacy_qr(text, 'svg'),
+    ('code128', 'svg'): _legacy_code128_svg,
+}
+
+
+def bench(render, payloads):
+    """Milliseconds per code and average bytes for rendering every payload once."""
+    start = time.perf_counter()
+    total_bytes = sum(len(render(text)) for text in payloads)
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / len(payloads), total_bytes / len(payloads)
+
+
+def main():
+    available = [s for s in qrnbarcodegen.SYMBOLOGIES if s != 'datamatrix' or qrnbarcodegen.dmtx_encode]
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=500, help='distinct payloads rendered per symbology and format')
+    parser.add_argument('--symbologies', nargs='+', choices=qrnbarcodegen.SYMBOLOGIES, default=available)
+    parser.add_argument('--baseline', action='store_true', help='also time the previous library writers')
+    args = parser.parse_args()
+
+    print(f"{'symbology':<12}{'format':<8}{'writer':<10}{'ms/code':>10}{'codes/s':>10}{'avg bytes':>11}")
+    for symbology in args.symbologies:
+        payloads = [PAYLOADS[symbology](i) for i in range(args.count)]
+        for output_format in qrnbarcodegen.OUTPUT_FORMATS:
+            runs = [('direct', lambda text: qrnbarcodegen.render_code(text, symbology, output_format, cache=False))]
+            if args.baseline and (symbology, output_format) in BASELINES:
+                runs.append(('library', BASELINES[(symbology, output_format)]))
+            for writer, render in runs:
+                ms, size = bench(render, payloads)
+                print(f"{symbology:<12}{output_format:<8}{writer:<10}{ms:>10.3f}{1000 / ms:>10.0f}{size:>11.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark the LLM-backed endpoints at a fixed concurrency without network access.
+
+By default the Flask app is driven in-process with the stub provider from llmstub.py,
+so caching, queueing (LLM_MAX_CONCURRENCY) and timeout behaviour can be measured
+offline. Pass --base-url to drive a running server instead.
+
+    python benchmark_llm.py --requests 200 --concurrency 16 --latency-ms 300
+    python benchmark_llm.py --unique --timeout 0.2 --scenarios format sql-convert
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import percentile
+
+SAMPLE_PYTHON = "def add(a,b):\n  return a+b\n"
+
+SCENARIOS = {
+    'format': ('/api/format', lambda i: {'code': SAMPLE_PYTHON + f"# {i}\n", 'language': 'python'}),
+    'validate': ('/api/validate', lambda i: {'code': SAMPLE_PYTHON + f"# {i}\n", 'language': 'python', 'analyze': True}),
+    'regex-builder': ('/api/regex-builder/generate', lambda i: {'blocks': [{'type': 'fixed', 'value': f"id-{i}"}, {'type': 'variable', 'characterSet': 'digits', 'length': {'exact': 4}}]}),
+    # The SQL routes answer these payloads locally by default; engine=llm makes them call the model.
+    'sql-convert': ('/api/sql-convert', lambda i: {'source_sql': f"SELECT * FROM `users` LIMIT {i + 1};", 'target_dialect': 'PostgreSQL', 'engine': 'llm'}),
+    'sql-generate-mock': ('/api/sql-generate-mock', lambda i: {'table_schema': f"CREATE TABLE t{i} (id INT PRIMARY KEY, name VARCHAR(20));", 'num_records': 5, 'engine': 'llm'}),
+    'sql-to-schema': ('/api/sql-to-schema', lambda i: {'create_table_sql': f"CREATE TABLE t{i} (id INT PRIMARY KEY);", 'engine': 'llm'}),
+}
+
+
+def make_sender(base_url):
+    if base_url:
+        import requests
+        http = requests.Session()
+
+        def send(path, payload):
+            response = http.post(base_url.rstrip('/') + path, json=payload)
+            return response.status_code
+        return send
+
+    from app import app
+    client = app.test_client()
+
+    def send(path, payload):
+        return client.post(path, json=payload).status_code
+    return send
+
+
+def run_scenario(send, name, total, concurrency, unique):
+    path, build_payload = SCENARIOS[name]
+
+    def one(i):
+        payload = build_payload(i if unique else 0)
+        start = time.perf_counter()
+        try:
+            status = send(path, payload)
+        except Exception:
+            status = 'error'
+        return status, (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one, range(total)))
+    wall = time.perf_counter() - start
+
+    # Percentiles describe successful calls only; failures are counted in status_counts.
+    latencies = sorted(ms for status, ms in outcomes if isinstance(status, int) and status < 400)
+    statuses = {}
+    for status, _ in outcomes:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def rounded(ms):
+        return None if ms is None else round(ms, 2)
+
+    return {
+        'scenario': name,
+        'requests': total,
+        'concurrency': concurrency,
+        'status_counts': statuses,
+        'successful': len(latencies),
+        'p50_ms': rounded(percentile(latencies, 50)),
+        'p95_ms': rounded(percentile(latencies, 95)),
+        'p99_ms': rounded(percentile(latencies, 99)),
+        'max_ms': rounded(latencies[-1] if latencies else None),
+        'throughput_rps': round(total / wall, 2) if wall else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=100, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--unique', action='store_true', help='vary every payload so caches never hit')
+    parser.add_argument('--latency-ms', type=float, default=200, help='stub model latency')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='random extra stub latency')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of stub calls failing with 503')
+    parser.add_argument('--timeout', type=float, default=None, help='override LLM_TIMEOUT (seconds)')
+    parser.add_argument('--base-url', default=None, help='benchmark a running server instead of the in-process app')
+    args = parser.parse_args()
+
+    if not args.base_url:
+        import llmclient
+        from llmstub import StubProvider
+        llmclient.set_provider(StubProvider(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate))
+        if args.timeout:
+            llmclient.client.timeout = args.timeout
+
+    send = make_sender(args.base_url)
+    for name in args.scenarios:
+        print(json.dumps(run_scenario(send, name, args.requests, args.concurrency, args.unique)))
+
+    if not args.base_url:
+        import llmclient
+        from routes.CodeFormatters_route import gemini_cache
+        print(json.dumps({'llm_metrics': llmclient.client.metrics()}, indent=2))
+        print(json.dumps({'format_cache': gemini_cache.stats()}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark table conversions across formats on the downloads-data sample.
+
+Each source in files/ (downloads-data.csv and downloads-data.xlsx) is converted to
+every format with tabular.convert; the report lists conversion time, output size
+and how long pandas takes to load the result. The sample is tiny, so --repeat
+scales it up by repeating its rows.
+
+    python benchmark_tables.py
+    python benchmark_tables.py --repeat 20000 --runs 3 --targets parquet feather
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import tabular
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'files')
+SAMPLES = ('downloads-data.csv', 'downloads-data.xlsx')
+
+LOADERS = {
+    'csv': pd.read_csv,
+    'xlsx': pd.read_excel,
+    'parquet': pd.read_parquet,
+    'feather': pd.read_feather,
+    'ndjson': lambda source: pd.read_json(source, lines=True),
+}
+
+
+def scaled_source(path, repeat, workdir):
+    """The sample as-is, or a copy with its rows repeated `repeat` times."""
+    if repeat <= 1:
+        return path
+    fmt = tabular.format_for_filename(path)
+    with open(path, 'rb') as source:
+        schema, batches = tabular.read_batches(source, fmt)
+        table = tabular.pa.Table.from_batches(list(batches), schema=schema)
+    table = tabular.pa.concat_tables([table] * repeat)
+    scaled = os.path.join(workdir, f"scaled-{os.path.basename(path)}")
+    with open(scaled, 'wb') as destination:
+        tabular.write_batches(table.schema, table.to_batches(max_chunksize=tabular.BATCH_ROWS), destination, fmt)
+    return scaled
+
+
+def timed(func, runs):
+    best = None
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_source(path, targets, runs, workdir):
+    source_format = tabular.format_for_filename(path)
+    results = []
+    for target in targets:
+        output_path = os.path.join(workdir, f"out-{source_format}{tabular.FILE_EXTENSIONS[target]}")
+
+        def convert():
+            with open(path, 'rb') as source, open(output_path, 'wb') as destination:
+                return tabular.convert(source, source_format, destination, target)[0]
+
+        convert_seconds, rows = timed(convert, runs)
+        load_seconds, _ = timed(lambda: LOADERS[target](output_path), runs)
+        results.append({
+            'target': target,
+            'rows': rows,
+            'convert_ms': convert_seconds * 1000,
+            'size_bytes': os.path.getsize(output_path),
+            'pandas_load_ms': load_seconds * 1000,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=1, help='repeat the sample rows this many times')
+    parser.add_argument('--runs', type=int, default=3, help='best of this many runs per measurement')
+    parser.add_argument('--targets', nargs='+', choices=tabular.FORMATS, default=list(tabular.FORMATS))
+    parser.add_argument('--samples', nargs='+', default=[os.path.join(SAMPLE_DIR, name) for name in SAMPLES])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for sample in args.samples:
+            path = scaled_source(sample, args.repeat, workdir)
+            print(f"\n{os.path.basename(sample)} x{args.repeat} ({os.path.getsize(path)} bytes)")
+            print(f"{'target':<9}{'rows':>10}{'convert ms':>13}{'size bytes':>13}{'pandas load ms':>16}")
+            for result in bench_source(path, args.targets, args.runs, workdir):
+                print(f"{result['target']:<9}{result['rows']:>10}{result['convert_ms']:>13.1f}"
+                      f"{result['size_bytes']:>13}{result['pandas_load_ms']:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import ast
+import json
+import re
+import xml.dom.minidom as minidom
+from localformat import indent_string
+from localvalidate import top_level_breaks
+
+YAML_TOP_LEVEL = re.compile(r'^(?:---|[^\s#-])')
+# Text that carries on the statement before it: `} else`, `} catch`, `} while (...)`, `})\n.then(...)`.
+CONTINUATION = re.compile(r'\s*(?:(?:else|catch|finally|while)\b|[.,?)\]])')
+
+def _line_units(code, starts):
+    """Cut code into pieces that begin at the given 0-based line numbers."""
+    lines = code.splitlines(keepends=True)
+    starts = sorted(set(s for s in starts if 0 < s < len(lines)))
+    bounds = [0] + starts + [len(lines)]
+    return [''.join(lines[a:b]) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+def _python_units(code):
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return [code]
+    lines = code.splitlines()
+    starts = []
+    previous_end = 0
+    for node in tree.body:
+        start = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', [])]) - 1
+        # Keep comments and blank lines directly above a definition with it.
+        while start - 1 >= previous_end and (not lines[start - 1].strip() or lines[start - 1].lstrip().startswith('#')):
+            start -= 1
+        starts.append(start)
+        previous_end = node.end_lineno
+    return _line_units(code, starts)
+
+def _brace_units(code, language):
+    breaks = top_level_breaks(code, language)
+    if language != 'css':
+        # CSS selectors may start with '.', and CSS has no continuation keywords.
+        breaks = [index for index in breaks if not CONTINUATION.match(code, index + 1)]
+    return _line_units(code, [code.count('\n', 0, index) + 1 for index in breaks])
+
+def _yaml_units(code):
+    starts = [i for i, line in enumerate(code.splitlines()) if YAML_TOP_LEVEL.match(line)]
+    return _line_units(code, starts)
+
+def _json_plan(code):
+    try:
+        parsed = json.loads(code)
+    except ValueError:
+        return [code], None
+    if isinstance(parsed, dict):
+        units = [json.dumps(k, ensure_ascii=False) + ': ' + json.dumps(v, ensure_ascii=False) for k, v in parsed.items()]
+        open_char, close_char = '{', '}'
+    elif isinstance(parsed, list):
+        units = [json.dumps(v, ensure_ascii=False) for v in parsed]
+        open_char, close_char = '[', ']'
+    else:
+        return [code], None
+
+    def wrap(piece):
+        return open_char + piece.rstrip().rstrip(',') + close_char
+
+    def join(formatted_chunks):
+        # Each chunk comes back as its own object/array; splice their bodies together.
+        bodies = []
+        for chunk in formatted_chunks:
+            chunk = chunk.strip()
+            bodies.append(chunk[1:-1].strip('\n').rstrip().rstrip(','))
+        return open_char + '\n' + ',\n'.join(bodies) + '\n' + close_char
+
+    return [unit + ', ' for unit in units], (wrap, join)
+
+def _xml_plan(code, indent):
+    try:
+        dom = minidom.parseString(code)
+    except Exception:
+        return [code], None
+    root = dom.documentElement
+    units = [
+        child.toxml() for child in root.childNodes
+        if not (child.nodeType == child.TEXT_NODE and not child.data.strip())
+    ]
+    open_tag = re.search(r'<' + re.escape(root.tagName) + r'(?=[\s/>])[^>]*>', code)
+    close_tag = '</' + root.tagName + '>'
+    if not units or not open_tag or open_tag.group(0).endswith('/>'):
+        return [code], None
+    declaration = re.match(r'^\s*(<\?xml[^>]*\?>)', code)
+
+    def join(formatted_chunks):
+        body = '\n'.join(
+            indent + line if line.strip() else line
+            for chunk in formatted_chunks for line in chunk.strip('\n').split('\n')
+        )
+        prefix = declaration.group(1) + '\n' if declaration else ''
+        return prefix + open_tag.group(0) + '\n' + body + '\n' + close_tag
+
+    return units, (None, join)
+
+def _pack(units, max_chars):
+    """Greedily group consecutive units into chunks of at most max_chars (one oversized unit stays alone)."""
+    chunks = []
+    current = ''
+    for unit in units:
+        if current and len(current) + len(unit) > max_chars:
+            chunks.append(current)
+            current = ''
+        current += unit
+    if current:
+        chunks.append(current)
+    return chunks
+
+def split_for_formatting(code, language, max_chars, indent_type='spaces', indent_size=4):
+    """
+    Split code at top-level boundaries (functions/classes, top-level statements and
+    blocks, JSON keys or items, XML root children, YAML keys) into chunks of about
+    max_chars that can be formatted independently.
+
+    Returns (chunks, join) where join(formatted_chunks) reassembles the formatted
+    chunks in order. Languages without a splitter come back as a single chunk.
+    """
+    wrap = None
+    join = None
+    if language == 'python':
+        units = _python_units(code)
+        join = lambda chunks: '\n\n\n'.join(c.strip('\n') for c in chunks)
+    elif language in ('javascript', 'js', 'c', 'css'):
+        units = _brace_units(code, language)
+        join = lambda chunks: '\n\n'.join(c.strip('\n') for c in chunks)
+    elif language in ('yaml', 'yml'):
+        units = _yaml_units(code)
+        join = lambda chunks: '\n'.join(c.strip('\n') for c in chunks)
+    elif language == 'json':
+        units, plan = _json_plan(code)
+        if plan:
+            wrap, join = plan
+    elif language == 'xml':
+        units, plan = _xml_plan(code, indent_string(indent_type, indent_size))
+        if plan:
+            wrap, join = plan
+    else:
+        units = [code]
+
+    if join is None or len(units) < 2:
+        return [code], lambda chunks: chunks[0]
+    chunks = _pack(units, max_chars)
+    if wrap:
+        chunks = [wrap(chunk) for chunk in chunks]
+    return chunks, join
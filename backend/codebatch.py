@@ -0,0 +1,136 @@
+"""
+Batch rendering of QR codes and barcodes across a process pool.
+
+Rendering is CPU-bound Python (qrcode/python-barcode plus PNG encoding), so a
+batch is cut into chunks of BATCH_CHUNK_ITEMS payloads that are rendered in
+worker processes; results come back in input order as soon as each chunk is
+done, so the response can be streamed while later chunks are still rendering.
+The pool is started on first use and shared by all requests.
+Each worker has its own in-memory render cache; set CODE_CACHE_DIR so they
+also share rendered codes through the disk tier.
+"""
+import base64
+import functools
+import json
+import os
+import re
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from qrnbarcodegen import render_code
+from streamzip import iter_zip
+
+BATCH_WORKERS = int(os.environ.get('CODE_BATCH_WORKERS', os.cpu_count() or 1))
+BATCH_CHUNK_ITEMS = int(os.environ.get('CODE_BATCH_CHUNK_ITEMS', 64))
+BATCH_MAX_ITEMS = int(os.environ.get('CODE_BATCH_MAX_ITEMS', 50000))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+        return _pool
+
+
+def _render_chunk(items, options=None):
+    """Runs in a worker: [(text, symbology, format)] -> [(bytes or None, error or None)]."""
+    results = []
+    for text, symbology, output_format in items:
+        try:
+            results.append((render_code(text, symbology, output_format, **(options or {})), None))
+        except (ValueError, RuntimeError) as e:
+            results.append((None, str(e)))
+    return results
+
+
+def render_batch(items, workers=BATCH_WORKERS, chunk_items=BATCH_CHUNK_ITEMS, options=None):
+    """
+    Yield (index, item, data, error) for a list of (text, symbology, format)
+    items, in input order. options are render_code keyword arguments shared by
+    every item. With one worker everything is rendered in-process.
+    """
+    chunks = [items[i:i + chunk_items] for i in range(0, len(items), chunk_items)]
+    render = functools.partial(_render_chunk, options=options)
+    if workers <= 1 or len(chunks) <= 1:
+        results = map(render, chunks)
+    else:
+        results = _executor().map(render, chunks)
+    index = 0
+    for chunk, rendered in zip(chunks, results):
+        for item, (data, error) in zip(chunk, rendered):
+            yield index, item, data, error
+            index += 1
+
+
+class BatchStats:
+    """Counts and throughput of a batch as it is rendered."""
+
+    def __init__(self, total):
+        self.total = total
+        self.rendered = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    def add(self, index, error):
+        if error:
+            self.errors.append({'index': index, 'error': error})
+        else:
+            self.rendered += 1
+
+    def summary(self):
+        seconds = time.perf_counter() - self.started
+        return {
+            'total': self.total,
+            'rendered': self.rendered,
+            'failed': len(self.errors),
+            'errors': self.errors,
+            'seconds': round(seconds, 3),
+            'codes_per_second': round(self.rendered / seconds, 1) if seconds > 0 else None,
+        }
+
+
+def _member_name(index, text, output_format):
+    slug = re.sub(r'[^\w.-]+', '_', text).strip('_')[:40] or 'code'
+    return f"{index + 1:05d}-{slug}.{output_format}"
+
+
+def iter_batch_zip(items, workers=BATCH_WORKERS, options=None):
+    """
+    Yield a zip archive with one file per rendered code and a summary.json with
+    the counts, per-item errors and codes per second.
+    """
+    stats = BatchStats(len(items))
+
+    def entries():
+        for index, (text, symbology, output_format), data, error in render_batch(items, workers, options=options):
+            stats.add(index, error)
+            if data is not None:
+                yield _member_name(index, text, output_format), [data]
+        yield 'summary.json', [json.dumps(stats.summary(), indent=2)]
+
+    # PNG is already deflated; SVG compresses well.
+    compression = zipfile.ZIP_STORED if all(item[2] == 'png' for item in items) else zipfile.ZIP_DEFLATED
+    return iter_zip(entries(), compression)
+
+
+def iter_batch_ndjson(items, workers=BATCH_WORKERS, options=None):
+    """
+    Yield one JSON line per code, {"index", "text", "symbology", "format", "data"
+    (base64) or "error"}, then a final {"summary": {...}} line.
+    """
+    stats = BatchStats(len(items))
+    for index, (text, symbology, output_format), data, error in render_batch(items, workers, options=options):
+        stats.add(index, error)
+        record = {'index': index, 'text': text, 'symbology': symbology, 'format': output_format}
+        if error:
+            record['error'] = error
+        else:
+            record['data'] = base64.b64encode(data).decode('ascii')
+        yield json.dumps(record) + '\n'
+    yield json.dumps({'summary': stats.summary()}) + '\n'
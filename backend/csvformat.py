@@ -0,0 +1,261 @@
+"""
+Streaming CSV normalizer.
+
+The input is read row by row through csv.reader, after its encoding and dialect
+(delimiter, quote character, escaping) have been detected from a sample of the
+first bytes. Rows are written back out with uniform quoting and line endings, in
+batches of text, so memory does not grow with the size of the file. Duplicate
+rows are dropped using a set of 128-bit row digests capped at DEDUPE_MAX_KEYS.
+"""
+import codecs
+import csv
+import hashlib
+import io
+import itertools
+import json
+import os
+from collections import Counter
+
+SNIFF_BYTES = int(os.environ.get('CSV_SNIFF_BYTES', 64 * 1024))
+SNIFF_ROWS = 200
+# 16-byte digests in a Python set take roughly 100 bytes each, so the default is ~100MB.
+DEDUPE_MAX_KEYS = int(os.environ.get('CSV_DEDUPE_MAX_KEYS', 1000000))
+OUTPUT_BATCH_ROWS = 1000
+
+DELIMITERS = ',;\t|'
+# Tried in order; on a tie (e.g. no quoted fields at all) the first one wins.
+QUOTECHARS = '"\''
+
+QUOTING = {
+    'minimal': csv.QUOTE_MINIMAL,
+    'all': csv.QUOTE_ALL,
+    'none': csv.QUOTE_NONE,
+}
+
+LINE_ENDINGS = {'lf': '\n', 'crlf': '\r\n'}
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# csv.field_size_limit defaults to 128KB per field, too small for some exports.
+csv.field_size_limit(int(os.environ.get('CSV_FIELD_SIZE_LIMIT', 16 * 1024 * 1024)))
+
+
+def detect_encoding(sample):
+    """
+    Guess the encoding of a byte sample: a BOM if there is one, UTF-8 if the
+    sample decodes as UTF-8 (a character cut off at the end is allowed), else latin1.
+    """
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        if e.start < len(sample) - 3:
+            return 'latin1'
+    return 'utf-8'
+
+
+def sniff_dialect(text, delimiters=DELIMITERS, truncated=False):
+    """
+    Detect the delimiter, quote character and escaping from a text sample: each
+    candidate delimiter and quote character is tried with csv.reader, and the pair
+    giving the most consistent number of fields (more than one) per row wins.
+    csv.Sniffer is not used; it gives up or guesses doublequote wrongly on
+    ordinary files. Returns a csv.Dialect subclass.
+    """
+    if truncated:
+        # The last line of a cut-off sample is incomplete; leave it out.
+        text = text[:max(text.rfind('\n'), 0)] or text
+    best, best_score = (',', '"', None), None
+    for quotechar in QUOTECHARS:
+        escapechar = '\\' if '\\' + quotechar in text and quotechar * 2 not in text else None
+        for delimiter in delimiters:
+            reader = csv.reader(io.StringIO(text), delimiter=delimiter, quotechar=quotechar, escapechar=escapechar)
+            try:
+                counts = Counter(len(row) for row in itertools.islice(reader, SNIFF_ROWS) if row)
+            except csv.Error:
+                continue
+            if not counts:
+                continue
+            fields, rows = counts.most_common(1)[0]
+            if fields < 2:
+                continue
+            score = (rows / sum(counts.values()), fields)
+            if best_score is None or score > best_score:
+                best, best_score = (delimiter, quotechar, escapechar), score
+    delimiter, quotechar, escapechar = best
+    return type('SniffedDialect', (csv.excel,), {
+        'delimiter': delimiter,
+        'quotechar': quotechar,
+        'escapechar': escapechar,
+        'doublequote': escapechar is None,
+    })
+
+
+def describe_dialect(dialect, encoding):
+    return {
+        'delimiter': dialect.delimiter,
+        'quotechar': dialect.quotechar,
+        'doublequote': dialect.doublequote,
+        'escapechar': dialect.escapechar,
+        'encoding': encoding,
+    }
+
+
+class BoundedDedupe:
+    """
+    Remembers 128-bit BLAKE2 digests of rows seen so far, up to max_keys of them.
+    Once full, rows already recorded are still dropped but new rows are no longer
+    recorded, so later duplicates of them are kept; `saturated` reports that.
+    """
+
+    def __init__(self, max_keys=DEDUPE_MAX_KEYS):
+        self.max_keys = max_keys
+        self.saturated = False
+        self._seen = set()
+
+    def is_duplicate(self, row):
+        # A digest rather than hash(): distinct rows must never collide and be dropped.
+        key = hashlib.blake2b(json.dumps(row, ensure_ascii=False).encode('utf-8'), digest_size=16).digest()
+        if key in self._seen:
+            return True
+        if len(self._seen) < self.max_keys:
+            self._seen.add(key)
+        else:
+            self.saturated = True
+        return False
+
+
+def resolve_columns(header, columns):
+    """
+    Map a column selection (header names or 0-based indexes, in output order)
+    to indexes into the input rows. Raises ValueError for unknown columns.
+    """
+    positions = {name: i for i, name in reversed(list(enumerate(header)))}
+    indexes = []
+    for column in columns:
+        column = str(column).strip()
+        if column in positions:
+            indexes.append(positions[column])
+        elif column.isdigit() and int(column) < len(header):
+            indexes.append(int(column))
+        else:
+            raise ValueError(f"Unknown column: {column}")
+    return indexes
+
+
+def format_rows(rows, has_header=True, columns=None, trim=True, dedupe=False, skip_blank=True,
+                max_keys=DEDUPE_MAX_KEYS, stats=None):
+    """
+    Normalize an iterable of parsed rows: trim fields, drop blank rows, pad short
+    rows to the header width, select/reorder columns and drop duplicate rows.
+    stats, if given, is a dict updated with counts as rows go by.
+    """
+    stats = stats if stats is not None else {}
+    stats.update(rows_in=0, rows_out=0, blank_rows=0, duplicate_rows=0, dedupe_saturated=False)
+    seen = BoundedDedupe(max_keys) if dedupe else None
+    rows = iter(rows)
+    width = None
+    indexes = None
+
+    if has_header:
+        for header in rows:
+            header = [field.strip() for field in header] if trim else header
+            if skip_blank and not any(field.strip() for field in header):
+                continue
+            width = len(header)
+            if columns:
+                indexes = resolve_columns(header, columns)
+                header = [header[i] for i in indexes]
+            yield header
+            break
+    elif columns:
+        if not all(str(column).strip().isdigit() for column in columns):
+            raise ValueError("Without a header row, columns must be 0-based indexes")
+        indexes = [int(column) for column in columns]
+
+    for row in rows:
+        stats['rows_in'] += 1
+        if trim:
+            row = [field.strip() for field in row]
+            blank = not any(row)
+        else:
+            blank = not any(field.strip() for field in row)
+        if skip_blank and blank:
+            stats['blank_rows'] += 1
+            continue
+        if width is not None and len(row) < width:
+            row = row + [''] * (width - len(row))
+        if indexes is not None:
+            row = [row[i] if i < len(row) else '' for i in indexes]
+        if seen is not None and seen.is_duplicate(row):
+            stats['duplicate_rows'] += 1
+            continue
+        stats['rows_out'] += 1
+        yield row
+    if seen is not None:
+        stats['dedupe_saturated'] = seen.saturated
+
+
+def write_rows(rows, delimiter=',', quoting='minimal', line_ending='lf', batch_rows=OUTPUT_BATCH_ROWS):
+    """Yield rows as CSV text in batches of batch_rows rows."""
+    if quoting not in QUOTING:
+        raise ValueError(f"Unsupported quoting: {quoting}")
+    if line_ending not in LINE_ENDINGS:
+        raise ValueError(f"Unsupported line ending: {line_ending}")
+    buffer = io.StringIO()
+    writer = csv.writer(
+        buffer,
+        delimiter=delimiter,
+        quoting=QUOTING[quoting],
+        lineterminator=LINE_ENDINGS[line_ending],
+        escapechar='\\' if quoting == 'none' else None,
+    )
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def open_csv(source, encoding=None, delimiter=None):
+    """
+    Detect the encoding and dialect of a binary file object and return
+    (reader, dialect_info). Only the first SNIFF_BYTES are read ahead; an
+    unseekable source must support peek(), which may return a shorter sample.
+    """
+    if source.seekable():
+        sample = source.read(SNIFF_BYTES)
+        source.seek(0)
+    else:
+        sample = source.peek(SNIFF_BYTES)[:SNIFF_BYTES]
+    encoding = encoding or detect_encoding(sample)
+    dialect = sniff_dialect(sample.decode(encoding, errors='ignore'), delimiter or DELIMITERS,
+                            truncated=len(sample) >= SNIFF_BYTES)
+    if delimiter:
+        dialect = type('Dialect', (dialect,), {'delimiter': delimiter})
+    text = io.TextIOWrapper(source, encoding=encoding, errors='replace', newline='')
+    return csv.reader(text, dialect), describe_dialect(dialect, encoding)
+
+
+def format_csv(source, encoding=None, delimiter=None, output_delimiter=',', quoting='minimal',
+               line_ending='lf', has_header=True, columns=None, trim=True, dedupe=False,
+               skip_blank=True, stats=None):
+    """
+    Normalize a CSV binary file object. Returns (dialect_info, chunks) where chunks
+    yields the output text; nothing past the sniffed sample is read until it is iterated.
+    """
+    reader, info = open_csv(source, encoding, delimiter)
+    rows = format_rows(reader, has_header, columns, trim, dedupe, skip_blank, stats=stats)
+    return info, write_rows(rows, output_delimiter, quoting, line_ending)
@@ -0,0 +1,22 @@
+"""
+Content-Disposition headers for responses that are built by hand rather than
+with send_file, e.g. streamed CSV and zip downloads named after the upload.
+"""
+import unicodedata
+from urllib.parse import quote
+
+from werkzeug.http import dump_options_header
+
+
+def content_disposition(filename, disposition='attachment'):
+    """
+    The header value the way send_file builds it: filename= quoted as needed,
+    and for non-ASCII names an ASCII fallback plus filename*=UTF-8''<encoded>.
+    """
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        encoded = quote(filename, safe="!#$&+-.^_`|~")
+        return dump_options_header(disposition, {'filename': simple, 'filename*': f"UTF-8''{encoded}"})
+    return dump_options_header(disposition, {'filename': filename})
@@ -0,0 +1,311 @@
+"""
+Shared outbound HTTP client.
+
+Every outbound call goes through one connection-pooled requests.Session, so
+repeated calls to the same host reuse an open TCP/TLS connection instead of
+paying for a new handshake each time.
+
+Environment settings:
+    HTTP_POOL_HOSTS         - number of hosts to keep pools for (default 32)
+    HTTP_POOL_MAXSIZE       - keep-alive connections kept per host (default 10)
+    HTTP_POOL_IDLE_TIMEOUT  - seconds before an unused host pool is closed (default 60)
+    HTTP_CLIENT_HTTP2       - "1" to send requests over HTTP/2 by default
+                              (needs the optional 'httpx[http2]' package)
+"""
+import os
+import socket
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+POOL_HOSTS = int(os.environ.get("HTTP_POOL_HOSTS", 32))
+POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 10))
+IDLE_TIMEOUT = float(os.environ.get("HTTP_POOL_IDLE_TIMEOUT", 60))
+HTTP2_DEFAULT = os.environ.get("HTTP_CLIENT_HTTP2", "0") == "1"
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class _TimedConnectionMixin:
+    """
+    Records how long each phase of a request took on this connection:
+    DNS lookup, TCP connect, TLS handshake and time to first byte, plus the
+    total. Every phase is measured on one clock from the moment the connection
+    is checked out of the pool, so HTTP (which connects lazily inside
+    request()) and HTTPS (connected by the pool beforehand) split the time the
+    same way: ttfb_ms is always from sending the request on an open connection.
+    Phases that did not happen (e.g. on a reused connection) stay at 0.
+    """
+
+    def reset_timings(self):
+        self.timings = {"dns_ms": 0.0, "connect_ms": 0.0, "tls_ms": 0.0, "ttfb_ms": 0.0, "total_ms": 0.0}
+        self._checked_out = time.perf_counter()
+        self._connected_at = None
+
+    def _new_conn(self):
+        if not hasattr(self, "timings"):
+            self.reset_timings()
+        dns_host = self._dns_host
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror:
+            # Let urllib3 raise its usual NameResolutionError.
+            return super()._new_conn()
+        resolved = time.perf_counter()
+        self.timings["dns_ms"] = _ms(resolved - start)
+
+        error = None
+        try:
+            # Try each resolved address in turn, like urllib3's create_connection does.
+            for info in infos:
+                self._dns_host = info[4][0]
+                try:
+                    sock = super()._new_conn()
+                    break
+                except NewConnectionError as e:
+                    error = e
+            else:
+                raise error
+        finally:
+            self._dns_host = dns_host
+        self._tcp_connected = time.perf_counter()
+        self.timings["connect_ms"] = _ms(self._tcp_connected - resolved)
+        return sock
+
+    def connect(self):
+        super().connect()
+        self._connected_at = time.perf_counter()
+        if isinstance(self, HTTPSConnection):
+            self.timings["tls_ms"] = _ms(self._connected_at - self._tcp_connected)
+
+    def request(self, *args, **kwargs):
+        self._request_started = time.perf_counter()
+        return super().request(*args, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        first_byte = time.perf_counter()
+        # A connection opened during this request only starts the wait once it is up.
+        sent = max(self._request_started, self._connected_at or 0)
+        self.timings["ttfb_ms"] = _ms(first_byte - sent)
+        self.timings["total_ms"] = _ms(first_byte - getattr(self, "_checked_out", self._request_started))
+        return response
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _ReuseTrackingMixin:
+    """Marks each connection handed out by the pool as reused or freshly opened."""
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        conn.reused = conn.sock is not None
+        conn.reset_timings()
+        return conn
+
+
+class _TrackingHTTPConnectionPool(_ReuseTrackingMixin, HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TrackingHTTPSConnectionPool(_ReuseTrackingMixin, HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that keeps per-host keep-alive pools, closes pools that have
+    been idle for longer than IDLE_TIMEOUT and tags each response with
+    'connection_reused' and a 'timings' phase breakdown.
+    """
+
+    def __init__(self, pool_hosts=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE, idle_timeout=IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._last_used = {}
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+        super().__init__(pool_connections=pool_hosts, pool_maxsize=pool_maxsize)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TrackingHTTPConnectionPool,
+            "https": _TrackingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        self.evict_idle()
+        response = super().send(request, **kwargs)
+
+        conn = getattr(response.raw, "_connection", None)
+        response.connection_reused = getattr(conn, "reused", None)
+        response.timings = dict(getattr(conn, "timings", {}))
+
+        pool_key = _host_key(response.url or request.url)
+        with self._lock:
+            self._last_used[pool_key] = time.monotonic()
+        return response
+
+    def evict_idle(self, force=False):
+        """Close the pools of hosts that have not been used within idle_timeout."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_sweep < self.idle_timeout / 2:
+                return
+            self._last_sweep = now
+            idle_hosts = {
+                host for host, last_used in self._last_used.items()
+                if now - last_used > self.idle_timeout
+            }
+            for host in idle_hosts:
+                del self._last_used[host]
+
+        if not idle_hosts:
+            return
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            if (key.key_scheme, key.key_host, key.key_port) in idle_hosts:
+                # RecentlyUsedContainer closes the pool when it is removed.
+                pools.pop(key, None)
+
+
+def _host_key(url):
+    parsed = requests.utils.urlparse(url)
+    scheme = parsed.scheme.lower()
+    port = parsed.port or (443 if scheme == "https" else 80)
+    return (scheme, (parsed.hostname or "").lower(), port)
+
+
+class _RejectAllCookies(DefaultCookiePolicy):
+    # The session is shared between unrelated callers, so it must never keep cookies.
+    def set_ok(self, cookie, request):
+        return False
+
+
+def build_session(pool_maxsize=POOL_MAXSIZE):
+    """
+    A pooled session like the shared one. Load tests use their own, sized to
+    their concurrency, so every worker can keep its connection alive.
+    """
+    session = requests.Session()
+    session.cookies.set_policy(_RejectAllCookies())
+    adapter = PooledAdapter(pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+session = build_session()
+_http2_client = None
+_http2_lock = threading.Lock()
+
+
+def _get_http2_client():
+    global _http2_client
+    if httpx is None:
+        raise RuntimeError("HTTP/2 requires the 'httpx[http2]' package")
+    with _http2_lock:
+        if _http2_client is None:
+            _http2_client = httpx.Client(
+                http2=True,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=POOL_HOSTS * POOL_MAXSIZE,
+                    max_keepalive_connections=POOL_MAXSIZE,
+                    keepalive_expiry=IDLE_TIMEOUT,
+                ),
+            )
+    return _http2_client
+
+
+def _translate_httpx_error(e):
+    if isinstance(e, httpx.TimeoutException):
+        return requests.exceptions.Timeout(str(e))
+    if isinstance(e, httpx.ConnectError):
+        return requests.exceptions.ConnectionError(str(e))
+    if isinstance(e, httpx.TooManyRedirects):
+        return requests.exceptions.TooManyRedirects(str(e))
+    return requests.exceptions.RequestException(str(e))
+
+
+def _request_http2(method, url, stream=False, **kwargs):
+    client = _get_http2_client()
+    # httpx replaces the URL's query string with 'params'; requests merges them.
+    params = kwargs.pop("params", None)
+    if params:
+        url = httpx.URL(url).copy_merge_params(params)
+    try:
+        start = time.perf_counter()
+        response = client.send(client.build_request(method, url, **kwargs), stream=stream)
+    except httpx.HTTPError as e:
+        raise _translate_httpx_error(e) from e
+    # httpx does not expose per-request connection reuse or connection phases.
+    response.connection_reused = None
+    elapsed = _ms(time.perf_counter() - start)
+    response.timings = {"dns_ms": None, "connect_ms": None, "tls_ms": None, "ttfb_ms": None, "total_ms": elapsed}
+    return response
+
+
+def request(method, url, http2=None, client_session=None, **kwargs):
+    """
+    Send a request through the shared pool, or through client_session when given.
+    Accepts the same keyword arguments as requests.request. The returned response
+    has a 'connection_reused' attribute (True/False, or None when unknown) and a
+    'timings' dict with dns_ms, connect_ms, tls_ms, ttfb_ms and total_ms.
+    HTTP/2 transport errors are re-raised as the matching requests exceptions.
+    """
+    if http2 is None:
+        http2 = HTTP2_DEFAULT
+    if http2:
+        return _request_http2(method, url, **kwargs)
+    return (client_session or session).request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def iter_body(response, chunk_size=64 * 1024, decode=True):
+    """
+    Iterate over the body of a response sent with stream=True.
+    decode=False yields the bytes exactly as sent upstream (still gzip'd etc.).
+    """
+    if httpx is not None and isinstance(response, httpx.Response):
+        chunks = response.iter_bytes(chunk_size) if decode else response.iter_raw(chunk_size)
+        try:
+            yield from chunks
+        except httpx.HTTPError as e:
+            raise _translate_httpx_error(e) from e
+    elif decode:
+        yield from response.iter_content(chunk_size)
+    else:
+        yield from response.raw.stream(chunk_size, decode_content=False)
+
+
+def response_http_version(response):
+    """Return the protocol version of a response as a string such as 'HTTP/1.1'."""
+    if hasattr(response, "http_version"):
+        return response.http_version
+    version = getattr(response.raw, "version", None)
+    return {10: "HTTP/1.0", 11: "HTTP/1.1", 20: "HTTP/2"}.get(version)
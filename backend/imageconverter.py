@@ -3,27 +3,119 @@ import os
 import base64
 from io import BytesIO
 
-def convert_image(image_data, output_format):
+MIMETYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'BMP': 'image/bmp',
+    'TIFF': 'image/tiff',
+    'WEBP': 'image/webp',
+    'PDF': 'application/pdf',
+}
+
+# Most pixels an upload may decode to (RGB takes 3 bytes each), checked from the
+# header before any pixel data is read. JPEGs that are downscaled are checked at
+# the reduced size they are decoded at, so large photos can still be shrunk.
+MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS', 50_000_000))
+
+# Modes each format can save without alpha; anything else is flattened onto white.
+FLAT_MODES = {'JPEG': ('1', 'L', 'RGB', 'CMYK'), 'PDF': ('1', 'L', 'RGB', 'CMYK')}
+
+class ImageTooLarge(ValueError):
+    """The image would decode to more than the allowed number of pixels."""
+
+def fit_size(size, width=None, height=None):
     """
-    Convert image to the specified format and return base64 encoded string
+    The size that fits within width x height (either may be None), keeping the
+    aspect ratio. Images are never enlarged.
+    """
+    source_width, source_height = size
+    scale = min(width / source_width if width else 1, height / source_height if height else 1, 1)
+    return max(1, round(source_width * scale)), max(1, round(source_height * scale))
+
+def _flatten(img, output_format):
+    if output_format not in FLAT_MODES or img.mode in FLAT_MODES[output_format]:
+        return img
+    if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+        rgba = img.convert('RGBA')
+        background = Image.new('RGB', rgba.size, 'white')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    return img.convert('RGB')
+
+def _save_options(output_format, quality, progressive, optimize):
+    options = {}
+    if output_format in ('JPEG', 'WEBP') and quality is not None:
+        options['quality'] = quality
+    if output_format == 'JPEG' and progressive:
+        options['progressive'] = True
+    if output_format in ('JPEG', 'PNG', 'GIF') and optimize:
+        options['optimize'] = True
+    return options
+
+def convert_image_bytes(image_data, output_format, width=None, height=None, quality=None,
+                        progressive=False, optimize=False, max_pixels=MAX_PIXELS):
+    """
+    Convert image to the specified format and return the encoded bytes
     
     Args:
-        image_data: The binary image data
+        image_data: The binary image data, or a seekable binary file object
         output_format: Target format (JPEG, PNG, GIF, BMP, TIFF, WEBP, PDF)
+        width, height: Optional maximum dimensions; the image is scaled down to fit
+        quality: 1-95 for JPEG and WEBP output (Pillow's default otherwise)
+        progressive: Write a progressive JPEG
+        optimize: Extra encoder pass for smaller JPEG, PNG and GIF output
+        max_pixels: Refuse images that would decode to more pixels than this
         
     Returns:
-        Base64 encoded string of the converted image
+        The converted image as bytes
+
+    Raises ImageTooLarge (a ValueError) before decoding an image over max_pixels.
     """
+    if quality is not None and not 1 <= quality <= 95:
+        raise ValueError("quality must be between 1 and 95")
+    if (width is not None and width < 1) or (height is not None and height < 1):
+        raise ValueError("width and height must be positive")
     try:
-        with Image.open(BytesIO(image_data)) as img:
+        source = BytesIO(image_data) if isinstance(image_data, (bytes, bytearray, memoryview)) else image_data
+        # Only the header is read here; pixels are decoded on load().
+        with Image.open(source) as img:
+            target = fit_size(img.size, width, height)
+            if target != img.size and img.format == 'JPEG':
+                # Let libjpeg decode at 1/2, 1/4 or 1/8 scale, no smaller than target.
+                img.draft(img.mode, target)
+            if img.width * img.height > max_pixels:
+                raise ImageTooLarge(
+                    f"Image is {img.width}x{img.height} pixels, the limit is {max_pixels} pixels")
+            img.load()
+            converted = img
+            if target != img.size:
+                converted = img.resize(target, Image.LANCZOS, reducing_gap=2.0)
+            converted = _flatten(converted, output_format)
             output_buffer = BytesIO()
-            img.save(output_buffer, format=output_format)
-            output_buffer.seek(0)
-            encoded_image = base64.b64encode(output_buffer.getvalue()).decode('utf-8')
-            return encoded_image
+            converted.save(output_buffer, format=output_format,
+                           **_save_options(output_format, quality, progressive, optimize))
+            return output_buffer.getvalue()
+    except ImageTooLarge:
+        raise
+    except Image.DecompressionBombError as e:
+        raise ImageTooLarge(str(e))
     except Exception as e:
         raise ValueError(f"Error converting image: {str(e)}")
 
+def convert_image(image_data, output_format):
+    """
+    Convert image to the specified format and return base64 encoded string
+    
+    Args:
+        image_data: The binary image data, or a seekable binary file object
+        output_format: Target format (JPEG, PNG, GIF, BMP, TIFF, WEBP, PDF)
+        
+    Returns:
+        Base64 encoded string of the converted image
+    """
+    return base64.b64encode(convert_image_bytes(image_data, output_format)).decode('utf-8')
+
 # Original script functionality kept for backward compatibility
 if __name__ == "__main__":
     input_file="./images/sunflower.jpg"
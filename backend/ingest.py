@@ -0,0 +1,163 @@
+"""
+Upload ingestion shared by the file-handling routes.
+
+Content-Length is only used to turn obviously oversized requests away early; the
+real limit is enforced while the body is read, through the per-request
+max_content_length that Werkzeug checks as it parses (this also covers chunked
+uploads, which have no Content-Length at all). Uploads are handed to converters
+as seekable files, spooled to disk past UPLOAD_SPOOL_MEMORY_BYTES, or as a
+memory map, never as one bytes copy of the whole body.
+"""
+import mmap
+import os
+import tempfile
+
+from flask import request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', 64 * 1024 * 1024))
+UPLOAD_SPOOL_MEMORY_BYTES = int(os.environ.get('UPLOAD_SPOOL_MEMORY_BYTES', 1024 * 1024))
+# Room for multipart boundaries and the other form fields on top of the file itself.
+FORM_OVERHEAD_BYTES = 64 * 1024
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _too_large(max_bytes):
+    return UploadError(f"File too large, max size is {max_bytes // (1024 * 1024)}MB", 413)
+
+
+class Upload:
+    """A received upload: its name, content type and a seekable file positioned at 0."""
+
+    def __init__(self, filename, content_type, file, size):
+        self.filename = filename
+        self.content_type = content_type
+        self.file = file
+        self.size = size
+        self._map = None
+
+    def buffer(self):
+        """
+        The contents without copying: a memory map once the upload is on disk,
+        otherwise a view of the in-memory buffer.
+        """
+        if self._map is None:
+            spooled = getattr(self.file, '_file', self.file)
+            if hasattr(spooled, 'getbuffer'):
+                self._map = spooled.getbuffer()
+            elif self.size:
+                self._map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._map = memoryview(b'')
+        return self._map
+
+    def close(self):
+        try:
+            if isinstance(self._map, memoryview):
+                self._map.release()
+            elif self._map is not None:
+                self._map.close()
+        except BufferError:
+            # An array still refers to the buffer; it is freed with that array.
+            pass
+        self._map = None
+        try:
+            self.file.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def limit_request(max_bytes, overhead=FORM_OVERHEAD_BYTES):
+    """
+    Cap how much of this request's body will be read. Must be called before
+    request.files, request.form, request.get_json() or request.stream is used.
+    """
+    limit = max_bytes + overhead
+    if request.content_length is not None and request.content_length > limit:
+        raise _too_large(max_bytes)
+    request.max_content_length = limit
+
+
+def spool(stream, max_bytes):
+    """Copy a stream into a SpooledTemporaryFile, failing as soon as it passes max_bytes."""
+    output = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY_BYTES)
+    total = 0
+    try:
+        while True:
+            chunk = stream.read(COPY_CHUNK_BYTES)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > max_bytes:
+                raise _too_large(max_bytes)
+            output.write(chunk)
+    except RequestEntityTooLarge:
+        output.close()
+        raise _too_large(max_bytes)
+    except UploadError:
+        output.close()
+        raise
+    output.seek(0)
+    return output, total
+
+
+def file_field(field='file', max_bytes=UPLOAD_MAX_BYTES, missing_message='No file part',
+               empty_message='No selected file'):
+    """
+    The werkzeug FileStorage for a multipart field, read under max_bytes.
+    Raises UploadError when it is missing, unnamed or too large.
+    """
+    limit_request(max_bytes)
+    try:
+        files = request.files
+    except RequestEntityTooLarge:
+        raise _too_large(max_bytes)
+    if field not in files:
+        raise UploadError(missing_message)
+    storage = files[field]
+    if storage.filename == '':
+        raise UploadError(empty_message)
+    return storage
+
+
+def receive(storage, max_bytes=UPLOAD_MAX_BYTES, detach=False):
+    """
+    Turn a FileStorage from file_field into an Upload. Werkzeug has already
+    spooled the part to a seekable file, which is used as it is; with detach=True
+    it is copied to a file of our own, which stays open after the request ends
+    (Werkzeug closes its files then), for responses streamed from the upload.
+    """
+    stream = storage.stream
+    if not detach and stream.seekable():
+        size = stream.seek(0, os.SEEK_END)
+        if size > max_bytes:
+            raise _too_large(max_bytes)
+        stream.seek(0)
+        return Upload(storage.filename, storage.content_type, stream, size)
+    file, size = spool(stream, max_bytes)
+    return Upload(storage.filename, storage.content_type, file, size)
+
+
+def receive_file(field='file', max_bytes=UPLOAD_MAX_BYTES, detach=False, **messages):
+    """file_field and receive in one step, for routes without checks in between."""
+    return receive(file_field(field, max_bytes, **messages), max_bytes, detach)
+
+
+def receive_body(max_bytes=UPLOAD_MAX_BYTES, filename=None):
+    """The raw request body as a detached Upload, read under max_bytes."""
+    limit_request(max_bytes, overhead=0)
+    file, size = spool(request.stream, max_bytes)
+    return Upload(filename, request.content_type, file, size)
@@ -0,0 +1,333 @@
+"""
+Shared client for all LLM calls made by the formatter, regex builder and SQL converter.
+
+Calls are dispatched to one bounded thread pool, so the number of model calls in
+flight is limited globally. Each call has a timeout, transient failures are retried
+with exponential backoff, and latency/token metrics are kept per route.
+
+Routes decorated with @deferrable also accept "async": true in their JSON body: the
+request is then handled in the background and the client polls
+GET /api/llm/jobs/<job_id> instead of holding a worker thread while the model runs.
+Pending jobs are capped; when the cap is reached new async requests get 429.
+
+Environment settings:
+    LLM_MODEL            - default model name (default gemini-2.0-flash-thinking-exp-01-21)
+    LLM_MAX_CONCURRENCY  - model calls in flight at once (default 8)
+    LLM_TIMEOUT          - seconds a call may run before it is abandoned, not counting
+                           time spent waiting for a free slot (default 60)
+    LLM_MAX_RETRIES      - retries for transient failures (default 2)
+    LLM_JOB_WORKERS      - background jobs handled at once (default 8)
+    LLM_JOB_TTL          - seconds finished jobs are kept for polling (default 600)
+    LLM_MAX_PENDING_JOBS - background jobs queued or running at once (default 256)
+    LLM_MAX_JOBS         - jobs kept for polling; the oldest finished are dropped first (default 10000)
+    LLM_JOB_MAX_BODY     - bytes of a non-JSON (e.g. streamed) response kept as a job result (default 16MB)
+    LLM_PROVIDER         - 'gemini' (default) or 'stub' for the offline stand-in in llmstub.py
+"""
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import wraps
+
+from flask import request, jsonify, current_app, copy_current_request_context
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from metrics import percentile
+
+DEFAULT_MODEL = os.environ.get('LLM_MODEL', 'gemini-2.0-flash-thinking-exp-01-21')
+MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 8))
+TIMEOUT = float(os.environ.get('LLM_TIMEOUT', 60))
+MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 2))
+JOB_WORKERS = int(os.environ.get('LLM_JOB_WORKERS', 8))
+JOB_TTL = float(os.environ.get('LLM_JOB_TTL', 600))
+MAX_PENDING_JOBS = int(os.environ.get('LLM_MAX_PENDING_JOBS', 256))
+MAX_JOBS = int(os.environ.get('LLM_MAX_JOBS', 10000))
+JOB_MAX_BODY = int(os.environ.get('LLM_JOB_MAX_BODY', 16 * 1024 * 1024))
+PROVIDER = os.environ.get('LLM_PROVIDER', 'gemini')
+
+# Errors worth retrying: rate limits, overload and server-side timeouts.
+TRANSIENT_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+# Number of recent latencies kept per route for percentiles.
+LATENCY_WINDOW = 500
+
+
+class LLMTimeoutError(Exception):
+    pass
+
+
+class GeminiProvider:
+    """
+    Sends prompts to Google Gemini through google-generativeai.
+
+    A provider only needs a 'name' and
+    generate(prompt, model_name, generation_config, timeout, route) -> (text, usage).
+    """
+
+    name = 'gemini'
+
+    def __init__(self):
+        genai.configure(api_key=os.environ.get('GOOGLE_API_KEY') or os.environ.get('GEMINI_API_KEY'))
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _model(self, model_name):
+        with self._lock:
+            if model_name not in self._models:
+                self._models[model_name] = genai.GenerativeModel(model_name)
+            return self._models[model_name]
+
+    def generate(self, prompt, model_name, generation_config=None, timeout=None, route=None):
+        """Return (text, usage) where usage has prompt_tokens and output_tokens."""
+        response = self._model(model_name).generate_content(
+            prompt,
+            generation_config=generation_config,
+            request_options={'timeout': timeout} if timeout else None
+        )
+        metadata = getattr(response, 'usage_metadata', None)
+        usage = {
+            'prompt_tokens': getattr(metadata, 'prompt_token_count', 0) or 0,
+            'output_tokens': getattr(metadata, 'candidates_token_count', 0) or 0,
+        }
+        return response.text, usage
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'retries': self.retries,
+            'prompt_tokens': self.prompt_tokens,
+            'output_tokens': self.output_tokens,
+            'latency_ms': {
+                'mean': round(sum(latencies) / len(latencies), 2) if latencies else None,
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'max': latencies[-1] if latencies else None,
+            },
+        }
+
+
+class LLMClient:
+    def __init__(self, provider, max_concurrency=MAX_CONCURRENCY, timeout=TIMEOUT, max_retries=MAX_RETRIES):
+        self.provider = provider
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='llm')
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def _route_metrics(self, route):
+        with self._lock:
+            if route not in self._metrics:
+                self._metrics[route] = RouteMetrics()
+            return self._metrics[route]
+
+    def _call(self, prompt, route, model_name, generation_config, timeout, started=None):
+        if started is not None:
+            started.set()
+        metrics = self._route_metrics(route)
+        with self._lock:
+            self._in_flight += 1
+        try:
+            for attempt in range(self.max_retries + 1):
+                start = time.perf_counter()
+                try:
+                    text, usage = self.provider.generate(prompt, model_name, generation_config, timeout, route=route)
+                except TRANSIENT_ERRORS:
+                    if attempt == self.max_retries:
+                        raise
+                    with self._lock:
+                        metrics.retries += 1
+                    # Exponential backoff with jitter: ~0.5s, 1s, 2s...
+                    time.sleep((2 ** attempt) * 0.5 * (0.5 + random.random()))
+                    continue
+                with self._lock:
+                    metrics.latencies.append(round((time.perf_counter() - start) * 1000, 2))
+                    metrics.prompt_tokens += usage.get('prompt_tokens', 0)
+                    metrics.output_tokens += usage.get('output_tokens', 0)
+                return text
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def submit(self, prompt, route, model_name=None, generation_config=None, timeout=None, started=None):
+        """
+        Queue a model call and return a Future resolving to the response text.
+        started, if given, is a threading.Event set when the call leaves the queue.
+        """
+        metrics = self._route_metrics(route)
+        with self._lock:
+            metrics.calls += 1
+        return self._executor.submit(
+            self._call, prompt, route, model_name or DEFAULT_MODEL, generation_config, timeout or self.timeout, started
+        )
+
+    def generate(self, prompt, route, model_name=None, generation_config=None, timeout=None):
+        """
+        Run a model call through the shared pool and wait for its text, up to timeout
+        seconds once the call has started; time spent queued for a slot is not counted.
+        """
+        timeout = timeout or self.timeout
+        started = threading.Event()
+        future = self.submit(prompt, route, model_name, generation_config, timeout, started)
+        try:
+            # Queued calls wait for a slot; every running call is bounded by its own
+            # timeout, so a slot frees up eventually.
+            started.wait()
+            # Allow for retries on top of the per-attempt timeout.
+            return future.result(timeout=timeout * (self.max_retries + 1))
+        except FutureTimeoutError:
+            future.cancel()
+            metrics = self._route_metrics(route)
+            with self._lock:
+                metrics.timeouts += 1
+            raise LLMTimeoutError(f"Model call timed out after {timeout} seconds")
+        except Exception:
+            metrics = self._route_metrics(route)
+            with self._lock:
+                metrics.errors += 1
+            raise
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'provider': self.provider.name,
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self._in_flight,
+                'routes': {route: m.snapshot() for route, m in self._metrics.items()},
+            }
+
+
+def create_provider(name):
+    if name == 'gemini':
+        return GeminiProvider()
+    if name == 'stub':
+        from llmstub import StubProvider
+        return StubProvider()
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+
+client = LLMClient(create_provider(PROVIDER))
+
+
+def set_provider(provider):
+    """Swap the provider used by every route, e.g. to a StubProvider for benchmarks."""
+    client.provider = provider
+
+
+def generate(prompt, route, model_name=None, generation_config=None, timeout=None):
+    return client.generate(prompt, route, model_name, generation_config, timeout)
+
+
+def submit(prompt, route, model_name=None, generation_config=None, timeout=None):
+    return client.submit(prompt, route, model_name, generation_config, timeout)
+
+
+# Background jobs for routes called with "async": true.
+_job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='llm-job')
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _expire_jobs():
+    now = time.time()
+    with _jobs_lock:
+        for job_id in [j for j, job in _jobs.items() if job.get('finished_at') and now - job['finished_at'] > JOB_TTL]:
+            del _jobs[job_id]
+
+
+def _add_job(job_id):
+    """Register a pending job; returns False when MAX_PENDING_JOBS are already queued or running."""
+    with _jobs_lock:
+        if sum(1 for job in _jobs.values() if not job.get('finished_at')) >= MAX_PENDING_JOBS:
+            return False
+        if len(_jobs) >= MAX_JOBS:
+            # Dicts keep insertion order, so the first finished jobs are the oldest.
+            finished = [j for j, job in _jobs.items() if job.get('finished_at')]
+            for old_id in finished[:len(_jobs) - MAX_JOBS + 1]:
+                del _jobs[old_id]
+        _jobs[job_id] = {'job_id': job_id, 'status': 'pending', 'created_at': time.time()}
+        return True
+
+
+def get_job(job_id):
+    _expire_jobs()
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
+
+
+def _job_outcome(response):
+    """Job fields for a finished view response; streamed and non-JSON bodies are kept as text."""
+    if response.is_json and not response.is_streamed:
+        return {'status': 'done', 'status_code': response.status_code, 'result': response.get_json()}
+    chunks = []
+    size = 0
+    try:
+        for chunk in response.iter_encoded():
+            size += len(chunk)
+            if size > JOB_MAX_BODY:
+                return {'status': 'failed', 'status_code': 413,
+                        'result': {'error': f"Response is larger than {JOB_MAX_BODY} bytes; call without async"}}
+            chunks.append(chunk)
+    finally:
+        response.close()
+    return {'status': 'done', 'status_code': response.status_code, 'result': None,
+            'mimetype': response.mimetype, 'body': b''.join(chunks).decode('utf-8', 'replace')}
+
+
+def deferrable(view):
+    """
+    Let a JSON route run in the background when its body contains "async": true.
+    The client gets 202 with a job id and polls /api/llm/jobs/<job_id> for the
+    status code and JSON body the route would have returned; a streamed or
+    non-JSON response is returned as 'body' text with its 'mimetype' instead.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not data.get('async'):
+            return view(*args, **kwargs)
+
+        _expire_jobs()
+        job_id = str(uuid.uuid4())
+        if not _add_job(job_id):
+            return jsonify({'error': f"Too many pending jobs (limit {MAX_PENDING_JOBS}); retry later"}), 429
+
+        @copy_current_request_context
+        def run():
+            try:
+                outcome = _job_outcome(current_app.make_response(view(*args, **kwargs)))
+            except Exception as e:
+                outcome = {'status': 'failed', 'status_code': 500, 'result': {'error': str(e)}}
+            with _jobs_lock:
+                _jobs[job_id].update(outcome, finished_at=time.time())
+
+        _job_executor.submit(run)
+        return jsonify({'job_id': job_id, 'status': 'pending', 'poll_url': f"/api/llm/jobs/{job_id}"}), 202
+
+    return wrapper
@@ -0,0 +1,124 @@
+"""
+Offline stand-in for Gemini so the LLM routes can be exercised and load-tested
+without network access. Select it with LLM_PROVIDER=stub or llmclient.set_provider().
+
+Environment settings:
+    LLM_STUB_LATENCY_MS  - simulated model latency (default 500)
+    LLM_STUB_JITTER_MS   - random extra latency added on top (default 0)
+    LLM_STUB_ERROR_RATE  - fraction of calls failing with a retryable 503 (default 0)
+    LLM_STUB_RESPONSES   - path to a JSON file mapping route names to fixed response text
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from google.api_core import exceptions as google_exceptions
+
+CODE_BLOCK = re.compile(r"```(\w*)\n([\s\S]*?)\n\s*```")
+
+
+def _code_block(prompt):
+    match = CODE_BLOCK.search(prompt)
+    if not match:
+        return '', ''
+    lines = match.group(2).split('\n')
+    # Prompts are indented f-strings; drop the common indentation again.
+    indent = min((len(l) - len(l.lstrip()) for l in lines if l.strip()), default=0)
+    return match.group(1), '\n'.join(l[indent:] for l in lines)
+
+
+def _format_response(prompt):
+    language, code = _code_block(prompt)
+    return f"```{language}\n{code}\n```"
+
+
+def _validate_response(prompt):
+    return "STATUS: VALID\n\nISSUES:\nNone"
+
+
+def _regex_response(prompt):
+    match = re.search(r"GENERATED PATTERN:\s*\n\s*(.*)", prompt)
+    pattern = match.group(1).strip() if match else '.*'
+    return (
+        f"Pattern: {pattern}\n"
+        "Explanation: Stub explanation of the pattern.\n"
+        "Example Matches: example1, example2\n"
+        "Non-Matches: counter1, counter2"
+    )
+
+
+def _sql_convert_response(prompt):
+    _, sql = _code_block(prompt)
+    return f"```sql\n{sql}\n```"
+
+
+def _mock_data_response(prompt):
+    match = re.search(r"Generate (\d+) rows", prompt)
+    count = int(match.group(1)) if match else 10
+    rows = [{"id": i + 1, "name": f"stub-{i + 1}"} for i in range(count)]
+    return "```json\n" + json.dumps(rows) + "\n```"
+
+
+def _schema_response(prompt):
+    _, sql = _code_block(prompt)
+    match = re.search(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?[`\"\[]?(\w+)", sql, re.IGNORECASE)
+    schema = {"table_name": match.group(1) if match else "stub", "columns": []}
+    return "```json\n" + json.dumps(schema) + "\n```"
+
+
+def _mock_hints_response(prompt):
+    return "```json\n{}\n```"
+
+
+# Canned answers per llmclient route name, shaped like what each route parses.
+DEFAULT_RESPONSES = {
+    'format': _format_response,
+    'validate': _validate_response,
+    'regex-builder': _regex_response,
+    'sql-convert': _sql_convert_response,
+    'sql-generate-mock': _mock_data_response,
+    'sql-to-schema': _schema_response,
+    'sql-mock-hints': _mock_hints_response,
+}
+
+
+class StubProvider:
+    name = 'stub'
+
+    def __init__(self, latency_ms=None, jitter_ms=None, error_rate=None, responses=None):
+        self.latency_ms = float(os.environ.get('LLM_STUB_LATENCY_MS', 500)) if latency_ms is None else latency_ms
+        self.jitter_ms = float(os.environ.get('LLM_STUB_JITTER_MS', 0)) if jitter_ms is None else jitter_ms
+        self.error_rate = float(os.environ.get('LLM_STUB_ERROR_RATE', 0)) if error_rate is None else error_rate
+        if responses is None:
+            responses_file = os.environ.get('LLM_STUB_RESPONSES')
+            responses = {}
+            if responses_file:
+                with open(responses_file, 'r') as f:
+                    responses = json.load(f)
+        self.responses = responses
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, model_name, generation_config=None, timeout=None, route=None):
+        # Called from every worker of the LLM pool at once.
+        with self._lock:
+            self.calls += 1
+        delay = (self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000
+        if timeout and delay > timeout:
+            time.sleep(timeout)
+            raise google_exceptions.DeadlineExceeded(f"Stub call exceeded {timeout} seconds")
+        time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            raise google_exceptions.ServiceUnavailable("Stub provider simulated overload")
+
+        if route in self.responses:
+            text = self.responses[route]
+        elif route in DEFAULT_RESPONSES:
+            text = DEFAULT_RESPONSES[route](prompt)
+        else:
+            text = ''
+        # Rough token estimate: ~4 characters per token.
+        return text, {'prompt_tokens': len(prompt) // 4, 'output_tokens': len(text) // 4}
@@ -0,0 +1,62 @@
+import json
+import re
+import xml.dom.minidom as minidom
+import yaml
+
+XML_DECLARATION = re.compile(r'^\s*(<\?xml[^>]*\?>)')
+
+def indent_string(indent_type='spaces', indent_size=4):
+    """
+    Return the indentation unit for the given settings.
+    """
+    return ' ' * int(indent_size) if indent_type == 'spaces' else '\t'
+
+def format_json_local(code, indent_type='spaces', indent_size=4):
+    """
+    Pretty-print JSON, keeping key order and non-ASCII characters as written.
+    Raises json.JSONDecodeError if the document is invalid.
+    """
+    parsed = json.loads(code)
+    return json.dumps(parsed, indent=indent_string(indent_type, indent_size), ensure_ascii=False)
+
+def _strip_whitespace_nodes(node):
+    for child in list(node.childNodes):
+        if child.nodeType == child.TEXT_NODE and not child.data.strip():
+            node.removeChild(child)
+        elif child.nodeType == child.ELEMENT_NODE and child.getAttribute('xml:space') != 'preserve':
+            _strip_whitespace_nodes(child)
+
+def format_xml_local(code, indent_type='spaces', indent_size=4):
+    """
+    Re-indent an XML document. Comments, processing instructions and the original
+    XML declaration are kept; whitespace-only text between elements is dropped.
+    Raises xml.parsers.expat.ExpatError if the document is not well-formed.
+    """
+    dom = minidom.parseString(code)
+    _strip_whitespace_nodes(dom.documentElement)
+    pretty = dom.toprettyxml(indent=indent_string(indent_type, indent_size))
+
+    # toprettyxml always writes its own bare declaration as the first line.
+    body = pretty.split('\n', 1)[1] if pretty.startswith('<?xml') else pretty
+    declaration = XML_DECLARATION.match(code)
+    if declaration:
+        body = declaration.group(1) + '\n' + body
+    return body.rstrip('\n')
+
+def format_yaml_local(code, indent_type='spaces', indent_size=4):
+    """
+    Re-emit YAML in block style with the given indentation, keeping key order.
+    YAML does not allow tab indentation, so 'tabs' falls back to spaces.
+    Comments are not preserved. Raises yaml.YAMLError if the document is invalid.
+    """
+    documents = list(yaml.safe_load_all(code))
+    # PyYAML only accepts indents between 2 and 9.
+    indent = min(max(int(indent_size), 2), 9)
+    return yaml.safe_dump_all(
+        documents,
+        indent=indent,
+        sort_keys=False,
+        default_flow_style=False,
+        allow_unicode=True,
+        explicit_start=len(documents) > 1
+    ).rstrip('\n')
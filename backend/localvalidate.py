@@ -0,0 +1,255 @@
+import ast
+from html.parser import HTMLParser
+
+# Elements that never have a closing tag.
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr'
+}
+
+# Elements whose closing tag HTML lets authors leave out.
+OPTIONAL_CLOSE_ELEMENTS = {
+    'html', 'head', 'body', 'p', 'li', 'dt', 'dd', 'option', 'optgroup',
+    'thead', 'tbody', 'tfoot', 'tr', 'td', 'th', 'colgroup', 'rt', 'rp'
+}
+
+BRACKET_PAIRS = {')': '(', ']': '[', '}': '{'}
+
+# After one of these characters a '/' in JavaScript starts a regex literal, not a division.
+JS_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw', 'case', 'do', 'else'}
+
+def _error(message, line, column):
+    return {"message": message, "line": line, "column": column}
+
+def check_python(code):
+    # ast.parse rejects NUL bytes with ValueError (SyntaxError without a position
+    # on newer Pythons), so they are reported here with their line and column.
+    index = code.find('\0')
+    if index != -1:
+        return [_error("source code cannot contain null bytes", code.count('\n', 0, index) + 1,
+                       index - (code.rfind('\n', 0, index) + 1) + 1)]
+    try:
+        ast.parse(code)
+    except SyntaxError as e:
+        return [_error(e.msg, e.lineno, e.offset)]
+    return []
+
+class _BracketScanner:
+    """
+    Checks that (), [] and {} are balanced and that strings and block comments are
+    terminated, skipping over string, comment and (for JavaScript) regex literals.
+    """
+
+    def __init__(self, code, quotes, line_comments=True, regex_literals=False, preprocessor=False):
+        self.code = code
+        self.quotes = quotes
+        self.line_comments = line_comments
+        self.regex_literals = regex_literals
+        self.preprocessor = preprocessor
+        # Newlines that end a complete top-level statement or block.
+        self.top_level_breaks = []
+
+    def _position(self, index):
+        line = self.code.count('\n', 0, index) + 1
+        column = index - (self.code.rfind('\n', 0, index) + 1) + 1
+        return line, column
+
+    def _regex_allowed(self, index):
+        j = index - 1
+        while j >= 0 and self.code[j] in ' \t\r\n':
+            j -= 1
+        if j < 0 or self.code[j] in JS_REGEX_PRECEDERS:
+            return True
+        end = j + 1
+        while j >= 0 and (self.code[j].isalnum() or self.code[j] in '_$'):
+            j -= 1
+        return self.code[j + 1:end] in JS_REGEX_KEYWORDS
+
+    def _skip_string(self, i, quote):
+        code = self.code
+        i += 1
+        while i < len(code):
+            ch = code[i]
+            if ch == '\\':
+                i += 2
+                continue
+            if ch == quote:
+                return i + 1
+            if ch == '\n' and quote != '`':
+                return None
+            i += 1
+        return None
+
+    def _skip_regex(self, i):
+        code = self.code
+        i += 1
+        in_class = False
+        while i < len(code):
+            ch = code[i]
+            if ch == '\\':
+                i += 2
+                continue
+            if ch == '\n':
+                return None
+            if ch == '[':
+                in_class = True
+            elif ch == ']':
+                in_class = False
+            elif ch == '/' and not in_class:
+                return i + 1
+            i += 1
+        return None
+
+    def scan(self):
+        code = self.code
+        stack = []
+        i = 0
+        line_start = True
+        statement_done = True
+        while i < len(code):
+            ch = code[i]
+            nxt = code[i + 1] if i + 1 < len(code) else ''
+
+            if self.preprocessor and line_start and ch == '#':
+                # Skip the whole directive, including backslash continuations.
+                while i < len(code) and not (code[i] == '\n' and code[i - 1] != '\\'):
+                    i += 1
+                statement_done = True
+                continue
+            if ch == '\n':
+                if not stack and statement_done:
+                    self.top_level_breaks.append(i)
+                line_start = True
+                i += 1
+                continue
+            if ch not in ' \t\r':
+                line_start = False
+                if not (ch == '/' and nxt in '/*'):
+                    statement_done = ch in ';}'
+
+            if ch == '/' and nxt == '*':
+                end = code.find('*/', i + 2)
+                if end == -1:
+                    return [_error("Unterminated block comment", *self._position(i))]
+                i = end + 2
+            elif ch == '/' and nxt == '/' and self.line_comments:
+                end = code.find('\n', i)
+                i = len(code) if end == -1 else end
+            elif ch in self.quotes:
+                end = self._skip_string(i, ch)
+                if end is None:
+                    return [_error("Unterminated string literal", *self._position(i))]
+                i = end
+            elif ch == '/' and self.regex_literals and self._regex_allowed(i):
+                end = self._skip_regex(i)
+                # An unterminated "regex" is more likely a division we misread; treat it as one.
+                i = end if end is not None else i + 1
+            elif ch in '([{':
+                stack.append((ch, i))
+                i += 1
+            elif ch in ')]}':
+                if not stack:
+                    return [_error(f"Unexpected '{ch}'", *self._position(i))]
+                opener, opened_at = stack.pop()
+                if opener != BRACKET_PAIRS[ch]:
+                    line, column = self._position(opened_at)
+                    return [_error(f"Found '{ch}' but '{opener}' from line {line}, column {column} is still open", *self._position(i))]
+                i += 1
+            else:
+                i += 1
+
+        return [_error(f"'{opener}' is never closed", *self._position(index)) for opener, index in stack]
+
+def _bracket_scanner(code, language):
+    if language in ('javascript', 'js'):
+        return _BracketScanner(code, quotes='"\'`', regex_literals=True)
+    if language == 'c':
+        return _BracketScanner(code, quotes='"\'', preprocessor=True)
+    if language == 'css':
+        return _BracketScanner(code, quotes='"\'', line_comments=False)
+    return None
+
+def check_javascript(code):
+    return _bracket_scanner(code, 'javascript').scan()
+
+def check_c(code):
+    return _bracket_scanner(code, 'c').scan()
+
+def check_css(code):
+    return _bracket_scanner(code, 'css').scan()
+
+class _TagBalanceParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+        self.errors = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_ELEMENTS:
+            self.stack.append((tag, self.getpos()))
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        line, offset = self.getpos()
+        if not any(open_tag == tag for open_tag, _ in self.stack):
+            self.errors.append(_error(f"Closing tag </{tag}> has no matching opening tag", line, offset + 1))
+            return
+        # Implicitly close elements whose end tag is optional.
+        while self.stack and self.stack[-1][0] != tag:
+            open_tag, (open_line, open_offset) = self.stack.pop()
+            if open_tag not in OPTIONAL_CLOSE_ELEMENTS:
+                self.errors.append(_error(f"<{open_tag}> is not closed before </{tag}>", open_line, open_offset + 1))
+        self.stack.pop()
+
+def check_html(code):
+    parser = _TagBalanceParser()
+    parser.feed(code)
+    parser.close()
+    errors = parser.errors
+    for tag, (line, offset) in parser.stack:
+        if tag not in OPTIONAL_CLOSE_ELEMENTS:
+            errors.append(_error(f"<{tag}> is never closed", line, offset + 1))
+    return errors
+
+LOCAL_CHECKERS = {
+    'python': check_python,
+    'javascript': check_javascript,
+    'js': check_javascript,
+    'c': check_c,
+    'css': check_css,
+    'html': check_html
+}
+
+# Languages whose checker fully parses the code. The others only check that
+# brackets or tags balance, so passing them does not make the code valid.
+FULL_PARSE_LANGUAGES = {'python'}
+
+def check_syntax(code, language):
+    """
+    Run the local syntax check for language.
+    Returns a list of {"message", "line", "column"} dicts (empty if no problem was
+    found), or None if there is no local checker for the language.
+    """
+    checker = LOCAL_CHECKERS.get(language)
+    if checker is None:
+        return None
+    return checker(code)
+
+def top_level_breaks(code, language):
+    """
+    Return the offsets of newlines that end a complete top-level statement or block
+    in JavaScript, C or CSS code, i.e. the places where the file can be split safely.
+    """
+    scanner = _bracket_scanner(code, language)
+    if scanner is None or scanner.scan():
+        return []
+    return scanner.top_level_breaks
+
+def describe_errors(errors):
+    """Render errors in the same 'Syntax Errors:' layout the model validator returns."""
+    lines = ["Syntax Errors:"]
+    for error in errors:
+        lines.append(f"- {error['message']} on line {error['line']}, column {error['column']}")
+    return "\n".join(lines)
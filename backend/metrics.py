@@ -0,0 +1,14 @@
+"""
+Latency statistics shared by the proxy's batch and load-test endpoints, the LLM
+client's per-route metrics and the benchmarks, so they all report percentiles
+the same way.
+"""
+import math
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list, or None when it is empty."""
+    if not sorted_values:
+        return None
+    rank = max(int(math.ceil(pct / 100 * len(sorted_values))), 1)
+    return sorted_values[rank - 1]
@@ -0,0 +1,482 @@
+"""
+Local mock data generator for tables parsed by sqlschema.parse_schema.
+
+Rows are produced one at a time from per-column generators, so memory use does
+not grow with the number of rows. Uniqueness is guaranteed without remembering
+earlier values: primary-key, auto-increment and UNIQUE columns are derived from
+the row number, and foreign keys pick a row number of the parent table and
+derive the parent's key from it the same way. plan_row_counts checks up front
+that every key column can hold that many distinct values.
+"""
+import csv
+import io
+import json
+import random
+import re
+import uuid
+from datetime import date, datetime, timedelta
+
+from sqldialect import quote_identifier
+
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+               'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Carlos', 'Aisha',
+               'Wei', 'Yuki', 'Priya', 'Omar', 'Sofia', 'Lucas', 'Emma', 'Noah', 'Olivia', 'Liam']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+              'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+              'Lee', 'Chen', 'Patel', 'Khan', 'Kim', 'Nguyen', 'Silva', 'Rossi', 'Muller', 'Tanaka']
+CITIES = ['New York', 'London', 'Paris', 'Tokyo', 'Berlin', 'Madrid', 'Toronto', 'Sydney', 'Mumbai', 'Sao Paulo',
+          'Chicago', 'Seoul', 'Amsterdam', 'Dublin', 'Singapore', 'Cape Town', 'Mexico City', 'Austin', 'Oslo', 'Lisbon']
+COUNTRIES = ['United States', 'United Kingdom', 'France', 'Japan', 'Germany', 'Spain', 'Canada', 'Australia', 'India',
+             'Brazil', 'South Korea', 'Netherlands', 'Ireland', 'Singapore', 'South Africa', 'Mexico', 'Norway', 'Portugal']
+STREETS = ['Main St', 'Oak Ave', 'Maple Dr', 'Cedar Ln', 'Park Rd', 'Elm St', 'Lake View', 'Hill St', 'River Rd', 'Pine Ct']
+COMPANIES = ['Acme', 'Globex', 'Initech', 'Umbrella', 'Stark', 'Wayne', 'Wonka', 'Hooli', 'Vandelay', 'Soylent']
+WORDS = ['alpha', 'bright', 'cloud', 'delta', 'echo', 'fusion', 'green', 'harbor', 'ion', 'jade', 'kite', 'lumen',
+         'metro', 'nova', 'orbit', 'pixel', 'quartz', 'river', 'solar', 'terra', 'ultra', 'vector', 'wave', 'zen']
+STATUSES = ['active', 'inactive', 'pending', 'archived']
+DOMAINS = ['example.com', 'example.org', 'example.net']
+
+# Semantic kinds a text column can be generated as; also the vocabulary offered to the model for hints.
+TEXT_KINDS = ('email', 'first_name', 'last_name', 'full_name', 'username', 'phone', 'city', 'country', 'address',
+              'zip', 'url', 'company', 'title', 'description', 'status', 'uuid', 'ip', 'color', 'word')
+
+# Column-name patterns checked in order; the first match picks the kind.
+NAME_HINTS = [
+    (r'e_?mail', 'email'),
+    (r'first_?name|given_?name|fname', 'first_name'),
+    (r'last_?name|surname|family_?name|lname', 'last_name'),
+    (r'full_?name|^name$|customer_?name|author|contact', 'full_name'),
+    (r'user_?name|login|handle|nick', 'username'),
+    (r'phone|mobile|fax|tel', 'phone'),
+    (r'city|town', 'city'),
+    (r'country|nation', 'country'),
+    (r'address|street', 'address'),
+    (r'zip|postal|post_?code', 'zip'),
+    (r'url|website|link|homepage', 'url'),
+    (r'company|organi[sz]ation|employer|vendor|supplier', 'company'),
+    (r'title|subject|headline|product_?name|^label$', 'title'),
+    (r'desc|comment|note|body|bio|summary|content|message|text', 'description'),
+    (r'status|state$', 'status'),
+    (r'uuid|guid', 'uuid'),
+    (r'^ip$|ip_?addr', 'ip'),
+    (r'colou?r', 'color'),
+]
+
+INT_RANGES = {
+    'TINYINT': 127, 'SMALLINT': 32767, 'INT2': 32767, 'MEDIUMINT': 8388607,
+}
+# Largest value a signed integer key column can hold; UNSIGNED doubles it (plus one).
+INT_KEY_MAX = {
+    'TINYINT': 2 ** 7 - 1, 'SMALLINT': 2 ** 15 - 1, 'INT2': 2 ** 15 - 1, 'SMALLSERIAL': 2 ** 15 - 1,
+    'MEDIUMINT': 2 ** 23 - 1, 'INT': 2 ** 31 - 1, 'INTEGER': 2 ** 31 - 1, 'INT4': 2 ** 31 - 1, 'SERIAL': 2 ** 31 - 1,
+    'BIGINT': 2 ** 63 - 1, 'INT8': 2 ** 63 - 1, 'BIGSERIAL': 2 ** 63 - 1,
+}
+INT_TYPES = {'INT', 'INTEGER', 'INT4', 'BIGINT', 'INT8', 'SMALLINT', 'INT2', 'TINYINT', 'MEDIUMINT',
+             'SERIAL', 'BIGSERIAL', 'SMALLSERIAL'}
+DECIMAL_TYPES = {'DECIMAL', 'NUMERIC', 'NUMBER', 'DEC', 'MONEY', 'SMALLMONEY'}
+FLOAT_TYPES = {'FLOAT', 'REAL', 'DOUBLE', 'DOUBLE PRECISION', 'BINARY_FLOAT', 'BINARY_DOUBLE', 'FLOAT4', 'FLOAT8'}
+BOOL_TYPES = {'BOOLEAN', 'BOOL', 'BIT'}
+DATE_TYPES = {'DATE'}
+TIMESTAMP_TYPES = {'DATETIME', 'DATETIME2', 'SMALLDATETIME', 'TIMESTAMP', 'TIMESTAMPTZ', 'TIMESTAMP WITH TIME ZONE',
+                   'TIMESTAMP WITHOUT TIME ZONE'}
+TIME_TYPES = {'TIME', 'TIME WITH TIME ZONE', 'TIME WITHOUT TIME ZONE'}
+JSON_TYPES = {'JSON', 'JSONB'}
+UUID_TYPES = {'UUID', 'UNIQUEIDENTIFIER'}
+BINARY_TYPES = {'BLOB', 'TINYBLOB', 'MEDIUMBLOB', 'LONGBLOB', 'BYTEA', 'VARBINARY', 'BINARY', 'IMAGE', 'RAW'}
+
+EPOCH = date(2015, 1, 1)
+DATE_SPAN_DAYS = 4015  # up to the end of 2025
+
+
+def _base36(n):
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    out = ''
+    while True:
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+        if not n:
+            return out
+
+
+def _base_type(column):
+    """Upper-cased type name without parameters or modifiers, e.g. 'VARCHAR'."""
+    return re.sub(r'\(.*$|\[\]$', '', column['type']).replace(' UNSIGNED', '').replace(' SIGNED', '').replace(' ZEROFILL', '').strip().upper()
+
+
+def text_kind(column, hints=None):
+    """Pick a TEXT_KINDS entry for a text column from model hints or its name."""
+    if hints and hints.get(column['name']) in TEXT_KINDS:
+        return hints[column['name']]
+    name = column['name'].lower()
+    for pattern, kind in NAME_HINTS:
+        if re.search(pattern, name):
+            return kind
+    return 'word'
+
+
+def _text_value(kind, rng):
+    if kind == 'email':
+        return f"{rng.choice(FIRST_NAMES).lower()}.{rng.choice(LAST_NAMES).lower()}{rng.randint(1, 999)}@{rng.choice(DOMAINS)}"
+    if kind == 'first_name':
+        return rng.choice(FIRST_NAMES)
+    if kind == 'last_name':
+        return rng.choice(LAST_NAMES)
+    if kind == 'full_name':
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    if kind == 'username':
+        return f"{rng.choice(FIRST_NAMES).lower()}{rng.randint(1, 9999)}"
+    if kind == 'phone':
+        return f"+1-{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}"
+    if kind == 'city':
+        return rng.choice(CITIES)
+    if kind == 'country':
+        return rng.choice(COUNTRIES)
+    if kind == 'address':
+        return f"{rng.randint(1, 9999)} {rng.choice(STREETS)}"
+    if kind == 'zip':
+        return f"{rng.randint(10000, 99999)}"
+    if kind == 'url':
+        return f"https://{rng.choice(WORDS)}.{rng.choice(DOMAINS)}/{rng.choice(WORDS)}"
+    if kind == 'company':
+        return f"{rng.choice(COMPANIES)} {rng.choice(['Inc', 'LLC', 'Ltd', 'Group', 'Labs'])}"
+    if kind == 'title':
+        return f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)}"
+    if kind == 'description':
+        return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))).capitalize() + '.'
+    if kind == 'status':
+        return rng.choice(STATUSES)
+    if kind == 'uuid':
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    if kind == 'ip':
+        return '.'.join(str(rng.randint(1, 254)) for _ in range(4))
+    if kind == 'color':
+        return f"#{rng.getrandbits(24):06x}"
+    return rng.choice(WORDS)
+
+
+def _is_boolean(column, base):
+    return base in BOOL_TYPES or (base == 'TINYINT' and column['type'].endswith('(1)'))
+
+
+def key_maker(column, hints=None):
+    """
+    Return key(n) giving the value of a unique/key column for row number n (1-based).
+    The same n always gives the same value, so foreign keys can rebuild a parent's keys.
+    Keys have the column's own type: dates count days from EPOCH, booleans are
+    False then True, ENUM keys walk the allowed values.
+    """
+    base = _base_type(column)
+    if _is_boolean(column, base):
+        return lambda n: n % 2 == 0
+    if base in INT_TYPES or base in DECIMAL_TYPES:
+        return lambda n: n
+    if base in FLOAT_TYPES:
+        return lambda n: float(n)
+    if column.get('values'):
+        values = column['values']
+        return lambda n: values[(n - 1) % len(values)]
+    if base in DATE_TYPES:
+        return lambda n: (EPOCH + timedelta(days=n - 1)).isoformat()
+    if base in TIMESTAMP_TYPES:
+        start = datetime(EPOCH.year, EPOCH.month, EPOCH.day)
+        return lambda n: (start + timedelta(seconds=n - 1)).isoformat(' ')
+    if base in TIME_TYPES:
+        return lambda n: f"{(n - 1) // 3600:02d}:{(n - 1) // 60 % 60:02d}:{(n - 1) % 60:02d}"
+    if base in JSON_TYPES:
+        return lambda n: json.dumps({'id': n})
+    if base in BINARY_TYPES:
+        size = column.get('length') or 8
+        return lambda n: n.to_bytes(size, 'big')
+    kind = text_kind(column, hints)
+    if base in UUID_TYPES or kind == 'uuid':
+        return lambda n: str(uuid.UUID(int=n, version=4))
+    length = column.get('length')
+    if kind == 'email':
+        prefix, suffix = 'user', '@example.com'
+    else:
+        prefix, suffix = ('user' if kind == 'username' else column['name'][:8].lower()) + '_', ''
+
+    def key(n):
+        value = prefix + _base36(n) + suffix
+        if length and len(value) > length:
+            # The bare counter has no '_' or '@', so it cannot clash with a prefixed key.
+            return _base36(n)
+        return value
+    return key
+
+
+def key_capacity(column, hints=None):
+    """Number of distinct values key_maker can produce for the column, or None when practically unlimited."""
+    base = _base_type(column)
+    if _is_boolean(column, base):
+        return 2
+    if base in INT_TYPES:
+        if base not in INT_KEY_MAX:
+            return None
+        return INT_KEY_MAX[base] * 2 + 1 if 'UNSIGNED' in column['type'].upper() else INT_KEY_MAX[base]
+    if base in DECIMAL_TYPES:
+        precision = column.get('precision')
+        return 10 ** (precision - (column.get('scale') or 0)) - 1 if precision else None
+    if base in FLOAT_TYPES or base in TIMESTAMP_TYPES or base in JSON_TYPES:
+        return None
+    if column.get('values'):
+        return len(column['values'])
+    if base in DATE_TYPES:
+        return (date.max - EPOCH).days + 1
+    if base in TIME_TYPES:
+        return 24 * 60 * 60
+    if base in BINARY_TYPES:
+        return 256 ** (column.get('length') or 8) - 1
+    if base in UUID_TYPES or text_kind(column, hints) == 'uuid':
+        return None
+    length = column.get('length')
+    # Keys that do not fit with their prefix fall back to the bare base-36 counter.
+    return 36 ** length - 1 if length else None
+
+
+def _is_key_column(column, first_key):
+    return not column.get('references') and (column['auto_increment'] or column['name'] == first_key or column['unique'])
+
+
+def _link_capacity(table, row_counts, count):
+    """Distinct key tuples of a link table (primary key made of foreign keys), or None for other tables."""
+    columns_by_name = {c['name']: c for c in table['columns']}
+    primary_key = table.get('primary_key') or []
+    if not primary_key or not (columns_by_name.get(primary_key[0]) or {}).get('references'):
+        return None
+    capacity = 1
+    for name in primary_key:
+        reference = (columns_by_name.get(name) or {}).get('references')
+        if reference:
+            capacity *= max(row_counts.get(reference['table'], count), 1)
+    return capacity
+
+
+def plan_row_counts(tables, count, hints=None):
+    """
+    Return {table_name: rows} for generating count rows per table in sort_tables order.
+
+    Link tables are capped at the number of distinct parent combinations. Raises
+    ValueError when a key column cannot hold that many distinct values.
+    """
+    row_counts = {}
+    for table in tables:
+        rows = count
+        link_capacity = _link_capacity(table, row_counts, count)
+        if link_capacity is not None:
+            rows = min(rows, link_capacity)
+        first_key = table['primary_key'][0] if table.get('primary_key') else None
+        for column in table['columns']:
+            if not _is_key_column(column, first_key):
+                continue
+            capacity = key_capacity(column, hints)
+            if capacity is not None and rows > capacity:
+                raise ValueError(
+                    f"{table['table_name']}.{column['name']} ({column['type']}) can hold only {capacity} "
+                    f"distinct key values; ask for at most {capacity} rows"
+                )
+        row_counts[table['table_name']] = rows
+    return row_counts
+
+
+def _value_maker(column, rng, hints):
+    """Return make(n) producing a random (non-key) value for the column."""
+    base = _base_type(column)
+    unsigned = 'UNSIGNED' in column['type'].upper()
+    if column.get('values'):
+        values = column['values']
+        return lambda n: rng.choice(values)
+    if _is_boolean(column, base):
+        return lambda n: rng.random() < 0.5
+    if base in INT_TYPES:
+        high = INT_RANGES.get(base, 100000)
+        low = 0 if unsigned or base == 'TINYINT' else 1
+        return lambda n: rng.randint(low, high)
+    if base in DECIMAL_TYPES:
+        precision = column.get('precision') or 10
+        scale = column.get('scale') or 0
+        high = min(10 ** (precision - scale) - 1, 100000)
+        if scale:
+            return lambda n: round(rng.uniform(0, high), scale)
+        return lambda n: rng.randint(0, high)
+    if base in FLOAT_TYPES:
+        return lambda n: round(rng.uniform(0, 10000), 4)
+    if base in DATE_TYPES:
+        return lambda n: (EPOCH + timedelta(days=rng.randrange(DATE_SPAN_DAYS))).isoformat()
+    if base in TIMESTAMP_TYPES:
+        start = datetime(EPOCH.year, EPOCH.month, EPOCH.day)
+        return lambda n: (start + timedelta(seconds=rng.randrange(DATE_SPAN_DAYS * 86400))).isoformat(' ')
+    if base in TIME_TYPES:
+        return lambda n: f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+    if base in JSON_TYPES:
+        return lambda n: json.dumps({'id': n, 'tag': rng.choice(WORDS), 'score': rng.randint(0, 100)})
+    if base in UUID_TYPES:
+        return lambda n: str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    if base in BINARY_TYPES:
+        size = min(column.get('length') or 8, 16)
+        return lambda n: rng.getrandbits(size * 8).to_bytes(size, 'big')
+    kind = text_kind(column, hints)
+    length = column.get('length')
+    if length:
+        return lambda n: _text_value(kind, rng)[:length]
+    return lambda n: _text_value(kind, rng)
+
+
+def sort_tables(tables):
+    """Order tables so that referenced (parent) tables come before the tables pointing at them."""
+    by_name = {t['table_name']: t for t in tables}
+    ordered = []
+    visiting = set()
+
+    def visit(table):
+        name = table['table_name']
+        if table in ordered or name in visiting:
+            return
+        visiting.add(name)
+        for column in table['columns']:
+            parent = (column.get('references') or {}).get('table')
+            if parent in by_name and parent != name:
+                visit(by_name[parent])
+        visiting.discard(name)
+        ordered.append(table)
+
+    for table in tables:
+        visit(table)
+    return ordered
+
+
+def generate_rows(table, count, tables=None, row_counts=None, seed=None, null_rate=0.1, hints=None):
+    """
+    Yield count rows (dicts keyed by column name) for a table from parse_schema.
+
+    tables / row_counts describe the other tables in the same run so foreign keys
+    can point at rows that exist; a reference to a table outside the run is
+    assumed to have count rows. A link table yields at most one row per
+    combination of parent rows. Binary columns are yielded as bytes.
+    """
+    rng = random.Random(seed)
+    tables_by_name = {t['table_name']: t for t in tables or [table]}
+    row_counts = row_counts or {}
+    first_key = table['primary_key'][0] if table.get('primary_key') else None
+    columns_by_name = {c['name']: c for c in table['columns']}
+
+    # A primary key made of foreign keys (a link table) walks the combinations of
+    # parent rows in order, so key tuples stay unique up to the product of the parent sizes.
+    key_references = []
+    if first_key in columns_by_name and columns_by_name[first_key].get('references'):
+        key_references = [name for name in table['primary_key'] if columns_by_name.get(name, {}).get('references')]
+
+    def parent_key_column(reference, column):
+        parent = tables_by_name.get(reference['table'])
+        if not parent:
+            return column
+        parent_column = next((c for c in parent['columns'] if c['name'] == reference['column']), None)
+        if parent_column is None and parent.get('primary_key'):
+            parent_column = next((c for c in parent['columns'] if c['name'] == parent['primary_key'][0]), None)
+        return parent_column or column
+
+    radix = 1
+    makers = []
+    for column in table['columns']:
+        name = column['name']
+        reference = column.get('references')
+        nullable = column['nullable'] and not column['primary_key']
+        if name in key_references:
+            parent_rows = max(row_counts.get(reference['table'], count), 1)
+
+            def make(n, key=key_maker(parent_key_column(reference, column), hints), parent_rows=parent_rows, radix=radix):
+                return key((n - 1) // radix % parent_rows + 1)
+            radix *= parent_rows
+            nullable = False
+        elif reference:
+            parent_column = parent_key_column(reference, column)
+            parent_rows = row_counts.get(reference['table'], count)
+            self_reference = reference['table'] == table['table_name']
+
+            def make(n, column=column, key=key_maker(parent_column, hints), parent_rows=parent_rows, self_reference=self_reference):
+                upper = n - 1 if self_reference else parent_rows
+                if upper < 1:
+                    return None if column['nullable'] else key(n)
+                return key(rng.randint(1, upper))
+        elif _is_key_column(column, first_key):
+            make = key_maker(column, hints)
+            nullable = False
+        else:
+            make = _value_maker(column, rng, hints)
+        makers.append((name, make, nullable))
+
+    if key_references:
+        count = min(count, radix)
+    for n in range(1, count + 1):
+        yield {
+            name: (None if nullable and null_rate and rng.random() < null_rate else make(n))
+            for name, make, nullable in makers
+        }
+
+
+def sql_literal(value, dialect=None):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bytes):
+        if dialect == 'postgresql':
+            return f"'\\x{value.hex()}'::bytea"
+        if dialect == 'sqlserver':
+            return '0x' + value.hex()
+        if dialect == 'oracle':
+            return f"HEXTORAW('{value.hex()}')"
+        return f"X'{value.hex()}'"
+    if isinstance(value, bool):
+        if dialect in ('sqlserver', 'oracle'):
+            return '1' if value else '0'
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def json_row(row):
+    """Row with binary values as hex strings, for JSON output."""
+    return {name: value.hex() if isinstance(value, bytes) else value for name, value in row.items()}
+
+
+def iter_ndjson(rows, table_name=None):
+    for row in rows:
+        row = json_row(row)
+        yield json.dumps({'table': table_name, 'row': row} if table_name else row) + '\n'
+
+
+def iter_csv(rows, columns, batch_size=1000):
+    """Yield CSV text in batches of rows, header first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow(['' if row[c] is None else ('true' if row[c] is True else 'false' if row[c] is False
+                         else row[c].hex() if isinstance(row[c], bytes) else row[c]) for c in columns])
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_sql_inserts(rows, table_name, columns, dialect=None, batch_size=500):
+    """Yield multi-row INSERT statements of at most batch_size rows each."""
+    quote = (lambda name: quote_identifier(name, dialect)) if dialect else (lambda name: name)
+    head = f"INSERT INTO {quote(table_name)} ({', '.join(quote(c) for c in columns)}) VALUES\n"
+    batch = []
+    for row in rows:
+        values = '(' + ', '.join(sql_literal(row[c], dialect) for c in columns) + ')'
+        if dialect == 'oracle':
+            # Oracle has no multi-row VALUES list.
+            yield f"{head}{values};\n"
+            continue
+        batch.append(values)
+        if len(batch) >= batch_size:
+            yield head + ',\n'.join(batch) + ';\n'
+            batch = []
+    if batch:
+        yield head + ',\n'.join(batch) + ';\n'
@@ -0,0 +1,224 @@
+"""
+Per-column statistics for CSV, XLSX and the other tabular formats, in one pass.
+
+The file is read in DataFrame chunks and every statistic is updated with
+vectorized pandas/numpy operations on whole columns of a chunk. What is kept
+between chunks has a fixed size per column (counters, a HyperLogLog sketch and a
+Misra-Gries top-k summary), so memory does not depend on the number of rows.
+
+A column's type is the narrowest one all its non-empty values fit: boolean,
+integer, float, datetime (ISO 8601), otherwise string. Once a chunk rules a type
+out, later chunks skip parsing for it. Type checks and text statistics run on a
+chunk's distinct values, weighted by their counts, rather than on every cell.
+"""
+import pandas as pd
+
+import tabular
+from sketches import HyperLogLog, TopK
+from spreadsheet import CSV_CHUNK_ROWS, iter_sheet_frames, open_xlsx
+
+BOOLEAN_TEXT = ('true', 'false')
+
+
+def _scalar(value):
+    """numpy scalars as plain Python values for JSON."""
+    return value.item() if hasattr(value, 'item') else value
+
+
+class ColumnProfile:
+    def __init__(self, name, top_k=10):
+        self.name = name
+        self.count = 0
+        self.nulls = 0
+        self.maybe_boolean = True
+        self.maybe_numeric = True
+        self.maybe_integer = True
+        self.maybe_datetime = True
+        self.numeric_sum = 0.0
+        self.numeric_min = None
+        self.numeric_max = None
+        self.datetime_min = None
+        self.datetime_max = None
+        self.text_min = None
+        self.text_max = None
+        self.distinct = HyperLogLog()
+        self.top = TopK(top_k)
+
+    def update(self, series):
+        values = series.dropna()
+        self.nulls += len(series) - len(values)
+        if values.empty:
+            return
+        self.count += len(values)
+
+        # Everything but the numeric stats works on the chunk's distinct values,
+        # as text so a value is counted the same whichever dtype a chunk was read as.
+        counts = values.value_counts()
+        if pd.api.types.is_string_dtype(counts.index.dtype) and not pd.api.types.is_object_dtype(counts.index.dtype):
+            keys = counts.index
+        else:
+            keys = counts.index
+            if pd.api.types.is_float_dtype(keys.dtype) and ((keys % 1 == 0) & (abs(keys) < 2 ** 63)).all():
+                # Integer columns with blanks are read as float; show 1, not 1.0.
+                keys = keys.astype('int64')
+            keys = keys.astype(str)
+            counts = pd.Series(counts.to_numpy(), index=keys)
+        if not keys.is_unique:
+            counts = counts.groupby(level=0).sum()
+            keys = counts.index
+        self.distinct.update(keys)
+        self.top.update_counts(counts)
+        self.text_min = min(self.text_min, keys.min()) if self.text_min is not None else keys.min()
+        self.text_max = max(self.text_max, keys.max()) if self.text_max is not None else keys.max()
+
+        dtype = values.dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            self.maybe_numeric = self.maybe_datetime = False
+        elif pd.api.types.is_numeric_dtype(dtype):
+            self.maybe_boolean = self.maybe_datetime = False
+            self._update_numeric(values, None)
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            self.maybe_boolean = self.maybe_numeric = False
+            dates = values.dt.tz_localize('UTC') if values.dt.tz is None else values.dt.tz_convert('UTC')
+            self._update_datetime(dates)
+        else:
+            self._update_text(keys, counts.to_numpy())
+
+    def _update_text(self, keys, weights):
+        if self.maybe_boolean:
+            self.maybe_boolean = bool(keys.str.lower().isin(BOOLEAN_TEXT).all())
+        if self.maybe_numeric:
+            numbers = pd.to_numeric(pd.Series(keys), errors='coerce')
+            is_number = numbers.notna()
+            if is_number.any():
+                # Plain numbers are not read as dates.
+                self.maybe_datetime = False
+            if is_number.all():
+                self._update_numeric(numbers, weights)
+            else:
+                self.maybe_numeric = False
+        if self.maybe_datetime:
+            dates = pd.to_datetime(pd.Series(keys), errors='coerce', format='ISO8601', utc=True)
+            if dates.isna().any():
+                self.maybe_datetime = False
+            else:
+                self._update_datetime(dates)
+
+    def _update_numeric(self, numbers, weights):
+        if not self.maybe_numeric:
+            return
+        total = numbers.to_numpy(dtype=float)
+        self.numeric_sum += float((total * weights).sum() if weights is not None else total.sum())
+        low, high = numbers.min(), numbers.max()
+        self.numeric_min = low if self.numeric_min is None else min(self.numeric_min, low)
+        self.numeric_max = high if self.numeric_max is None else max(self.numeric_max, high)
+        if self.maybe_integer and not pd.api.types.is_integer_dtype(numbers.dtype):
+            self.maybe_integer = bool((numbers % 1 == 0).all())
+
+    def _update_datetime(self, dates):
+        if not self.maybe_datetime:
+            return
+        low, high = dates.min(), dates.max()
+        self.datetime_min = low if self.datetime_min is None else min(self.datetime_min, low)
+        self.datetime_max = high if self.datetime_max is None else max(self.datetime_max, high)
+
+    @property
+    def type(self):
+        if not self.count:
+            return 'empty'
+        if self.maybe_boolean:
+            return 'boolean'
+        if self.maybe_numeric:
+            return 'integer' if self.maybe_integer else 'float'
+        if self.maybe_datetime:
+            return 'datetime'
+        return 'string'
+
+    def result(self):
+        column_type = self.type
+        low = high = mean = None
+        if column_type in ('integer', 'float'):
+            low, high = _scalar(self.numeric_min), _scalar(self.numeric_max)
+            mean = self.numeric_sum / self.count
+            if column_type == 'integer':
+                low, high = int(low), int(high)
+        elif column_type == 'datetime':
+            low, high = self.datetime_min.isoformat(), self.datetime_max.isoformat()
+        elif column_type == 'string':
+            low, high = self.text_min, self.text_max
+        return {
+            'name': self.name,
+            'type': column_type,
+            'count': self.count,
+            'nulls': self.nulls,
+            'min': low,
+            'max': high,
+            'mean': mean,
+            'distinct': min(self.distinct.estimate(), self.count),
+            'top': [{'value': value, 'count': count} for value, count in self.top.top()],
+            'top_exact': self.top.exact,
+        }
+
+
+def profile_frames(frames, top_k=10):
+    """Profile an iterable of DataFrames sharing the same columns."""
+    profiles = None
+    rows = 0
+    for frame in frames:
+        if profiles is None:
+            profiles = [ColumnProfile(str(name), top_k) for name in frame.columns]
+        rows += len(frame)
+        for profile, (_, series) in zip(profiles, frame.items()):
+            profile.update(series)
+    return {
+        'rows': rows,
+        'columns': [profile.result() for profile in profiles or []],
+        # distinct counts come from HyperLogLog sketches and are estimates.
+        'distinct_approximate': True,
+    }
+
+
+def _csv_frames(source, encoding, chunk_rows):
+    reader = pd.read_csv(source, encoding=encoding, chunksize=chunk_rows)
+    with reader:
+        yield from reader
+
+
+def _arrow_frames(source, fmt, column_types):
+    schema, batches = tabular.read_batches(source, fmt, column_types=column_types)
+    for batch in batches:
+        yield batch.to_pandas()
+
+
+def profile_file(source, fmt, top_k=10, sheet=None, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Profile a seekable binary file object in one of tabular.FORMATS. CSV that is
+    not valid UTF-8 is profiled as latin1; sheet picks an XLSX worksheet by name.
+    An NDJSON column whose values stop fitting the inferred type is re-read as text.
+    """
+    if fmt == 'csv':
+        for encoding in ('utf-8', 'latin1'):
+            source.seek(0)
+            try:
+                return profile_frames(_csv_frames(source, encoding, chunk_rows), top_k)
+            except UnicodeDecodeError:
+                if encoding == 'latin1':
+                    raise
+    if fmt == 'xlsx':
+        workbook = open_xlsx(source)
+        try:
+            if sheet and sheet not in workbook.sheetnames:
+                raise ValueError(f"Unknown sheet: {sheet}")
+            worksheet = workbook[sheet] if sheet else workbook.active
+            return profile_frames(iter_sheet_frames(worksheet, chunk_rows), top_k)
+        finally:
+            workbook.close()
+    column_types = {}
+    while True:
+        source.seek(0)
+        try:
+            return profile_frames(_arrow_frames(source, fmt, column_types), top_k)
+        except tabular.ColumnTypeError as e:
+            if e.column in column_types:
+                raise
+            column_types[e.column] = tabular.pa.string()
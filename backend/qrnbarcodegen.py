@@ -2,10 +2,14 @@ import os
 import sys
 import io
 import base64
+import responsecache
+from xml.sax.saxutils import escape as xml_escape
 import qrcode
 from qrcode.image.svg import SvgImage
+import barcode
 from barcode import Code128
 from barcode.writer import ImageWriter  # for PNG output
+from PIL import Image, ImageColor, ImageOps
 
 def generate_qr_code_png(text, output_path):
     """
@@ -40,25 +44,286 @@ def generate_qr_code_svg(text, output_path):
     img.save(output_path)
     print(f"QR Code (SVG) saved to {output_path}")
 
-def generate_qr_code_base64(text):
+try:
+    from pylibdmtx.pylibdmtx import encode as dmtx_encode
+except ImportError:  # pylibdmtx or the native libdmtx library is missing
+    dmtx_encode = None
+
+SYMBOLOGIES = ('qr', 'code128', 'code39', 'ean13', 'upca', 'datamatrix')
+OUTPUT_FORMATS = ('png', 'svg')
+
+MIMETYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+ERROR_CORRECTION = {
+    'L': qrcode.constants.ERROR_CORRECT_L,
+    'M': qrcode.constants.ERROR_CORRECT_M,
+    'Q': qrcode.constants.ERROR_CORRECT_Q,
+    'H': qrcode.constants.ERROR_CORRECT_H,
+}
+
+# Pixels per module and quiet zone in modules when not given.
+DEFAULT_SIZE = {'qr': 10, 'datamatrix': 10}
+DEFAULT_BORDER = {'qr': 4, 'datamatrix': 2}
+DEFAULT_BAR_SIZE = 2
+DEFAULT_BAR_BORDER = 10
+MAX_SIZE = 50
+MAX_BORDER = 50
+# Linear barcodes: bar height and the human-readable line below, in modules.
+BAR_HEIGHT_MODULES = 60
+BAR_TEXT_MODULES = 14
+BARCODE_DPI = 300
+# Upper bounds on what one request may render: the payload length, checked before
+# encoding, and the output image's pixel count, checked before drawing it.
+MAX_TEXT_LENGTH = int(os.environ.get('CODE_MAX_TEXT_LENGTH', 4096))
+MAX_PIXELS = int(os.environ.get('CODE_MAX_PIXELS', 16 * 1024 * 1024))
+
+# Rendered codes are cached on everything that changes their bytes, so the same
+# URL or SKU is only rendered once. CODE_CACHE_DIR adds an on-disk tier shared
+# between workers (and the batch pool's processes) that survives restarts.
+code_cache = responsecache.ResponseCache(
+    'codes',
+    max_entries=int(os.environ.get('CODE_CACHE_SIZE', 10000)),
+    ttl=None,
+    disk_dir=os.environ.get('CODE_CACHE_DIR') or None,
+    max_bytes=int(os.environ.get('CODE_CACHE_BYTES', 64 * 1024 * 1024)),
+    disk_max_bytes=int(os.environ.get('CODE_CACHE_DISK_BYTES', 1024 * 1024 * 1024)),
+)
+
+def _hex_color(color):
+    """Any color PIL understands, as #rrggbb. Raises ValueError for unknown colors."""
+    return '#%02x%02x%02x' % ImageColor.getrgb(color)[:3]
+
+def qr_matrix(text, error_correction='L'):
     """
-    Generates a QR code in PNG format and returns it as a base64-encoded string.
+    The QR code's modules as rows of booleans (True is dark), without quiet zone.
     """
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
+    qr = qrcode.QRCode(error_correction=ERROR_CORRECTION[error_correction], border=0)
     qr.add_data(text)
     qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    
+    return qr.get_matrix()
+
+def datamatrix_matrix(text):
+    """
+    The DataMatrix (ECC 200) symbol's modules as rows of booleans, without quiet
+    zone. Needs pylibdmtx and the libdmtx library; raises RuntimeError without them.
+    """
+    if dmtx_encode is None:
+        raise RuntimeError("DataMatrix requires the 'pylibdmtx' package and the libdmtx library")
+    encoded = dmtx_encode(text.encode('utf-8'))
+    image = Image.frombytes('RGB', (encoded.width, encoded.height), encoded.pixels).convert('L')
+    # libdmtx draws scaled modules inside a margin. The solid left edge and the
+    # alternating top edge of the symbol give its bounds and the module size.
+    left, top, right, bottom = ImageOps.invert(image).getbbox()
+    pixels = image.load()
+    module = 1
+    while left + module < right and pixels[left + module, top] < 128:
+        module += 1
+    columns, rows = (right - left) // module, (bottom - top) // module
+    half = module // 2
+    return [[pixels[left + c * module + half, top + r * module + half] < 128 for c in range(columns)]
+            for r in range(rows)]
+
+def _bars(text, symbology):
+    """A linear barcode's modules ('1' is a bar) and its human-readable text."""
+    barcode_obj = barcode.get_barcode_class(symbology)(text)
+    return barcode_obj.build()[0], barcode_obj.get_fullcode()
+
+def _check_pixels(width_modules, height_modules, size):
+    """Raise ValueError when a code of this many modules at size pixels each exceeds MAX_PIXELS."""
+    width, height = width_modules * size, height_modules * size
+    if width * height > MAX_PIXELS:
+        raise ValueError(f"The code would be {width}x{height} pixels, over the limit of {MAX_PIXELS} pixels; "
+                         f"use a smaller size or shorter text")
+
+def matrix_svg(matrix, size, border, foreground='#000000', background='#ffffff'):
+    """
+    SVG for a module matrix: one path of horizontal runs in module units, scaled
+    by the viewBox, so no raster step and no element per module.
+    """
+    width, height = len(matrix[0]) + 2 * border, len(matrix) + 2 * border
+    path = []
+    for y, row in enumerate(matrix, start=border):
+        x = 0
+        count = len(row)
+        while x < count:
+            if row[x]:
+                start = x
+                while x < count and row[x]:
+                    x += 1
+                path.append(f'M{start + border} {y}h{x - start}v1h-{x - start}z')
+            else:
+                x += 1
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width * size}" height="{height * size}" '
+        f'viewBox="0 0 {width} {height}" shape-rendering="crispEdges">'
+        f'<rect width="{width}" height="{height}" fill="{background}"/>'
+        f'<path fill="{foreground}" d="{"".join(path)}"/></svg>'
+    ).encode('utf-8')
+
+def matrix_png(matrix, size, border, foreground='#000000', background='#ffffff'):
+    """
+    PNG for a module matrix: a two-color palette image with one pixel per module,
+    scaled up with nearest-neighbour, which Pillow stores at 1 bit per pixel.
+    """
+    width, height = len(matrix[0]) + 2 * border, len(matrix) + 2 * border
+    blank = bytes(width)
+    edge = bytes(border)
+    rows = [blank] * border + [edge + bytes(row) + edge for row in matrix] + [blank] * border
+    image = Image.frombytes('P', (width, height), b''.join(rows))
+    image.putpalette(ImageColor.getrgb(background)[:3] + ImageColor.getrgb(foreground)[:3])
+    image = image.resize((width * size, height * size), Image.NEAREST)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def bars_svg(bars, human, size, border, foreground='#000000', background='#ffffff'):
+    """SVG for a linear barcode, bars as one path and the text as a text element."""
+    width = len(bars) + 2 * border
+    height = BAR_HEIGHT_MODULES + BAR_TEXT_MODULES
+    path = []
+    x = 0
+    count = len(bars)
+    while x < count:
+        if bars[x] == '1':
+            start = x
+            while x < count and bars[x] == '1':
+                x += 1
+            path.append(f'M{start + border} 0h{x - start}v{BAR_HEIGHT_MODULES}h-{x - start}z')
+        else:
+            x += 1
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width * size}" height="{height * size}" '
+        f'viewBox="0 0 {width} {height}" shape-rendering="crispEdges">'
+        f'<rect width="{width}" height="{height}" fill="{background}"/>'
+        f'<path fill="{foreground}" d="{"".join(path)}"/>'
+        f'<text x="{width / 2}" y="{height - 3}" font-family="monospace" font-size="10" '
+        f'text-anchor="middle" fill="{foreground}">{xml_escape(human)}</text></svg>'
+    ).encode('utf-8')
+
+def render_qr_code(text, output_format='png', error_correction='L', size=10, border=4,
+                   foreground='black', background='white'):
+    """
+    Renders a QR code and returns the PNG or SVG bytes.
+    """
+    render = matrix_svg if output_format == 'svg' else matrix_png
+    matrix = qr_matrix(text, error_correction)
+    _check_pixels(len(matrix[0]) + 2 * border, len(matrix) + 2 * border, size)
+    return render(matrix, size, border, _hex_color(foreground), _hex_color(background))
+
+def render_datamatrix(text, output_format='png', size=10, border=2, foreground='black', background='white'):
+    """
+    Renders a DataMatrix code and returns the PNG or SVG bytes.
+    """
+    render = matrix_svg if output_format == 'svg' else matrix_png
+    matrix = datamatrix_matrix(text)
+    _check_pixels(len(matrix[0]) + 2 * border, len(matrix) + 2 * border, size)
+    return render(matrix, size, border, _hex_color(foreground), _hex_color(background))
+
+def render_barcode(text, output_format='png', symbology='code128', size=DEFAULT_BAR_SIZE, border=DEFAULT_BAR_BORDER,
+                   foreground='black', background='white'):
+    """
+    Renders a linear barcode (Code128, Code39, EAN-13, UPC-A) and returns the PNG
+    or SVG bytes. SVG is written directly; PNG goes through python-barcode's
+    ImageWriter, which draws the human-readable text.
+    """
+    foreground, background = _hex_color(foreground), _hex_color(background)
+    bars, human = _bars(text, symbology)
+    _check_pixels(len(bars) + 2 * border, BAR_HEIGHT_MODULES + BAR_TEXT_MODULES, size)
+    if output_format == 'svg':
+        return bars_svg(bars, human, size, border, foreground, background)
+    module_mm = size * 25.4 / BARCODE_DPI
+    # The text is sized in points; scale it with the modules like the SVG's.
+    font_pt = max(1, round(10 * size * 72 / BARCODE_DPI))
+    barcode_obj = barcode.get_barcode_class(symbology)(text, writer=ImageWriter())
     buffer = io.BytesIO()
-    img.save(buffer, format="PNG")
-    img_bytes = buffer.getvalue()
-    img_str = base64.b64encode(img_bytes).decode('utf-8')
-    return img_str
+    barcode_obj.write(buffer, options={
+        'module_width': module_mm,
+        'module_height': BAR_HEIGHT_MODULES * module_mm,
+        'quiet_zone': border * module_mm,
+        'font_size': font_pt,
+        # Distance to the text's baseline, so one line height below the bars.
+        'text_distance': font_pt * 25.4 / 72 + module_mm,
+        'foreground': foreground,
+        'background': background,
+        'dpi': BARCODE_DPI,
+    })
+    return buffer.getvalue()
+
+def code_options(symbology, error_correction='L', size=None, border=None, foreground='black', background='white'):
+    """
+    The rendering options for a symbology with defaults filled in and colors as
+    #rrggbb. Raises ValueError for an out-of-range or unknown option.
+    """
+    size = int(size) if size is not None else DEFAULT_SIZE.get(symbology, DEFAULT_BAR_SIZE)
+    border = int(border) if border is not None else DEFAULT_BORDER.get(symbology, DEFAULT_BAR_BORDER)
+    if not 1 <= size <= MAX_SIZE:
+        raise ValueError(f"size must be between 1 and {MAX_SIZE}")
+    if not 0 <= border <= MAX_BORDER:
+        raise ValueError(f"border must be between 0 and {MAX_BORDER}")
+    if symbology == 'qr':
+        if error_correction not in ERROR_CORRECTION:
+            raise ValueError(f"Unsupported error correction: {error_correction}. Use one of: {', '.join(ERROR_CORRECTION)}")
+    else:
+        # Only QR codes have an error correction level; keep it out of the key.
+        error_correction = None
+    colors = []
+    for color in (foreground, background):
+        try:
+            colors.append(_hex_color(color))
+        except ValueError:
+            raise ValueError(f"Unknown color: {color!r}")
+    return {'error_correction': error_correction, 'size': size, 'border': border,
+            'foreground': colors[0], 'background': colors[1]}
+
+def render_code(text, symbology='qr', output_format='png', cache=True, **options):
+    """
+    Renders text as a QR code, DataMatrix or linear barcode, reusing the cached
+    bytes of an identical earlier render.
+
+    Options (see code_options): size is pixels per module and border the quiet
+    zone in modules, both defaulting per symbology; error_correction (L, M, Q, H)
+    only applies to QR codes; foreground and background are any color PIL
+    understands ('black', '#336699', 'rgb(0,0,0)').
+    Raises ValueError for an unknown symbology, format or option, text the
+    symbology cannot encode, text over MAX_TEXT_LENGTH characters or a code over
+    MAX_PIXELS pixels, and RuntimeError when DataMatrix support is missing.
+    """
+    if len(text) > MAX_TEXT_LENGTH:
+        raise ValueError(f"Text is longer than {MAX_TEXT_LENGTH} characters")
+    if symbology not in SYMBOLOGIES:
+        raise ValueError(f"Unsupported symbology: {symbology}")
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported format: {output_format}")
+    options = code_options(symbology, **options)
+    error_correction, size, border, foreground, background = (
+        options['error_correction'], options['size'], options['border'], options['foreground'], options['background'])
+
+    key = responsecache.make_key(text, symbology, error_correction, size, border, foreground, background,
+                                 output_format) if cache else None
+    if key:
+        data = code_cache.get(key)
+        if data is not None:
+            return data
+    try:
+        if symbology == 'qr':
+            data = render_qr_code(text, output_format, error_correction, size, border, foreground, background)
+        elif symbology == 'datamatrix':
+            data = render_datamatrix(text, output_format, size, border, foreground, background)
+        else:
+            data = render_barcode(text, output_format, symbology, size, border, foreground, background)
+    except (ValueError, RuntimeError):
+        raise
+    except Exception as e:
+        raise ValueError(f"Cannot encode {text!r} as {symbology}: {e}")
+    if key:
+        code_cache.set(key, data)
+    return data
+
+def generate_qr_code_base64(text):
+    """
+    Generates a QR code in PNG format and returns it as a base64-encoded string.
+    """
+    return base64.b64encode(render_code(text, 'qr')).decode('utf-8')
 
 def generate_barcode_png(text, output_path):
     """
@@ -83,12 +348,7 @@ def generate_barcode_base64(text):
     """
     Generates a Code128 barcode in PNG format and returns it as a base64-encoded string.
     """
-    barcode_obj = Code128(text, writer=ImageWriter())
-    buffer = io.BytesIO()
-    barcode_obj.write(buffer)
-    img_bytes = buffer.getvalue()
-    img_str = base64.b64encode(img_bytes).decode('utf-8')
-    return img_str
+    return base64.b64encode(render_code(text, 'code128')).decode('utf-8')
 
 def main():
     if len(sys.argv) < 2:
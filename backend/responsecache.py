@@ -0,0 +1,239 @@
+"""
+Content-addressed response cache with an in-memory LRU tier and an optional
+on-disk tier. Values must be JSON-serializable or raw bytes.
+
+Both tiers can be bounded by size as well as by entry count: the memory tier
+evicts least recently used entries, the disk tier removes the oldest files.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_key(*parts):
+    """Build a cache key from any JSON-serializable parts."""
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _sizeof(value):
+    """Approximate bytes a value takes, as stored on disk."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    return len(json.dumps(value))
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with per-entry TTL.
+
+    max_entries    - entries kept in memory before the least recently used is evicted
+    ttl            - seconds an entry stays valid (None keeps entries until evicted)
+    disk_dir       - if set, entries are also written there and survive restarts
+    max_bytes      - if set, also evict from memory once values take more than this
+    disk_max_bytes - if set, remove the oldest files once disk_dir holds more than this;
+                     without it the disk tier is unbounded (an expired file is only
+                     removed when its key is read again), so set it with disk_dir
+    """
+
+    def __init__(self, name, max_entries=512, ttl=3600, disk_dir=None, max_bytes=None, disk_max_bytes=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        self._bytes = 0
+        self._disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        if disk_dir and disk_max_bytes is not None:
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at, size = entry
+                if not self._expired(stored_at):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self._bytes -= size
+
+        value, stored_at = self._disk_get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, value, stored_at)
+            return value
+
+    def set(self, key, value):
+        stored_at = time.time()
+        with self._lock:
+            self._store(key, value, stored_at)
+        self._disk_set(key, value)
+
+    def _store(self, key, value, stored_at):
+        size = _sizeof(value)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[2]
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Would evict everything else; such values are only kept on disk.
+            return
+        self._entries[key] = (value, stored_at, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key)
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None, None
+        path = self._disk_path(key)
+        try:
+            stat = os.stat(path)
+            stored_at = stat.st_mtime
+            if self._expired(stored_at):
+                os.remove(path)
+                self._disk_removed(stat.st_size)
+                return None, None
+            with open(path, 'rb') as f:
+                payload = f.read()
+        except OSError:
+            return None, None
+        kind, data = payload[:1], payload[1:]
+        if kind == b'B':
+            return data, stored_at
+        try:
+            return json.loads(data.decode('utf-8')), stored_at
+        except ValueError:
+            return None, None
+
+    def _disk_set(self, key, value):
+        if not self.disk_dir:
+            return
+        if isinstance(value, (bytes, bytearray)):
+            payload = b'B' + bytes(value)
+        else:
+            payload = b'J' + json.dumps(value).encode('utf-8')
+        path = self._disk_path(key)
+        # Write to a temp file and rename so readers never see a partial entry.
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            try:
+                replaced = os.stat(path).st_size
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        if self.disk_max_bytes is not None:
+            with self._lock:
+                self._disk_bytes += len(payload) - replaced
+                over = self._disk_bytes > self.disk_max_bytes
+            if over:
+                self._prune_disk()
+
+    def _disk_removed(self, size):
+        if self.disk_max_bytes is not None:
+            with self._lock:
+                self._disk_bytes -= size
+
+    def _disk_files(self):
+        """(mtime, size, path) of every entry file in disk_dir."""
+        files = []
+        try:
+            with os.scandir(self.disk_dir) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            pass
+        return files
+
+    def _prune_disk(self):
+        """
+        Remove the oldest files until disk_dir is back under 90% of disk_max_bytes.
+        The directory is scanned without holding the cache lock, and a thread that
+        finds another one already pruning leaves it to that one.
+        """
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                counted = self._disk_bytes
+            files = sorted(self._disk_files())
+            total = sum(size for _, size, _ in files)
+            target = self.disk_max_bytes * 0.9
+            evicted = 0
+            for _, size, path in files:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+            with self._lock:
+                # Resync with what was on disk, keeping writes made during the scan.
+                self._disk_bytes = total + self._disk_bytes - counted
+                self.disk_evictions += evicted
+        finally:
+            self._prune_lock.release()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "disk_tier": bool(self.disk_dir),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_bytes": self._disk_bytes if self.disk_dir and self.disk_max_bytes is not None else None,
+                "disk_evictions": self.disk_evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else None,
+            }
@@ -1,29 +1,161 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import requests
 import time
 import json
+import os
 import xml.dom.minidom
 import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import httpclient
+from metrics import percentile
 
 at_bp = Blueprint('api_tools', __name__, url_prefix='/api')
 # CORS(at_bp)
 
-@at_bp.route('/request', methods=['POST'])
-def make_request():
-    data = request.json
-    if not data:
-        return jsonify({"error": "No request data provided"}), 400
-    
+# Upper bound on how much of an upstream body the proxy will read (default 10MB).
+MAX_BODY_BYTES = int(os.environ.get("PROXY_MAX_BODY_BYTES", 10 * 1024 * 1024))
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Limits for the batch and load-test endpoints.
+MAX_BATCH_SIZE = 1000
+MAX_LOAD_TEST_ITERATIONS = 10000
+MAX_CONCURRENCY = 64
+DEFAULT_CONCURRENCY = 8
+# A batch answer carries every body, so each is capped lower and all of them share
+# a budget; once it is spent, later bodies are read and dropped ('body_omitted').
+BATCH_MAX_BODY_BYTES = int(os.environ.get("BATCH_MAX_BODY_BYTES", 1024 * 1024))
+BATCH_MAX_TOTAL_BODY_BYTES = int(os.environ.get("BATCH_MAX_TOTAL_BODY_BYTES", 64 * 1024 * 1024))
+
+ALLOWED_METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'PATCH')
+
+# Upstream headers forwarded as-is in raw pass-through mode.
+PASSTHROUGH_HEADERS = ('Content-Type', 'Content-Encoding', 'Cache-Control', 'ETag', 'Last-Modified')
+
+def _read_body(response, max_body_bytes, keep=True):
+    """
+    Read at most max_body_bytes of the upstream body, stopping the download early
+    once the limit is hit. With keep=False the chunks are only counted.
+    Returns (body_bytes or None, size, truncated, transfer_ms).
+    """
+    start = time.perf_counter()
+    chunks = []
+    size = 0
+    truncated = False
+    try:
+        for chunk in httpclient.iter_body(response, STREAM_CHUNK_SIZE):
+            if size + len(chunk) > max_body_bytes:
+                chunk = chunk[:max_body_bytes - size]
+                truncated = True
+            size += len(chunk)
+            if keep:
+                chunks.append(chunk)
+            if truncated:
+                break
+    finally:
+        response.close()
+    body = b''.join(chunks) if keep else None
+    return body, size, truncated, round((time.perf_counter() - start) * 1000, 2)
+
+def _decode_body(response, raw_body, truncated):
+    content_type = response.headers.get('Content-Type', '')
+    text = raw_body.decode(response.encoding or 'utf-8', errors='replace')
+
+    # A truncated document can't be parsed, so hand back the partial text.
+    if truncated:
+        return text
+    if 'application/json' in content_type:
+        try:
+            return json.loads(text)
+        except:
+            return text
+    elif 'application/xml' in content_type or 'text/xml' in content_type:
+        try:
+            dom = xml.dom.minidom.parseString(text)
+            return dom.toprettyxml()
+        except:
+            return text
+    return text
+
+def _server_timing(timings):
+    return ', '.join(
+        f"{phase[:-3]};dur={value}" for phase, value in timings.items() if value is not None
+    )
+
+def _passthrough_response(response, max_body_bytes, timings, request_id):
+    """Stream upstream bytes to the client untouched, up to max_body_bytes."""
+    headers = {name: response.headers[name] for name in PASSTHROUGH_HEADERS if name in response.headers}
+    content_length = response.headers.get('Content-Length')
+    if content_length and content_length.isdigit() and int(content_length) <= max_body_bytes:
+        headers['Content-Length'] = content_length
+    headers['Server-Timing'] = _server_timing(timings)
+    headers['X-Request-Id'] = request_id
+    headers['X-Connection-Reused'] = str(response.connection_reused).lower()
+    headers['X-Max-Body-Bytes'] = str(max_body_bytes)
+
+    def generate():
+        sent = 0
+        try:
+            for chunk in httpclient.iter_body(response, STREAM_CHUNK_SIZE, decode=False):
+                if sent + len(chunk) > max_body_bytes:
+                    yield chunk[:max_body_bytes - sent]
+                    break
+                sent += len(chunk)
+                yield chunk
+        finally:
+            response.close()
+
+    return Response(stream_with_context(generate()), status=response.status_code, headers=headers)
+
+def validate_spec(data):
+    """Return why a make_request-style spec is malformed, or None if it can be sent."""
+    if not isinstance(data, dict):
+        return "Each request must be an object"
+    method = data.get('method', 'GET')
+    if not isinstance(method, str):
+        return "method must be a string"
+    if method.upper() not in ALLOWED_METHODS:
+        return f"Unsupported HTTP method: {method}"
+    url = data.get('url')
+    if not url:
+        return "URL is required"
+    if not isinstance(url, str):
+        return "url must be a string"
+    for key in ('headers', 'params'):
+        if data.get(key) is not None and not isinstance(data[key], dict):
+            return f"{key} must be an object"
+    timeout = data.get('timeout', 30)
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+        return "timeout must be a positive number"
+    max_body_bytes = data.get('max_body_bytes', 0)
+    if isinstance(max_body_bytes, bool) or not isinstance(max_body_bytes, int):
+        return "max_body_bytes must be an integer"
+    if max_body_bytes < 0:
+        return "max_body_bytes must not be negative"
+    return None
+
+def execute_request(data, allow_raw=True, keep_body=True, body_limit=MAX_BODY_BYTES, client_session=None):
+    """
+    Run one proxied request described by a make_request-style spec.
+    Returns (result, status_code); result is a JSON-ready dict, or a streaming
+    Response when the spec asks for raw pass-through and allow_raw is set.
+    body_limit caps max_body_bytes; with keep_body=False the body is read and
+    counted but neither it nor the headers are returned.
+    """
+    error = validate_spec(data)
+    if error:
+        return {"error": error}, 400
+
     method = data.get('method', 'GET').upper()
     url = data.get('url')
-    headers = data.get('headers', {})
+    headers = data.get('headers') or {}
     body = data.get('body')
-    params = data.get('params', {})
+    params = data.get('params') or {}
     timeout = data.get('timeout', 30)
-    
-    if not url:
-        return jsonify({"error": "URL is required"}), 400
+    http2 = data.get('http2')
+    raw = allow_raw and bool(data.get('raw', False))
+    max_body_bytes = min(data.get('max_body_bytes', body_limit), body_limit)
     
     try:
         if body and isinstance(body, str):
@@ -32,59 +164,209 @@ def make_request():
             except:
                 pass
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         if method == 'GET':
-            response = requests.get(url, headers=headers, params=params, timeout=timeout)
-        elif method == 'POST':
-            response = requests.post(url, headers=headers, json=body, params=params, timeout=timeout)
-        elif method == 'PUT':
-            response = requests.put(url, headers=headers, json=body, params=params, timeout=timeout)
-        elif method == 'DELETE':
-            response = requests.delete(url, headers=headers, json=body, params=params, timeout=timeout)
-        elif method == 'PATCH':
-            response = requests.patch(url, headers=headers, json=body, params=params, timeout=timeout)
+            response = httpclient.request(method, url, http2=http2, client_session=client_session,
+                                          headers=headers, params=params, timeout=timeout, stream=True)
         else:
-            return jsonify({"error": f"Unsupported HTTP method: {method}"}), 400
-        
-        elapsed_time = time.time() - start_time
+            response = httpclient.request(method, url, http2=http2, client_session=client_session,
+                                          headers=headers, json=body, params=params, timeout=timeout, stream=True)
 
-        content_type = response.headers.get('Content-Type', '')
-        response_body = None
-        
-        if 'application/json' in content_type:
-            try:
-                response_body = response.json()
-            except:
-                response_body = response.text
-        elif 'application/xml' in content_type or 'text/xml' in content_type:
-            try:
-                dom = xml.dom.minidom.parseString(response.text)
-                response_body = dom.toprettyxml()
-            except:
-                response_body = response.text
-        else:
-            response_body = response.text
-        
         request_id = str(uuid.uuid4())
-        
+        timings = dict(response.timings)
+
+        if raw:
+            return _passthrough_response(response, max_body_bytes, timings, request_id), response.status_code
+
+        raw_body, body_bytes, truncated, transfer_ms = _read_body(response, max_body_bytes, keep=keep_body)
+        elapsed_time = time.perf_counter() - start_time
+        timings['transfer_ms'] = transfer_ms
+
         result = {
             "status_code": response.status_code,
-            "headers": dict(response.headers),
-            "body": response_body,
             "elapsed_ms": round(elapsed_time * 1000, 2),
+            "timing": timings,
+            "body_bytes": body_bytes,
+            "truncated": truncated,
+            "connection_reused": response.connection_reused,
+            "http_version": httpclient.response_http_version(response),
             "request_id": request_id
         }
+        if keep_body:
+            result["headers"] = dict(response.headers)
+            result["body"] = _decode_body(response, raw_body, truncated)
         
-        return jsonify(result), 200
+        return result, 200
     
     except requests.exceptions.Timeout:
-        return jsonify({"error": f"Request timed out after {timeout} seconds"}), 408
+        return {"error": f"Request timed out after {timeout} seconds"}, 408
     except requests.exceptions.ConnectionError:
-        return jsonify({"error": "Failed to establish connection to the server"}), 502
+        return {"error": "Failed to establish connection to the server"}, 502
     except requests.exceptions.TooManyRedirects:
-        return jsonify({"error": "Too many redirects"}), 400
+        return {"error": "Too many redirects"}, 400
+    except RuntimeError as e:
+        return {"error": str(e)}, 400
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": f"Request error: {str(e)}"}), 500
+        return {"error": f"Request error: {str(e)}"}, 500
     except Exception as e:
-        return jsonify({"error": f"Error: {str(e)}"}), 500
\ No newline at end of file
+        return {"error": f"Error: {str(e)}"}, 500
+
+def _summarize(results, wall_time):
+    """Aggregate latency and outcome statistics over a list of execute_request results."""
+    latencies = sorted(r["elapsed_ms"] for r in results if "elapsed_ms" in r)
+    status_counts = {}
+    for r in results:
+        key = str(r.get("status_code", "error"))
+        status_counts[key] = status_counts.get(key, 0) + 1
+
+    return {
+        "total": len(results),
+        "succeeded": len(latencies),
+        "failed": len(results) - len(latencies),
+        "status_counts": status_counts,
+        "latency_ms": {
+            "min": latencies[0] if latencies else None,
+            "max": latencies[-1] if latencies else None,
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else None,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+        },
+        "connections_reused": sum(1 for r in results if r.get("connection_reused")),
+        "wall_time_ms": round(wall_time * 1000, 2),
+        "throughput_rps": round(len(results) / wall_time, 2) if wall_time > 0 else None,
+    }
+
+class _BodyBudget:
+    """Bytes of response body a batch may still hold, shared by its workers."""
+
+    def __init__(self, total):
+        self.remaining = total
+        self._lock = threading.Lock()
+
+    def reserve(self, wanted):
+        with self._lock:
+            granted = min(wanted, self.remaining)
+            self.remaining -= granted
+            return granted
+
+    def release(self, unused):
+        with self._lock:
+            self.remaining += unused
+
+def _run_concurrently(specs, concurrency, keep_body):
+    """
+    Run specs with at most 'concurrency' in flight; results keep the input order.
+    The requests go through a pool of their own sized to the concurrency, so
+    connection reuse is not limited by the shared pool's per-host size.
+    """
+    budget = _BodyBudget(BATCH_MAX_TOTAL_BODY_BYTES)
+    client_session = httpclient.build_session(pool_maxsize=concurrency)
+
+    def run(spec):
+        granted = budget.reserve(min(spec.get('max_body_bytes', BATCH_MAX_BODY_BYTES), BATCH_MAX_BODY_BYTES)) if keep_body else 0
+        result, status = execute_request(spec, allow_raw=False, keep_body=granted > 0,
+                                         body_limit=granted or BATCH_MAX_BODY_BYTES, client_session=client_session)
+        if keep_body:
+            budget.release(granted - result.get("body_bytes", 0) if granted else 0)
+            if not granted and status == 200:
+                result["body_omitted"] = True
+        if status != 200:
+            result = dict(result, status_code=status)
+        return result
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(run, specs))
+    finally:
+        client_session.close()
+    return results, time.perf_counter() - start
+
+def _parse_concurrency(data):
+    concurrency = int(data.get('concurrency', DEFAULT_CONCURRENCY))
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    return min(concurrency, MAX_CONCURRENCY)
+
+@at_bp.route('/request', methods=['POST'])
+def make_request():
+    """
+    Proxy a request to 'url' and report the response with a timing breakdown.
+
+    Optional fields besides method/url/headers/body/params/timeout:
+        http2          - send over HTTP/2 (needs httpx[http2])
+        max_body_bytes - stop reading the upstream body after this many bytes
+                         (capped at PROXY_MAX_BODY_BYTES); 'truncated' tells if it was hit
+        raw            - stream the upstream bytes back as-is instead of wrapping them in
+                         JSON; timings are sent in the Server-Timing header
+    """
+    data = request.json
+    if not data:
+        return jsonify({"error": "No request data provided"}), 400
+
+    result, status = execute_request(data)
+    if isinstance(result, Response):
+        return result
+    return jsonify(result), status
+
+@at_bp.route('/request/batch', methods=['POST'])
+def batch_request():
+    """
+    Run a list of request specs (same shape as /request) concurrently.
+    Body: {"requests": [...], "concurrency": 8}
+    Each body is capped at BATCH_MAX_BODY_BYTES and all bodies together at
+    BATCH_MAX_TOTAL_BODY_BYTES; results past that have 'body_omitted' set.
+    """
+    data = request.json
+    if not data or not isinstance(data.get('requests'), list) or not data['requests']:
+        return jsonify({"error": "A non-empty 'requests' list is required"}), 400
+
+    specs = data['requests']
+    if len(specs) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Too many requests, max batch size is {MAX_BATCH_SIZE}"}), 400
+    try:
+        concurrency = _parse_concurrency(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid concurrency: {str(e)}"}), 400
+    for index, spec in enumerate(specs):
+        error = validate_spec(spec)
+        if error:
+            return jsonify({"error": f"requests[{index}]: {error}"}), 400
+
+    results, wall_time = _run_concurrently(specs, concurrency, keep_body=True)
+    return jsonify({
+        "results": results,
+        "summary": dict(_summarize(results, wall_time), concurrency=concurrency)
+    }), 200
+
+@at_bp.route('/request/load-test', methods=['POST'])
+def load_test():
+    """
+    Send one request spec 'iterations' times at a fixed concurrency and report
+    latency percentiles and throughput. Response bodies are not returned.
+    Body: {"request": {...}, "iterations": 100, "concurrency": 8}
+    """
+    data = request.json
+    if not data or not isinstance(data.get('request'), dict):
+        return jsonify({"error": "A 'request' object is required"}), 400
+
+    try:
+        iterations = int(data.get('iterations', 10))
+        concurrency = _parse_concurrency(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid load test parameters: {str(e)}"}), 400
+    if iterations < 1 or iterations > MAX_LOAD_TEST_ITERATIONS:
+        return jsonify({"error": f"iterations must be between 1 and {MAX_LOAD_TEST_ITERATIONS}"}), 400
+    error = validate_spec(data['request'])
+    if error:
+        return jsonify({"error": error}), 400
+
+    # Bodies are read and counted but not kept; only timings and status are.
+    results, wall_time = _run_concurrently([data['request']] * iterations, concurrency, keep_body=False)
+    errors = sorted({r["error"] for r in results if "error" in r})
+    return jsonify({
+        "summary": dict(_summarize(results, wall_time), concurrency=concurrency),
+        "errors": errors[:10]
+    }), 200
@@ -3,19 +3,84 @@ from flask_cors import CORS
 import json
 import re
 import os
-import google.generativeai as genai
-import yaml
-
-GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
-genai.configure(api_key=GOOGLE_API_KEY)
-
-model = genai.GenerativeModel('gemini-2.0-flash-thinking-exp-01-21')
+import time
+from concurrent.futures import ThreadPoolExecutor
+import responsecache
+import llmclient
+from chunking import split_for_formatting
+from localformat import format_json_local, format_xml_local, format_yaml_local
+from localvalidate import check_syntax, describe_errors, FULL_PARSE_LANGUAGES
 
 cfv_bp = Blueprint('code_formatters', __name__, url_prefix='/api')
 # CORS(cfv_bp)
 
+# Bump whenever a prompt below changes so stale cached answers are not reused.
+PROMPT_VERSION = 1
+
+# Model answers are cached on a hash of the input and settings.
+# FORMAT_CACHE_DIR enables an on-disk tier shared between workers and restarts,
+# kept under FORMAT_CACHE_DISK_BYTES by removing the oldest files.
+gemini_cache = responsecache.ResponseCache(
+    'code_formatters',
+    max_entries=int(os.environ.get('FORMAT_CACHE_SIZE', 512)),
+    ttl=int(os.environ.get('FORMAT_CACHE_TTL', 3600)),
+    disk_dir=os.environ.get('FORMAT_CACHE_DIR') or None,
+    disk_max_bytes=int(os.environ.get('FORMAT_CACHE_DISK_BYTES', 256 * 1024 * 1024)),
+)
+
+def generate_cached(prompt, generation_config, key_parts, route='format'):
+    """
+    Return the model's text answer for prompt, reusing a cached answer for the same key_parts.
+    Failed calls raise as before and are never cached.
+    """
+    key = responsecache.make_key(PROMPT_VERSION, *key_parts)
+    text = gemini_cache.get(key)
+    if text is None:
+        text = llmclient.generate(prompt, route, generation_config=generation_config)
+        gemini_cache.set(key, text)
+    return text
+
+# Inputs longer than this are split at top-level boundaries so each model call stays
+# well inside the 4096-token output limit; chunks are formatted FORMAT_CHUNK_WORKERS at a time.
+FORMAT_CHUNK_CHARS = int(os.environ.get('FORMAT_CHUNK_CHARS', 6000))
+FORMAT_CHUNK_WORKERS = int(os.environ.get('FORMAT_CHUNK_WORKERS', 4))
+
+def format_in_chunks(chunks, join, language, indent_type='spaces', indent_size=4):
+    """
+    Format chunks in parallel and reassemble them in order.
+    A chunk that fails keeps its original text and its error is reported.
+    """
+    def format_chunk(chunk):
+        start = time.perf_counter()
+        result = format_with_gemini(chunk, language, indent_type, indent_size, allow_chunking=False)
+        return result, round((time.perf_counter() - start) * 1000, 2)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=FORMAT_CHUNK_WORKERS) as executor:
+        outcomes = list(executor.map(format_chunk, chunks))
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    chunk_report = []
+    errors = []
+    for index, (chunk, (result, chunk_ms)) in enumerate(zip(chunks, outcomes)):
+        chunk_report.append({"index": index, "chars": len(chunk), "elapsed_ms": chunk_ms, "errors": result["errors"]})
+        if result["errors"]:
+            errors.append(f"Chunk {index + 1}: {result['errors']}")
+
+    return {
+        "formatted_code": join([result["formatted_code"] for result, _ in outcomes]),
+        "errors": "\n".join(errors) if errors else None,
+        "chunks": chunk_report,
+        "elapsed_ms": elapsed_ms
+    }
+
 # Helper functions for formatting and validation using Gemini
-def format_with_gemini(code, language, indent_type='spaces', indent_size=4):
+def format_with_gemini(code, language, indent_type='spaces', indent_size=4, allow_chunking=True):
+    if allow_chunking and len(code) > FORMAT_CHUNK_CHARS:
+        chunks, join = split_for_formatting(code, language, FORMAT_CHUNK_CHARS, indent_type, indent_size)
+        if len(chunks) > 1:
+            return format_in_chunks(chunks, join, language, indent_type, indent_size)
+
     try:
         prompt = f"""
         Format the following {language} code according to best practices.
@@ -28,12 +93,11 @@ def format_with_gemini(code, language, indent_type='spaces', indent_size=4):
         ```
         """
         
-        response = model.generate_content(prompt, generation_config={
+        formatted_text = generate_cached(prompt, {
             'temperature': 0.1,  
             'top_p': 0.95,
             'max_output_tokens': 4096
-        })
-        formatted_text = response.text.strip()
+        }, ('format', code, language, indent_type, indent_size)).strip()
 
         code_block_pattern = r"```[\w]*\n([\s\S]*?)\n```"
         match = re.search(code_block_pattern, formatted_text)
@@ -98,15 +162,13 @@ def validate_with_gemini(code, language):
         ```
         """
         
-        response = model.generate_content(prompt, generation_config={
+        result = generate_cached(prompt, {
             'temperature': 0.05,  #lower temperature for stricter deterministic responses
             'top_p': 0.9,
             'top_k': 20,          # constraining responses
             'max_output_tokens': 1024,
             'response_mime_type': 'text/plain'  # plain text response
-        })
-        
-        result = response.text.strip()
+        }, ('validate', code, language), route='validate').strip()
         
         #paarse the response with improveed structure handling
         if "STATUS: VALID" in result:
@@ -152,20 +214,17 @@ def format_css(code):
 def format_c(code):
     return format_with_gemini(code, "c")
 
-def format_json(code, indent_type='spaces', indent_size=4):
+def format_json(code, indent_type='spaces', indent_size=4, use_model=False):
     try:
-        #native JSON parsing for validation if possible
-        parsed = json.loads(code)
-        
-        # Calculates indentation string
-        indent_str = ' ' * indent_size if indent_type == 'spaces' else '\t'
-        
-        # Use Gemini for formatting
+        formatted_code = format_json_local(code, indent_type, indent_size)
+        if not use_model:
+            return {"formatted_code": formatted_code, "errors": None}
+
+        # Use Gemini for formatting only when explicitly asked to
         gemini_result = format_with_gemini(code, "json", indent_type, indent_size)
         
-        # As a fallback, use Python's json.dumps if Gemini fails
+        # As a fallback, use the local formatting if Gemini fails
         if gemini_result["errors"]:
-            formatted_code = json.dumps(parsed, indent=indent_str)
             return {"formatted_code": formatted_code, "errors": None}
         return gemini_result
     except json.JSONDecodeError as e:
@@ -173,43 +232,75 @@ def format_json(code, indent_type='spaces', indent_size=4):
     except Exception as e:
         return {"formatted_code": code, "errors": str(e)}
 
-def format_xml(code, indent_type='spaces', indent_size=4):
+def format_xml(code, indent_type='spaces', indent_size=4, use_model=False):
     try:
-        # attempt to parse XML to validate it
-        import xml.dom.minidom as minidom
-        parsed = minidom.parseString(code)
-        
-        # Use Gemini for formatting
-        return format_with_gemini(code, "xml", indent_type, indent_size)
+        formatted_code = format_xml_local(code, indent_type, indent_size)
+        if not use_model:
+            return {"formatted_code": formatted_code, "errors": None}
+
+        gemini_result = format_with_gemini(code, "xml", indent_type, indent_size)
+        if gemini_result["errors"]:
+            return {"formatted_code": formatted_code, "errors": None}
+        return gemini_result
     except Exception as e:
         return {"formatted_code": code, "errors": str(e)}
 
-def format_yaml(code, indent_type='spaces', indent_size=4):
+def format_yaml(code, indent_type='spaces', indent_size=4, use_model=False):
     try:
-        # First try native YAML parsing for validation
-        parsed = yaml.safe_load(code)
-        
-        # Use Gemini for formatting
-        return format_with_gemini(code, "yaml", indent_type, indent_size)
+        formatted_code = format_yaml_local(code, indent_type, indent_size)
+        if not use_model:
+            return {"formatted_code": formatted_code, "errors": None}
+
+        gemini_result = format_with_gemini(code, "yaml", indent_type, indent_size)
+        if gemini_result["errors"]:
+            return {"formatted_code": formatted_code, "errors": None}
+        return gemini_result
     except Exception as e:
         return {"formatted_code": code, "errors": str(e)}
 
-def validate_python(code):
-    return validate_with_gemini(code, "python")
+def validation_from_format(format_result):
+    return {"valid": format_result["errors"] is None, "errors": format_result["errors"]}
+
+def tiered_validate(code, language, analyze=False):
+    """
+    Check syntax locally first and return any errors immediately.
+    Gemini is only asked for style and best-practice analysis when analyze is set.
+
+    Only Python is fully parsed locally. For the other languages the local check
+    covers bracket/tag balance alone, so a clean result is not a verdict and
+    Gemini is still asked whether the code is valid.
+    """
+    syntax_errors = check_syntax(code, language)
+    checked = "syntax" if language in FULL_PARSE_LANGUAGES else "syntax-balance-only"
+    if syntax_errors:
+        return {"valid": False, "errors": describe_errors(syntax_errors), "syntax_errors": syntax_errors,
+                "checked_by": "local", "checked": checked}
+    if not analyze and checked == "syntax":
+        return {"valid": True, "errors": None, "syntax_errors": [], "checked_by": "local", "checked": checked}
+
+    result = validate_with_gemini(code, language)
+    result["syntax_errors"] = []
+    result["checked_by"] = "model"
+    result["checked"] = "model"
+    return result
+
+def validate_python(code, analyze=False):
+    return tiered_validate(code, "python", analyze)
 
-def validate_javascript(code):
-    return validate_with_gemini(code, "javascript")
+def validate_javascript(code, analyze=False):
+    return tiered_validate(code, "javascript", analyze)
 
-def validate_html(code):
-    return validate_with_gemini(code, "html")
+def validate_html(code, analyze=False):
+    return tiered_validate(code, "html", analyze)
 
-def validate_css(code):
-    return validate_with_gemini(code, "css")
+def validate_css(code, analyze=False):
+    return tiered_validate(code, "css", analyze)
 
-def validate_c(code):
-    return validate_with_gemini(code, "c")
+def validate_c(code, analyze=False):
+    return tiered_validate(code, "c", analyze)
 
 @cfv_bp.route('/format', methods=['POST'])
+@llmclient.deferrable
 def format_code():
     data = request.json
     if not data:
@@ -221,6 +312,9 @@ def format_code():
     #(default: 4 spaces)
     indent_type = data.get('indent_type', 'spaces')
     indent_size = data.get('indent_size', 4)
+
+    # json/xml/yaml are formatted locally; set use_model to have Gemini format them instead
+    use_model = bool(data.get('use_model', False))
     
     if not code:
         return jsonify({"error": "No code provided"}), 400
@@ -234,10 +328,10 @@ def format_code():
         'js': lambda c: format_with_gemini(c, 'javascript', indent_type, indent_size),
         'html': lambda c: format_with_gemini(c, 'html', indent_type, indent_size),
         'css': lambda c: format_with_gemini(c, 'css', indent_type, indent_size),
-        'json': lambda c: format_json(c, indent_type, indent_size),
-        'xml': lambda c: format_xml(c, indent_type, indent_size),
-        'yaml': lambda c: format_yaml(c, indent_type, indent_size),
-        'yml': lambda c: format_yaml(c, indent_type, indent_size),
+        'json': lambda c: format_json(c, indent_type, indent_size, use_model),
+        'xml': lambda c: format_xml(c, indent_type, indent_size, use_model),
+        'yaml': lambda c: format_yaml(c, indent_type, indent_size, use_model),
+        'yml': lambda c: format_yaml(c, indent_type, indent_size, use_model),
         'c': lambda c: format_with_gemini(c, 'c', indent_type, indent_size)
     }
     
@@ -249,6 +343,7 @@ def format_code():
     return jsonify(result), 201
 
 @cfv_bp.route('/validate', methods=['POST'])
+@llmclient.deferrable
 def validate_code():
     data = request.json
     if not data:
@@ -262,18 +357,21 @@ def validate_code():
     
     if not language:
         return jsonify({"error": "No language specified"}), 400
+
+    # Syntax is checked locally; set analyze to also get Gemini's style/best-practice review
+    analyze = bool(data.get('analyze', False))
     
     validators = {
-        'python': validate_python,
-        'javascript': validate_javascript,
-        'js': validate_javascript,
-        'html': validate_html,
-        'css': validate_css,
-        'c': validate_c,
-        'json': lambda c: {"valid": format_json(c)["errors"] is None, "errors": format_json(c)["errors"]},
-        'xml': lambda c: {"valid": format_xml(c)["errors"] is None, "errors": format_xml(c)["errors"]},
-        'yaml': lambda c: {"valid": format_yaml(c)["errors"] is None, "errors": format_yaml(c)["errors"]},
-        'yml': lambda c: {"valid": format_yaml(c)["errors"] is None, "errors": format_yaml(c)["errors"]}
+        'python': lambda c: validate_python(c, analyze),
+        'javascript': lambda c: validate_javascript(c, analyze),
+        'js': lambda c: validate_javascript(c, analyze),
+        'html': lambda c: validate_html(c, analyze),
+        'css': lambda c: validate_css(c, analyze),
+        'c': lambda c: validate_c(c, analyze),
+        'json': lambda c: validation_from_format(format_json(c)),
+        'xml': lambda c: validation_from_format(format_xml(c)),
+        'yaml': lambda c: validation_from_format(format_yaml(c)),
+        'yml': lambda c: validation_from_format(format_yaml(c))
     }
     
     validator = validators.get(language)
@@ -281,4 +379,8 @@ def validate_code():
         return jsonify({"error": f"Validation not supported for language: {language}"}), 400
     
     result = validator(code)
-    return jsonify(result), 201
\ No newline at end of file
+    return jsonify(result), 201
+
+@cfv_bp.route('/format/cache-stats', methods=['GET'])
+def format_cache_stats():
+    return jsonify(gemini_cache.stats()), 200
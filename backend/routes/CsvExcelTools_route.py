@@ -1,86 +1,289 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 import pandas as pd
 from io import BytesIO
 import os
+import re
+import json
 import mimetypes
+import tempfile
+from spreadsheet import csv_to_xlsx, open_xlsx, iter_sheet_csv
+from streamzip import iter_zip
+from downloads import content_disposition
+import tabular
+from profiling import profile_file
+import ingest
 
 cet_bp = Blueprint('cet', __name__, url_prefix='/api')
+
+# CSV uploads are converted in chunks through a temp file, so this only bounds disk use.
+CSV_TO_EXCEL_MAX_BYTES = int(os.environ.get('CSV_TO_EXCEL_MAX_BYTES', 512 * 1024 * 1024))
+EXCEL_TO_CSV_MAX_BYTES = int(os.environ.get('EXCEL_TO_CSV_MAX_BYTES', 256 * 1024 * 1024))
+TABLE_CONVERT_MAX_BYTES = int(os.environ.get('TABLE_CONVERT_MAX_BYTES', 512 * 1024 * 1024))
+PROFILE_MAX_TOP_K = 100
 # CORS(cet_bp)
 
+def _uploaded_file(extensions, format_error, max_size, detach=False):
+    """
+    Shared validation for the conversion uploads. Returns (upload, None), with an
+    ingest.Upload read under max_size bytes, or (None, error_response) when the
+    request has no usable file. detach keeps the upload open past the request,
+    for streamed responses.
+    """
+    try:
+        file = ingest.file_field('file', max_size)
+        
+        if not file.filename.lower().endswith(tuple(extensions)):
+            return None, (jsonify({"error": format_error}), 400)
+        
+        if file.filename.lower().endswith('.csv'):
+            mime_type = file.content_type
+            if not mime_type or 'csv' not in mime_type.lower() and 'text/plain' not in mime_type.lower():
+                return None, (jsonify({"error": "Invalid file type. Expected CSV content"}), 400)
+        return ingest.receive(file, max_size, detach), None
+    except ingest.UploadError as e:
+        return None, (jsonify({"error": e.message}), e.status)
+
 @cet_bp.route('/csv-to-excel', methods=['POST'])
 def csv_to_excel():
-    max_size = 10 * 1024 * 1024 
-    if request.content_length > max_size:
-        return jsonify({"error": "File too large, max size is 10MB"}), 413
-    
-    if 'file' not in request.files:
-        return jsonify({"error": "No file part"}), 400
-    
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({"error": "No selected file"}), 400
-    
-    if not file.filename.endswith('.csv'):
-        return jsonify({"error": "Invalid file format. Please upload a CSV file"}), 400
-    
-    mime_type = file.content_type
-    if not mime_type or 'csv' not in mime_type.lower() and 'text/plain' not in mime_type.lower():
-        return jsonify({"error": "Invalid file type. Expected CSV content"}), 400
+    upload, error = _uploaded_file(['.csv'], "Invalid file format. Please upload a CSV file", CSV_TO_EXCEL_MAX_BYTES)
+    if error:
+        return error
     
     try:
-        file_data = file.read()
-        file_stream = BytesIO(file_data)
-        
+        # The upload is already spooled to disk; read the CSV from there in chunks
+        # and build the workbook in a temp file rather than in memory.
+        output = tempfile.TemporaryFile()
         try:
-            df = pd.read_csv(file_stream)
-        except UnicodeDecodeError:
-            file_stream.seek(0)
-            df = pd.read_csv(file_stream, encoding='latin1')
-        except pd.errors.ParserError:
+            rows, sheets = csv_to_xlsx(upload.file, output)
+        except (pd.errors.ParserError, pd.errors.EmptyDataError):
+            output.close()
             return jsonify({"error": "CSV parsing error. The file appears to be malformed"}), 400
-        
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl', mode='w') as writer:
-            writer.book.security.lockStructure = True
-            
-            df.to_excel(writer, index=False)
-            
         output.seek(0)
         
-        return send_file(
+        response = send_file(
             output,
             as_attachment=True,
-            download_name=os.path.splitext(file.filename)[0] + '.xlsx',
+            download_name=os.path.splitext(upload.filename)[0] + '.xlsx',
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
+        response.headers['X-Row-Count'] = str(rows)
+        response.headers['X-Sheet-Count'] = str(sheets)
+        return response
     except Exception as e:
         return jsonify({"error": f"Error processing file: {str(e)}"}), 500
+    finally:
+        upload.close()
+
+def _sheet_file_name(sheet_name):
+    return re.sub(r'[^\w.-]+', '_', sheet_name).strip('_') or 'sheet'
+
+def _sheet_file_names(names):
+    """
+    Zip member names for sheets, made unique with -2, -3... when two sheet names
+    sanitize to the same file name (compared case-insensitively, like most file systems).
+    """
+    used = set()
+    file_names = []
+    for name in names:
+        base = _sheet_file_name(name)
+        candidate, suffix = base, 1
+        while candidate.lower() in used:
+            suffix += 1
+            candidate = f"{base}-{suffix}"
+        used.add(candidate.lower())
+        file_names.append(candidate + '.csv')
+    return file_names
+
+def _xls_to_csv(source, base_name, sheet, all_sheets):
+    """Legacy .xls workbooks: openpyxl cannot read them, so go through pandas (and xlrd)."""
+    try:
+        sheets = pd.read_excel(source, sheet_name=None, header=None)
+    except ImportError as e:
+        return jsonify({"error": f".xls files need the 'xlrd' package: {e}"}), 501
+    except ValueError as e:
+        return jsonify({"error": f"Could not read the .xls file: {e}"}), 400
+    names = list(sheets)
+    if all_sheets:
+        entries = ((file_name, [sheets[name].to_csv(index=False, header=False)])
+                   for name, file_name in zip(names, _sheet_file_names(names)))
+        return Response(
+            iter_zip(entries),
+            mimetype='application/zip',
+            headers={'Content-Disposition': content_disposition(base_name + '.zip')}
+        )
+    name = _resolve_sheet(names, sheet)
+    if name is None:
+        return jsonify({"error": f"Unknown sheet: {sheet}", "sheets": names}), 400
+    output = BytesIO(sheets[name].to_csv(index=False, header=False).encode('utf-8'))
+    return send_file(output, as_attachment=True, download_name=base_name + '.csv', mimetype='text/csv')
+
+def _resolve_sheet(names, sheet):
+    """Pick a sheet by name or 0-based index; the first sheet when none is given."""
+    if sheet is None or sheet == '':
+        return names[0] if names else None
+    if sheet in names:
+        return sheet
+    if str(sheet).isdigit() and int(sheet) < len(names):
+        return names[int(sheet)]
+    return None
 
 @cet_bp.route('/excel-to-csv', methods=['POST'])
 def excel_to_csv():
-    if 'file' not in request.files:
-        return jsonify({"error": "No file part"}), 400
+    """
+    Convert an Excel upload to CSV, streaming rows as they are read.
+
+    Form fields:
+        sheet       - sheet name or 0-based index (default: the first sheet)
+        all_sheets  - 'true' to download every sheet as CSV files in a zip
+    """
+    # Werkzeug closes its upload files with the request, before a streamed
+    # response is read, so the upload is detached into a file of our own.
+    upload, error = _uploaded_file(
+        ['.xlsx', '.xls'],
+        "Invalid file format. Please upload an Excel file (.xlsx or .xls)",
+        EXCEL_TO_CSV_MAX_BYTES,
+        detach=True,
+    )
+    if error:
+        return error
+    
+    base_name = os.path.splitext(upload.filename)[0]
+    sheet = request.form.get('sheet')
+    all_sheets = request.form.get('all_sheets', '').lower() in ('1', 'true', 'yes')
+    try:
+        if upload.filename.lower().endswith('.xls'):
+            try:
+                return _xls_to_csv(upload.file, base_name, sheet, all_sheets)
+            finally:
+                upload.close()
+        
+        # The read-only workbook only parses a sheet's rows as they are iterated,
+        # so the first bytes go out without the whole workbook being loaded.
+        workbook = open_xlsx(upload.file)
+    except Exception as e:
+        upload.close()
+        return jsonify({"error": str(e)}), 500
+    
+    def close():
+        workbook.close()
+        upload.close()
+    
+    names = workbook.sheetnames
+    if all_sheets:
+        def generate():
+            try:
+                entries = ((file_name, iter_sheet_csv(workbook[name]))
+                           for name, file_name in zip(names, _sheet_file_names(names)))
+                yield from iter_zip(entries)
+            finally:
+                close()
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/zip',
+            headers={'Content-Disposition': content_disposition(base_name + '.zip')}
+        )
+    
+    name = _resolve_sheet(names, sheet)
+    if name is None:
+        close()
+        return jsonify({"error": f"Unknown sheet: {sheet}", "sheets": names}), 400
+    
+    def generate():
+        try:
+            yield from iter_sheet_csv(workbook[name])
+        finally:
+            close()
+    
+    download_name = base_name + ('-' + _sheet_file_name(name) if sheet else '') + '.csv'
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': content_disposition(download_name)}
+    )
+
+@cet_bp.route('/convert-table', methods=['POST'])
+def convert_table():
+    """
+    Convert between CSV, XLSX, Parquet, Feather (Arrow IPC) and NDJSON.
+
+    Form fields:
+        file  - the upload; its format is taken from the extension
+        to    - target format: csv, xlsx, parquet, feather or ndjson
+    """
+    upload, error = _uploaded_file(
+        list(tabular.EXTENSIONS),
+        "Invalid file format. Please upload a CSV, XLSX, Parquet, Feather or NDJSON file",
+        TABLE_CONVERT_MAX_BYTES,
+    )
+    if error:
+        return error
     
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({"error": "No selected file"}), 400
+    target = (request.form.get('to') or '').lower()
+    if target not in tabular.FORMATS:
+        upload.close()
+        return jsonify({"error": f"Unsupported target format: {target or '(none)'}", "formats": list(tabular.FORMATS)}), 400
+    source_format = tabular.format_for_filename(upload.filename)
     
-    if file and (file.filename.endswith('.xlsx') or file.filename.endswith('.xls')):
+    output = tempfile.TemporaryFile()
+    try:
         try:
-            df = pd.read_excel(BytesIO(file.read()))
-            
-            output = BytesIO()
-            df.to_csv(output, index=False)
-            output.seek(0)
-            
-            return send_file(
-                output,
-                as_attachment=True,
-                download_name=os.path.splitext(file.filename)[0] + '.csv',
-                mimetype='text/csv'
-            )
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
+            rows, schema = tabular.convert(upload.file, source_format, output, target)
+        except (ValueError, tabular.pa.ArrowException) as e:
+            output.close()
+            return jsonify({"error": f"Could not read the {source_format} file: {str(e)}"}), 400
+        output.seek(0)
+        
+        response = send_file(
+            output,
+            as_attachment=True,
+            download_name=os.path.splitext(upload.filename)[0] + tabular.FILE_EXTENSIONS[target],
+            mimetype=tabular.MIMETYPES[target]
+        )
+        response.headers['X-Row-Count'] = str(rows)
+        response.headers['X-Column-Types'] = json.dumps({field.name: str(field.type) for field in schema})
+        return response
+    except Exception as e:
+        output.close()
+        return jsonify({"error": f"Error processing file: {str(e)}"}), 500
+    finally:
+        upload.close()
+
+@cet_bp.route('/profile-table', methods=['POST'])
+def profile_table():
+    """
+    Per-column statistics for a CSV, XLSX, Parquet, Feather or NDJSON upload:
+    type, count, nulls, min/max, mean, approximate distinct count and top values.
+
+    Form fields:
+        file   - the upload; its format is taken from the extension
+        top_k  - how many of the most frequent values to list per column (default 10)
+        sheet  - XLSX worksheet name (default: the active sheet)
+    """
+    upload, error = _uploaded_file(
+        list(tabular.EXTENSIONS),
+        "Invalid file format. Please upload a CSV, XLSX, Parquet, Feather or NDJSON file",
+        TABLE_CONVERT_MAX_BYTES,
+    )
+    if error:
+        return error
+    
+    try:
+        top_k = int(request.form.get('top_k') or 10)
+    except ValueError:
+        top_k = None
+    if top_k is None or not 1 <= top_k <= PROFILE_MAX_TOP_K:
+        upload.close()
+        return jsonify({"error": f"top_k must be an integer between 1 and {PROFILE_MAX_TOP_K}"}), 400
+    
+    try:
+        profile = profile_file(upload.file, tabular.format_for_filename(upload.filename), top_k, request.form.get('sheet'))
+    except (ValueError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        return jsonify({"error": f"Could not read the file: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Error processing file: {str(e)}"}), 500
+    finally:
+        upload.close()
     
-    return jsonify({"error": "Invalid file format. Please upload an Excel file (.xlsx or .xls)"}), 400
\ No newline at end of file
+    return jsonify({"file": upload.filename, **profile})
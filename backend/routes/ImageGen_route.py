@@ -1,43 +1,186 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
-from qrnbarcodegen import generate_barcode_base64  
-from qrnbarcodegen import generate_qr_code_base64 
-from imageconverter import convert_image
+from qrnbarcodegen import render_code, code_options, code_cache, SYMBOLOGIES, OUTPUT_FORMATS
+from qrnbarcodegen import MIMETYPES as CODE_MIMETYPES
+from imageconverter import convert_image_bytes, ImageTooLarge
+from imageconverter import MIMETYPES as IMAGE_MIMETYPES
+from csvformat import open_csv, resolve_columns
+import base64
+import hashlib
+import json
+import codebatch
+import ingest
+from downloads import content_disposition
+import os
 
 ig_bp = Blueprint('image_gen', __name__, url_prefix='/api')    
 # CORS(ig_bp)
 
-@ig_bp.route('/generate-barcode', methods=['POST'])
-def generate_barcode():
-    data = request.json
-    text = data.get('text')
+CONVERT_IMAGE_MAX_BYTES = int(os.environ.get('CONVERT_IMAGE_MAX_BYTES', 25 * 1024 * 1024))
+CODE_BATCH_MAX_BYTES = int(os.environ.get('CODE_BATCH_MAX_BYTES', 16 * 1024 * 1024))
+# A code's bytes depend only on its inputs, so a given URL never changes.
+CODE_CACHE_CONTROL = os.environ.get('CODE_CACHE_CONTROL', 'public, max-age=31536000, immutable')
+CONVERTED_IMAGE_CACHE_CONTROL = 'private, no-cache'
+
+JSON_MIMETYPE = 'application/json'
+
+def _raw_mimetype(preferred, others=()):
+    """
+    The image type the Accept header asks for, or None for the base64 JSON form.
+    JSON is offered first, so */* and missing Accept headers keep getting JSON.
+    """
+    offered = [JSON_MIMETYPE, preferred] + [m for m in others if m != preferred]
+    best = request.accept_mimetypes.best_match(offered, default=JSON_MIMETYPE)
+    return None if best == JSON_MIMETYPE else best
+
+def _content_etag(*parts):
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()[:32]
+
+def _not_modified(etag):
+    """A 304 for a GET whose If-None-Match already has this ETag, so nothing is rendered."""
+    if request.method in ('GET', 'HEAD') and etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = CODE_CACHE_CONTROL
+        response.vary.add('Accept')
+        return response
+    return None
+
+def _binary_response(data, mimetype, etag, cache_control, filename=None):
+    response = Response(data, mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept')
+    if filename:
+        response.headers['Content-Disposition'] = content_disposition(filename, 'inline')
+    return response
+
+def _code_options(params):
+    """
+    Rendering options from JSON keys, form fields or query parameters:
+    error_correction (L, M, Q, H), size (pixels per module), border (modules),
+    foreground and background colors. Raises ValueError for non-numeric sizes.
+    """
+    options = {}
+    if params.get('error_correction'):
+        options['error_correction'] = str(params['error_correction']).upper()
+    for key in ('size', 'border'):
+        value = params.get(key)
+        if value is not None and value != '':
+            try:
+                options[key] = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} must be an integer")
+    for key in ('foreground', 'background'):
+        if params.get(key):
+            options[key] = str(params[key])
+    return options
+
+def _name_param(params, key, default):
+    """A lower-cased name such as a symbology or format. Raises ValueError when it is not a string."""
+    value = params.get(key) or default
+    if not isinstance(value, str):
+        raise ValueError(f"{key} must be a string")
+    return value.lower()
+
+def _code_response(default_symbology, params, json_key):
+    """
+    Render one code. Raw PNG/SVG bytes when the Accept header asks for an image
+    type, otherwise the base64 JSON form {json_key: ...} existing callers use.
+    """
+    text = params.get('text')
     if not text:
         return jsonify({'error': 'Text parameter is required.'}), 400
+    text = str(text)
+    try:
+        output_format = _name_param(params, 'format', 'png')
+        symbology = _name_param(params, 'symbology', default_symbology)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if output_format not in OUTPUT_FORMATS:
+        return jsonify({'error': f'Invalid format. Supported formats: {", ".join(OUTPUT_FORMATS)}'}), 400
+    if symbology not in SYMBOLOGIES:
+        return jsonify({'error': f'Invalid symbology. Supported symbologies: {", ".join(SYMBOLOGIES)}'}), 400
+    try:
+        options = _code_options(params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    raw = _raw_mimetype(CODE_MIMETYPES[output_format], CODE_MIMETYPES.values())
+    if raw:
+        output_format = next(f for f, m in CODE_MIMETYPES.items() if m == raw)
+        etag = _content_etag(symbology, text, output_format, sorted(options.items()))
+        cached = _not_modified(etag)
+        if cached:
+            return cached
+    try:
+        data = render_code(text, symbology, output_format, **options)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 501
+    if raw:
+        return _binary_response(data, raw, etag, CODE_CACHE_CONTROL)
+    response = jsonify({json_key: base64.b64encode(data).decode('utf-8')})
+    response.vary.add('Accept')
+    return response
 
-    barcode_b64 = generate_barcode_base64(text)
-    return jsonify({'barcode': barcode_b64})
+@ig_bp.route('/generate-barcode', methods=['GET', 'POST'])
+def generate_barcode():
+    """
+    Render a barcode (text, format, symbology: code128 by default, or code39,
+    ean13, upca, datamatrix) with the options read by _code_options.
+    """
+    data = request.args if request.method == 'GET' else request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'No JSON data provided.'}), 400
+    if not hasattr(data, 'get'):
+        return jsonify({'error': 'Expected a JSON object.'}), 400
+    return _code_response('code128', data, 'barcode')
 
-@ig_bp.route('/generate-qrcode', methods=['POST'])
+@ig_bp.route('/generate-qrcode', methods=['GET', 'POST'])
 def generate_qrcode():
-    data = request.get_json(silent=True)
+    """
+    Render a QR code (text, format) with the options read by _code_options.
+    """
+    data = request.args if request.method == 'GET' else request.get_json(silent=True)
     if not data:
         return jsonify({'error': 'No JSON data provided.'}), 400
-    text = data.get('text')
-    if not text:
-        return jsonify({'error': 'Text parameter is required.'}), 400
+    if not hasattr(data, 'get'):
+        return jsonify({'error': 'Expected a JSON object.'}), 400
+    return _code_response('qr', data, 'qr_code')
 
-    qr_b64 = generate_qr_code_base64(text)
-    return jsonify({'qr_code': qr_b64})
+@ig_bp.route('/codes/cache-stats', methods=['GET'])
+def code_cache_stats():
+    return jsonify(code_cache.stats()), 200
+
+def _conversion_options(form):
+    """width, height, quality, progressive and optimize form fields for convert_image_bytes."""
+    options = {}
+    for key in ('width', 'height', 'quality'):
+        value = form.get(key)
+        if value:
+            try:
+                options[key] = int(value)
+            except ValueError:
+                raise ValueError(f"{key} must be an integer")
+    for key in ('progressive', 'optimize'):
+        options[key] = str(form.get(key, '')).lower() in ('1', 'true', 'yes')
+    return options
 
 @ig_bp.route('/convert-image', methods=['POST'])
 def convert_image_route():
+    """
+    Convert an uploaded image to another format. Optional form fields: width and
+    height to scale it down to fit, quality (1-95, JPEG/WEBP), progressive (JPEG)
+    and optimize. Images over imageconverter.MAX_PIXELS are refused with 413.
+    """
     # Check if file was uploaded
-    if 'image' not in request.files:
-        return jsonify({'error': 'No image file provided.'}), 400
-    
-    file = request.files['image']
-    if file.filename == '':
-        return jsonify({'error': 'No selected file.'}), 400
+    try:
+        file = ingest.file_field('image', CONVERT_IMAGE_MAX_BYTES,
+                                 missing_message='No image file provided.', empty_message='No selected file.')
+    except ingest.UploadError as e:
+        return jsonify({'error': e.message}), e.status
     
     # Get target format
     target_format = request.form.get('format', 'PNG')
@@ -45,13 +188,140 @@ def convert_image_route():
     
     if target_format not in valid_formats:
         return jsonify({'error': f'Invalid format. Supported formats: {", ".join(valid_formats)}'}), 400
+    try:
+        options = _conversion_options(request.form)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
+    # Raw bytes when the client accepts the target type, else base64 in JSON.
+    raw = _raw_mimetype(IMAGE_MIMETYPES[target_format])
     try:
-        image_data = file.read()
-        converted_image = convert_image(image_data, target_format)
-        return jsonify({
-            'converted_image': converted_image,
+        # Pillow reads the spooled upload directly; no bytes copy of it is made.
+        with ingest.receive(file, CONVERT_IMAGE_MAX_BYTES) as upload:
+            if raw:
+                digest = hashlib.sha256(upload.buffer())
+                digest.update(json.dumps([target_format, sorted(options.items())]).encode('utf-8'))
+                etag = digest.hexdigest()[:32]
+            converted = convert_image_bytes(upload.file, target_format, **options)
+            base_name = os.path.splitext(upload.filename)[0] or 'image'
+        if raw:
+            filename = f'{base_name}.{target_format.lower()}'
+            return _binary_response(converted, raw, etag, CONVERTED_IMAGE_CACHE_CONTROL, filename)
+        response = jsonify({
+            'converted_image': base64.b64encode(converted).decode('utf-8'),
             'format': target_format
         })
+        response.vary.add('Accept')
+        return response
+    except ingest.UploadError as e:
+        return jsonify({'error': e.message}), e.status
+    except ImageTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+def _batch_items_from_json(data, symbology, output_format):
+    entries = data.get('items') or []
+    if not isinstance(entries, list):
+        raise ValueError("items must be a list")
+    items = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            items.append((str(entry.get('text', '')), _name_param(entry, 'symbology', symbology),
+                          _name_param(entry, 'format', output_format)))
+        else:
+            items.append((str(entry), symbology, output_format))
+    return items
+
+def _batch_items_from_csv(upload, column, has_header, symbology, output_format):
+    reader, _ = open_csv(upload.file)
+    index = 0
+    if has_header:
+        header = next(reader, [])
+        index = resolve_columns([field.strip() for field in header], [column])[0]
+    elif column:
+        if not str(column).isdigit():
+            raise ValueError("Without a header row, column must be a 0-based index")
+        index = int(column)
+    items = []
+    for row in reader:
+        if index < len(row) and row[index].strip():
+            items.append((row[index].strip(), symbology, output_format))
+            if len(items) > codebatch.BATCH_MAX_ITEMS:
+                break
+    return items
+
+@ig_bp.route('/generate-codes', methods=['POST'])
+def generate_codes():
+    """
+    Render many QR codes or barcodes in one request, in parallel, streamed back
+    as a zip (one image per code plus summary.json) or as NDJSON (base64 data per
+    line and a final summary line). The summary reports codes per second.
+
+    JSON body:
+        items       - strings, or {"text", "symbology", "format"} objects; a bare
+                      JSON list is taken as items with the defaults below
+        symbology   - one of SYMBOLOGIES (default qr); format - png or svg (default png)
+        output      - zip or ndjson (default zip)
+        error_correction, size, border, foreground, background - for every item
+    Or a multipart CSV upload in 'file', with form fields column (name or 0-based
+    index, default the first), has_header (default true) and the fields above.
+    """
+    try:
+        if request.mimetype == 'multipart/form-data':
+            file = ingest.file_field('file', CODE_BATCH_MAX_BYTES)
+            params = request.form
+        else:
+            ingest.limit_request(CODE_BATCH_MAX_BYTES, overhead=0)
+            params = request.get_json(silent=True)
+            if isinstance(params, list):
+                params = {'items': params}
+            if not params:
+                return jsonify({'error': 'No JSON data provided.'}), 400
+            if not isinstance(params, dict):
+                return jsonify({'error': 'Expected a JSON object or a list of items.'}), 400
+    except ingest.UploadError as e:
+        return jsonify({'error': e.message}), e.status
+
+    try:
+        symbology = _name_param(params, 'symbology', 'qr')
+        output_format = _name_param(params, 'format', 'png')
+        output = _name_param(params, 'output', 'zip')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if output not in ('zip', 'ndjson'):
+        return jsonify({'error': 'Invalid output. Supported outputs: zip, ndjson'}), 400
+    try:
+        options = _code_options(params)
+        # Check the options once here rather than failing every item.
+        code_options('qr', **options)
     except ValueError as e:
-        return jsonify({'error': str(e)}), 400
\ No newline at end of file
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        if request.mimetype == 'multipart/form-data':
+            has_header = str(params.get('has_header', 'true')).lower() in ('1', 'true', 'yes')
+            with ingest.receive(file, CODE_BATCH_MAX_BYTES) as upload:
+                items = _batch_items_from_csv(upload, params.get('column') or '0', has_header, symbology, output_format)
+        else:
+            items = _batch_items_from_json(params, symbology, output_format)
+    except ingest.UploadError as e:
+        return jsonify({'error': e.message}), e.status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not items:
+        return jsonify({'error': 'No payloads to render.'}), 400
+    if len(items) > codebatch.BATCH_MAX_ITEMS:
+        return jsonify({'error': f'Too many payloads, the limit is {codebatch.BATCH_MAX_ITEMS}.'}), 400
+    for text, item_symbology, item_format in items:
+        if item_symbology not in SYMBOLOGIES:
+            return jsonify({'error': f'Invalid symbology. Supported symbologies: {", ".join(SYMBOLOGIES)}'}), 400
+        if item_format not in OUTPUT_FORMATS:
+            return jsonify({'error': f'Invalid format. Supported formats: {", ".join(OUTPUT_FORMATS)}'}), 400
+
+    headers = {'X-Code-Count': str(len(items))}
+    if output == 'ndjson':
+        return Response(stream_with_context(codebatch.iter_batch_ndjson(items, options=options)), mimetype='application/x-ndjson', headers=headers)
+    headers['Content-Disposition'] = 'attachment; filename=codes.zip'
+    return Response(stream_with_context(codebatch.iter_batch_zip(items, options=options)), mimetype='application/zip', headers=headers)
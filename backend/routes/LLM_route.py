@@ -0,0 +1,15 @@
+from flask import Blueprint, jsonify
+import llmclient
+
+llm_bp = Blueprint('llm', __name__, url_prefix='/api')
+
+@llm_bp.route('/llm/jobs/<job_id>', methods=['GET'])
+def get_llm_job(job_id):
+    job = llmclient.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job), 200
+
+@llm_bp.route('/llm/metrics', methods=['GET'])
+def llm_metrics():
+    return jsonify(llmclient.client.metrics()), 200
@@ -1,13 +1,13 @@
 from flask import Blueprint, request, jsonify
 from flask_cors import CORS
 import socket
-import requests
 import subprocess
 import platform
 import re
 from pythonping import ping as py_ping
 import dns.resolver
 import time
+import httpclient
 
 nt_bp = Blueprint('network_tools', __name__, url_prefix='/api')
 # CORS(nt_bp)
@@ -22,7 +22,7 @@ def ip_lookup():
         
     try:
         # Using ipinfo.io API for IP lookup
-        response = requests.get(f"https://ipinfo.io/{ip}/json")
+        response = httpclient.get(f"https://ipinfo.io/{ip}/json", timeout=10)
         return jsonify(response.json()), 200
     except Exception as e:
         return jsonify({"error": f"Error performing IP lookup: {str(e)}"}), 500
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, jsonify, send_file
 import os
 import uuid
 import pytesseract
@@ -8,14 +8,13 @@ from docx import Document
 from fpdf import FPDF
 import cv2
 import numpy as np
+import ingest
 
 ocr_bp = Blueprint('ocr', __name__, url_prefix='/api')
 
-UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
 OUTPUT_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'outputs')
+OCR_MAX_BYTES = int(os.environ.get('OCR_MAX_BYTES', 20 * 1024 * 1024))
 
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
 if not os.path.exists(OUTPUT_FOLDER):
     os.makedirs(OUTPUT_FOLDER)
 
@@ -25,19 +24,16 @@ TESSERACT_CONFIG = '--oem 3 --psm 6 -l eng'
 
 @ocr_bp.route('/ocr/upload', methods=['POST'])
 def upload_file():
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file part'}), 400
-    
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({'error': 'No selected file'}), 400
+    try:
+        upload = ingest.receive_file('file', OCR_MAX_BYTES)
+    except ingest.UploadError as e:
+        return jsonify({'error': e.message}), e.status
 
-    filename = str(uuid.uuid4()) + os.path.splitext(file.filename)[1]
-    filepath = os.path.join(UPLOAD_FOLDER, filename)
-    file.save(filepath)
+    filename = str(uuid.uuid4()) + os.path.splitext(upload.filename)[1]
     
     try:
-        img = cv2.imread(filepath)
+        # Decode straight from the spooled upload instead of saving a copy first.
+        img = cv2.imdecode(np.frombuffer(upload.buffer(), dtype=np.uint8), cv2.IMREAD_COLOR)
         if img is None:
             return jsonify({'error': 'Could not read image file'}), 400
         
@@ -90,7 +86,8 @@ def upload_file():
         
         # If no good result was found, fall back to basic OCR
         if not best_text:
-            best_text = pytesseract.image_to_string(Image.open(filepath), config=TESSERACT_CONFIG)
+            upload.file.seek(0)
+            best_text = pytesseract.image_to_string(Image.open(upload.file), config=TESSERACT_CONFIG)
         
         file_id = os.path.splitext(filename)[0]
         pdf_path = os.path.join(OUTPUT_FOLDER, f"{file_id}.pdf")
@@ -107,12 +104,9 @@ def upload_file():
         })
     
     except Exception as e:
-        if os.path.exists(filepath):
-            try:
-                os.remove(filepath)
-            except:
-                pass
         return jsonify({'error': str(e)}), 500
+    finally:
+        upload.close()
 
 def create_pdf(text, output_path):
     pdf = FPDF()
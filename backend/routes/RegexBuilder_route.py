@@ -1,16 +1,14 @@
 from flask import Blueprint, request, jsonify
-import os
 import json
-import google.generativeai as genai
 import re
+import llmclient
 
 regex_bp = Blueprint('regex_builder', __name__, url_prefix='/api')
 
-api_key = os.environ.get('GEMINI_API_KEY')
-genai.configure(api_key=api_key)
-model = genai.GenerativeModel('gemini-1.5-pro')
+REGEX_MODEL = 'gemini-1.5-pro'
 
 @regex_bp.route('/regex-builder/generate', methods=['POST'])
+@llmclient.deferrable
 def generate_regex():
     data = request.json
     if not data or 'blocks' not in data:
@@ -119,8 +117,7 @@ def generate_regex():
     """
     
     try:
-        response = model.generate_content(prompt)
-        ai_response = response.text
+        ai_response = llmclient.generate(prompt, 'regex-builder', model_name=REGEX_MODEL)
         
         # Extract sections with more robust patterns
         pattern_match = re.search(r'Pattern:\s*([^\n]+)', ai_response)
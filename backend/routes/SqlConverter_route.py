@@ -1,17 +1,44 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 import os
 import json
-import google.generativeai as genai
 import re
+from concurrent.futures import ThreadPoolExecutor
+import llmclient
+from sqldialect import DIALECTS, UnsupportedSQL, join_statements, normalize_dialect, transpile
+from sqlschema import parse_schema
+from downloads import content_disposition
+import mockdata
 
 sql_bp = Blueprint('sql_converter', __name__, url_prefix='/api')
 
-GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
-genai.configure(api_key=GOOGLE_API_KEY)
+# Statements the rule-based converter cannot handle are sent to the model this many at a time.
+SQL_FALLBACK_WORKERS = int(os.environ.get('SQL_FALLBACK_WORKERS', 4))
 
-model = genai.GenerativeModel('gemini-2.0-flash-thinking-exp-01-21')
+# Row limits for locally generated mock data: JSON is built in memory, the other formats stream.
+MOCK_JSON_MAX_ROWS = int(os.environ.get('MOCK_JSON_MAX_ROWS', 10000))
+MOCK_MAX_ROWS = int(os.environ.get('MOCK_MAX_ROWS', 10000000))
+
+def convert_with_model(source_sql, source_dialect, target_dialect):
+    prompt = f"""
+    Convert the following {source_dialect} SQL query to {target_dialect} SQL.
+    
+    Source SQL ({source_dialect}):
+    ```sql
+    {source_sql}
+    ```
+    
+    Respond with only the converted SQL code without any explanation or markdown.
+    """
+
+    converted_sql = llmclient.generate(prompt, 'sql-convert')
+    
+    # Add debugging info
+    # print(f"Response from Gemini API: {response}")
+    
+    return re.sub(r'```sql\s*|\s*```', '', converted_sql).strip()
 
 @sql_bp.route('/sql-convert', methods=['POST'])
+@llmclient.deferrable
 def convert_sql():
     try:
         data = request.json
@@ -25,32 +52,61 @@ def convert_sql():
         source_sql = data['source_sql']
         source_dialect = data.get('source_dialect', 'MySQL')  # Default to MySQL if not specified
         target_dialect = data['target_dialect']
-        
-        prompt = f"""
-        Convert the following {source_dialect} SQL query to {target_dialect} SQL.
-        
-        Source SQL ({source_dialect}):
-        ```sql
-        {source_sql}
-        ```
-        
-        Respond with only the converted SQL code without any explanation or markdown.
-        """
+        engine = data.get('engine', 'auto')  # 'auto', 'rules' or 'llm'
+
+        source_key = normalize_dialect(source_dialect)
+        target_key = normalize_dialect(target_dialect)
+        if engine == 'llm' or not source_key or not target_key:
+            if engine == 'rules':
+                return jsonify({
+                    'success': False,
+                    'error': f"Rule-based conversion supports: {', '.join(DIALECTS)}"
+                }), 400
+            converted_sql = convert_with_model(source_sql, source_dialect, target_dialect)
+            return jsonify({
+                'success': True,
+                'source_dialect': source_dialect,
+                'target_dialect': target_dialect,
+                'source_sql': source_sql,
+                'converted_sql': converted_sql,
+                'engine': 'llm'
+            })
+
+        statements = transpile(source_sql, source_key, target_key)
+        unsupported = [s for s in statements if s['error']]
+        if unsupported and engine == 'rules':
+            return jsonify({
+                'success': False,
+                'error': 'Some statements have no conversion rule',
+                'unsupported': [{'source': s['source'], 'reason': s['error']} for s in unsupported]
+            }), 400
+
+        # Only the statements the rules could not handle go to the model.
+        def fallback(statement):
+            return convert_with_model(statement['source'], source_dialect, target_dialect)
+
+        with ThreadPoolExecutor(max_workers=SQL_FALLBACK_WORKERS) as executor:
+            for statement, converted in zip(unsupported, executor.map(fallback, unsupported)):
+                statement['converted'] = converted.rstrip().rstrip(';')
+
+        converted_sql = join_statements([s['converted'] for s in statements], target_key)
 
-        response = model.generate_content(prompt)
-        converted_sql = response.text
-        
-        # Add debugging info
-        # print(f"Response from Gemini API: {response}")
-        
-        converted_sql = re.sub(r'```sql\s*|\s*```', '', converted_sql).strip()
-        
         return jsonify({
             'success': True,
             'source_dialect': source_dialect,
             'target_dialect': target_dialect,
             'source_sql': source_sql,
-            'converted_sql': converted_sql
+            'converted_sql': converted_sql,
+            'engine': 'rules' if not unsupported else 'rules+llm',
+            'statements': [
+                {
+                    'source': s['source'],
+                    'converted': s['converted'],
+                    'engine': 'llm' if s['error'] else 'rules',
+                    'reason': s['error']
+                }
+                for s in statements
+            ]
         })
         
     except Exception as e:
@@ -64,7 +120,109 @@ def convert_sql():
             'error': str(e)
         }), 500
 
+def mock_hints_from_model(tables):
+    """Ask the model which kind of text each column holds; returns {column: kind} or {} on any failure."""
+    columns = ', '.join(f"{t['table_name']}.{c['name']} {c['type']}" for t in tables for c in t['columns'])
+    prompt = f"""
+    For each of these SQL columns, pick the kind of value it most likely holds.
+    Columns: {columns}
+    Kinds: {', '.join(mockdata.TEXT_KINDS)}
+    Respond with only a JSON object mapping the column name (without the table) to a kind.
+    """
+    try:
+        response_text = llmclient.generate(prompt, 'sql-mock-hints')
+        json_match = re.search(r'\{[\s\S]*\}', response_text)
+        hints = json.loads(json_match.group(0)) if json_match else {}
+        return hints if isinstance(hints, dict) else {}
+    except Exception:
+        return {}
+
+def generate_mock_locally(tables, data):
+    """
+    Generate mock rows for parsed tables without the model.
+
+    Request options:
+        num_records      - rows per table (default 10)
+        format           - 'json' (default, one table), 'ndjson', 'csv' (one table) or 'sql'
+        table            - table to generate for json/csv (default: the first one)
+        seed             - make the output reproducible
+        null_rate        - share of NULLs in nullable columns (default 0.1)
+        dialect          - quoting and boolean literals for 'sql' output
+        batch_size       - rows per INSERT statement for 'sql' output (default 500)
+        use_model_hints  - ask the model once which kind of text each column holds
+    """
+    try:
+        num_records = int(data.get('num_records', 10))
+        null_rate = float(data.get('null_rate', 0.1))
+        batch_size = max(1, int(data.get('batch_size', 500)))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'num_records, null_rate and batch_size must be numbers'}), 400
+    output_format = data.get('format', 'json')
+    seed = data.get('seed')
+    dialect = normalize_dialect(data.get('dialect'))
+
+    if output_format not in ('json', 'ndjson', 'csv', 'sql'):
+        return jsonify({'success': False, 'error': "format must be one of: json, ndjson, csv, sql"}), 400
+    # Rows, foreign keys and the table option refer to tables by their bare name.
+    names = [t['table_name'] for t in tables]
+    repeated = next((name for name in names if names.count(name) > 1), None)
+    if repeated:
+        return jsonify({'success': False, 'error': f"Table {repeated} is defined in more than one schema; "
+                                                   f"mock data needs unique table names"}), 400
+    limit = MOCK_JSON_MAX_ROWS if output_format == 'json' else MOCK_MAX_ROWS
+    if num_records < 0 or num_records > limit:
+        return jsonify({
+            'success': False,
+            'error': f"num_records must be between 0 and {limit} for format '{output_format}'"
+        }), 400
+
+    tables = mockdata.sort_tables(tables)
+    hints = mock_hints_from_model(tables) if data.get('use_model_hints') else None
+    try:
+        row_counts = mockdata.plan_row_counts(tables, num_records, hints)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    def rows_for(table, index):
+        # Derive a per-table seed so each table is reproducible on its own.
+        table_seed = None if seed is None else f"{seed}:{index}"
+        return mockdata.generate_rows(table, row_counts[table['table_name']], tables, row_counts, table_seed, null_rate, hints)
+
+    if output_format in ('json', 'csv'):
+        name = data.get('table') or tables[0]['table_name']
+        index = next((i for i, t in enumerate(tables) if t['table_name'] == name), None)
+        if index is None:
+            return jsonify({'success': False, 'error': f"Unknown table: {name}"}), 400
+        table = tables[index]
+        if output_format == 'json':
+            mock_data = [mockdata.json_row(row) for row in rows_for(table, index)]
+            return jsonify({
+                'success': True,
+                'mock_data': mock_data,
+                'count': len(mock_data),
+                'table': table['table_name'],
+                'engine': 'local'
+            })
+        columns = [c['name'] for c in table['columns']]
+        return Response(
+            stream_with_context(mockdata.iter_csv(rows_for(table, index), columns)),
+            mimetype='text/csv',
+            headers={'Content-Disposition': content_disposition(table['table_name'] + '.csv')}
+        )
+
+    def generate():
+        for index, table in enumerate(tables):
+            if output_format == 'ndjson':
+                yield from mockdata.iter_ndjson(rows_for(table, index), table['table_name'] if len(tables) > 1 else None)
+            else:
+                columns = [c['name'] for c in table['columns']]
+                yield from mockdata.iter_sql_inserts(rows_for(table, index), table['table_name'], columns, dialect, batch_size)
+
+    mimetype = 'application/x-ndjson' if output_format == 'ndjson' else 'application/sql'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
 @sql_bp.route('/sql-generate-mock', methods=['POST'])
+@llmclient.deferrable
 def generate_mock_data():
     try:
         data = request.json
@@ -77,6 +235,21 @@ def generate_mock_data():
             
         table_schema = data['table_schema']
         num_records = data.get('num_records', 10)
+        engine = data.get('engine', 'auto')  # 'auto', 'local' or 'llm'
+        if data.get('dialect') is not None and not isinstance(data['dialect'], str):
+            return jsonify({'success': False, 'error': 'dialect must be a string'}), 400
+
+        if engine != 'llm':
+            try:
+                tables = parse_schema(table_schema, normalize_dialect(data.get('dialect')))
+            except UnsupportedSQL as e:
+                if engine == 'local':
+                    return jsonify({'success': False, 'error': str(e)}), 400
+                tables = []
+            if tables:
+                return generate_mock_locally(tables, data)
+            if engine == 'local':
+                return jsonify({'success': False, 'error': 'No CREATE TABLE statement found'}), 400
 
         prompt = f"""
         Generate {num_records} rows of realistic mock data based on the following SQL table schema:
@@ -90,8 +263,7 @@ def generate_mock_data():
         appropriate for the column types. Do not include any explanation, just return valid JSON.
         """
 
-        response = model.generate_content(prompt)
-        response_text = response.text
+        response_text = llmclient.generate(prompt, 'sql-generate-mock')
 
         try:
             json_match = re.search(r'```(?:json)?\s*([\s\S]+?)\s*```', response_text)
@@ -120,6 +292,7 @@ def generate_mock_data():
         }), 500
 
 @sql_bp.route('/sql-to-schema', methods=['POST'])
+@llmclient.deferrable
 def sql_to_schema():
     try:
         data = request.json
@@ -131,7 +304,29 @@ def sql_to_schema():
             }), 400
             
         create_table_sql = data['create_table_sql']
-        
+        engine = data.get('engine', 'auto')  # 'auto', 'local' or 'llm'
+        if data.get('dialect') is not None and not isinstance(data['dialect'], str):
+            return jsonify({'success': False, 'error': 'dialect must be a string'}), 400
+
+        if engine != 'llm':
+            try:
+                tables = parse_schema(create_table_sql, normalize_dialect(data.get('dialect')))
+                error = None if tables else 'No CREATE TABLE statement found'
+            except UnsupportedSQL as e:
+                tables, error = [], str(e)
+            if tables:
+                return jsonify({
+                    'success': True,
+                    'schema': tables[0],
+                    'schemas': tables,
+                    'engine': 'local'
+                })
+            if engine == 'local':
+                return jsonify({
+                    'success': False,
+                    'error': error
+                }), 400
+
         prompt = f"""
         Parse the following SQL CREATE TABLE statement and return a JSON representation of the table schema.
         
@@ -156,8 +351,7 @@ def sql_to_schema():
         Respond with only valid JSON, no explanations.
         """
         
-        response = model.generate_content(prompt)
-        response_text = response.text
+        response_text = llmclient.generate(prompt, 'sql-to-schema')
         
         try:
             json_match = re.search(r'```(?:json)?\s*([\s\S]+?)\s*```', response_text)
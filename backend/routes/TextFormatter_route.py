@@ -1,14 +1,154 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
+import codecs
+import io
+import os
+from csvformat import format_csv, QUOTING, LINE_ENDINGS
+import ingest
+from downloads import content_disposition
 
 tf_bp = Blueprint('text_formatter', __name__, url_prefix='/api')
 # CORS(tf_bp)
 
+# Uploads and raw bodies are spooled to disk and streamed back, so this only bounds disk use.
+CSV_FORMATTER_MAX_BYTES = int(os.environ.get('CSV_FORMATTER_MAX_BYTES', 4 * 1024 * 1024 * 1024))
+# JSON bodies are parsed in memory.
+CSV_FORMATTER_JSON_MAX_BYTES = int(os.environ.get('CSV_FORMATTER_JSON_MAX_BYTES', 32 * 1024 * 1024))
+
+def _flag(value, default):
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes')
+
+def _format_options(params):
+    """Formatter keyword arguments from JSON keys, form fields or query parameters."""
+    columns = params.get('columns')
+    if isinstance(columns, str):
+        columns = [column for column in columns.split(',') if column.strip()]
+    delimiter = params.get('delimiter') or None
+    output_delimiter = params.get('output_delimiter') or ','
+    if delimiter == '\\t':
+        delimiter = '\t'
+    if output_delimiter == '\\t':
+        output_delimiter = '\t'
+    return {
+        'encoding': params.get('encoding') or None,
+        'delimiter': delimiter,
+        'output_delimiter': output_delimiter,
+        'quoting': str(params.get('quoting') or 'minimal').lower(),
+        'line_ending': str(params.get('line_ending') or 'lf').lower(),
+        'has_header': _flag(params.get('has_header'), True),
+        'columns': columns or None,
+        'trim': _flag(params.get('trim'), True),
+        'dedupe': _flag(params.get('dedupe'), False),
+        'skip_blank': _flag(params.get('skip_blank'), True),
+    }
+
+def _check_encoding(encoding):
+    """Raise LookupError unless encoding names a text codec (TextIOWrapper refuses e.g. 'hex')."""
+    codecs.lookup(encoding)
+    io.TextIOWrapper(io.BytesIO(), encoding=encoding)
+
+def _check_options(options):
+    if options['encoding'] is not None:
+        try:
+            _check_encoding(str(options['encoding']))
+        except LookupError:
+            return f"Unknown encoding: {options['encoding']}"
+    if options['quoting'] not in QUOTING:
+        return f"Unsupported quoting: {options['quoting']}. Use one of: {', '.join(QUOTING)}"
+    if options['line_ending'] not in LINE_ENDINGS:
+        return f"Unsupported line ending: {options['line_ending']}. Use one of: {', '.join(LINE_ENDINGS)}"
+    if options['columns'] is not None and not isinstance(options['columns'], list):
+        return "columns must be a list or a comma-separated string"
+    for key in ('delimiter', 'output_delimiter'):
+        if options[key] is not None and (not isinstance(options[key], str) or len(options[key]) != 1):
+            return f"{key} must be a single character"
+    return None
+
 @tf_bp.route('/csv-formatter', methods=['POST'])
 def csv_formatter():
-    data = request.get_json()
-    csv_data = data.get('csv_data', '')
-    
-    # Process the CSV data here
-    # For demonstration, we'll just return the received data
-    return jsonify({"formatted_csv": csv_data})
\ No newline at end of file
+    """
+    Normalize CSV: detect dialect and encoding, rewrite with uniform quoting and
+    line endings, trim fields, select/reorder columns and drop duplicate rows.
+
+    Input, one of:
+        JSON body {"csv_data": "..."}  - answered with JSON {"formatted_csv", "dialect", "stats"}
+        multipart upload in 'file'     - streamed back as text/csv
+        raw text/csv request body      - streamed back as text/csv
+    Options (JSON keys, form fields or query parameters):
+        delimiter, encoding            - override detection
+        output_delimiter (','), quoting (minimal|all|none), line_ending (lf|crlf)
+        columns                        - names or 0-based indexes, comma-separated, in output order
+        has_header (true), trim (true), dedupe (false), skip_blank (true)
+    """
+    if request.is_json:
+        try:
+            ingest.limit_request(CSV_FORMATTER_JSON_MAX_BYTES, overhead=0)
+        except ingest.UploadError as e:
+            return jsonify({"error": e.message}), e.status
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({"error": "Expected a JSON object with csv_data"}), 400
+        if not isinstance(data.get('csv_data', ''), str):
+            return jsonify({"error": "csv_data must be a string"}), 400
+        options = _format_options(data)
+        error = _check_options(options)
+        if error:
+            return jsonify({"error": error}), 400
+        options['encoding'] = 'utf-8'
+        stats = {}
+        try:
+            dialect, chunks = format_csv(io.BytesIO(data.get('csv_data', '').encode('utf-8')), stats=stats, **options)
+            formatted = ''.join(chunks)
+        except (ValueError, UnicodeError) as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"formatted_csv": formatted, "dialect": dialect, "stats": stats})
+
+    # Werkzeug closes its upload files with the request, before a streamed
+    # response is read, so the input is detached into a file of our own.
+    try:
+        if request.mimetype == 'multipart/form-data':
+            source = ingest.receive_file('file', CSV_FORMATTER_MAX_BYTES, detach=True)
+            params = request.form
+        else:
+            source = ingest.receive_body(CSV_FORMATTER_MAX_BYTES, 'formatted.csv')
+            params = request.args
+    except ingest.UploadError as e:
+        return jsonify({"error": e.message}), e.status
+    download_name = source.filename
+
+    options = _format_options(params)
+    error = _check_options(options)
+    if error:
+        source.close()
+        return jsonify({"error": error}), 400
+
+    try:
+        dialect, chunks = format_csv(source.file, **options)
+        first = next(chunks, '')
+    except (ValueError, UnicodeError) as e:
+        source.close()
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        source.close()
+        return jsonify({"error": f"Error processing file: {str(e)}"}), 500
+
+    def generate():
+        try:
+            yield first
+            yield from chunks
+        finally:
+            source.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={
+            'Content-Disposition': content_disposition(download_name),
+            'X-Detected-Delimiter': repr(dialect['delimiter']),
+            'X-Detected-Encoding': dialect['encoding'],
+        }
+    )
@@ -1,9 +1,12 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
-from user_feedback import save_feedback, get_all_feedback
+from user_feedback import save_feedback, iter_feedback
 from flask import Blueprint
+from datetime import datetime
+import json
 
-
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
 feedback_bp = Blueprint('feedback', __name__, url_prefix ='/api')
 
@@ -20,11 +23,63 @@ def post_feedback():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def _parse_time_filter(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid '{name}' parameter, expected an ISO 8601 timestamp")
+
+def _parse_positive_int(value, name):
+    if value is None or value == '':
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise ValueError(f"Invalid '{name}' parameter, expected a positive integer")
+    return number
+
 @feedback_bp.route('/feedback', methods=['GET'])
 def fetch_feedback():
+    """
+    Query params:
+        limit   - page size (default 100, max 1000); with format=ndjson, the number of
+                  entries to stream (default all)
+        cursor  - 'next_cursor' from the previous page
+        since   - only entries with timestamp >= since (ISO 8601)
+        until   - only entries with timestamp <= until (ISO 8601)
+        format  - 'ndjson' streams every matching entry, one JSON object per line
+    """
+    try:
+        since = _parse_time_filter(request.args.get('since'), 'since')
+        until = _parse_time_filter(request.args.get('until'), 'until')
+        after_id = _parse_positive_int(request.args.get('cursor'), 'cursor')
+        limit = _parse_positive_int(request.args.get('limit'), 'limit')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if request.args.get('format') == 'ndjson':
+        entries = iter_feedback(since=since, until=until, after_id=after_id, limit=limit)
+
+        def generate():
+            for _, entry in entries:
+                yield json.dumps(entry) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    page_size = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
     try:
-        all_feedback = get_all_feedback()
-        return jsonify({"feedback": all_feedback}), 200
+        # Fetch one extra row to know whether another page exists.
+        rows = list(iter_feedback(since=since, until=until, after_id=after_id, limit=page_size + 1))
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        return jsonify({
+            "feedback": [entry for _, entry in rows],
+            "next_cursor": str(rows[-1][0]) if has_more else None
+        }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -0,0 +1,98 @@
+"""
+Fixed-size summaries of value streams, updated a pandas chunk at a time.
+
+HyperLogLog estimates the number of distinct values from 2**p one-byte
+registers (16KB at the default p=14, about 0.8% standard error). TopK keeps the
+most frequent values with the Misra-Gries algorithm: at most `capacity` counters,
+each a lower bound on the true count, off by no more than `error`.
+"""
+import numpy as np
+import pandas as pd
+
+
+def hash_values(values):
+    """
+    64-bit hashes of a Series' values, computed by pandas in one vectorized pass.
+    pandas' hashes of similar strings are not uniform enough in their top bits for
+    HyperLogLog, so they go through the MurmurHash3 64-bit finalizer as well.
+    """
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64, copy=True)
+    with np.errstate(over='ignore'):
+        hashes ^= hashes >> np.uint64(33)
+        hashes *= np.uint64(0xff51afd7ed558ccd)
+        hashes ^= hashes >> np.uint64(33)
+        hashes *= np.uint64(0xc4ceb9fe1a85ec53)
+        hashes ^= hashes >> np.uint64(33)
+    return hashes
+
+
+class HyperLogLog:
+    def __init__(self, p=14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update(self, values):
+        """Add a Series or Index of values."""
+        if len(values):
+            self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes):
+        tail_bits = 64 - self.p
+        index = (hashes >> np.uint64(tail_bits)).astype(np.intp)
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+        # tail has at most 50 bits, so the float conversion is exact and frexp's
+        # exponent is its bit length; rank is the position of the first set bit.
+        bit_length = np.frexp(tail.astype(np.float64))[1]
+        rank = (tail_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small cardinalities: linear counting over the empty registers.
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+class TopK:
+    def __init__(self, k=10, capacity=None):
+        self.k = k
+        self.capacity = capacity or max(20 * k, 500)
+        self.counts = pd.Series(dtype='int64')
+        self.error = 0
+
+    def update(self, values):
+        """Add a Series of values."""
+        if len(values):
+            self.update_counts(values.value_counts())
+
+    def update_counts(self, counts):
+        """Add a Series of counts indexed by distinct values."""
+        counts = self._reduce(counts)
+        self.counts = counts if self.counts.empty else self.counts.add(counts, fill_value=0).astype('int64')
+        self.counts = self._reduce(self.counts)
+
+    def _reduce(self, counts):
+        """Keep the `capacity` largest counters, decremented by the next largest one."""
+        if len(counts) <= self.capacity:
+            return counts
+        counts = counts.sort_values(ascending=False)
+        threshold = int(counts.iloc[self.capacity])
+        self.error += threshold
+        counts = counts.iloc[:self.capacity] - threshold
+        return counts[counts > 0]
+
+    @property
+    def exact(self):
+        return self.error == 0
+
+    def top(self):
+        """[(value, count)] for the k most frequent values, most frequent first."""
+        return [(value, int(count)) for value, count in self.counts.nlargest(self.k).items()]
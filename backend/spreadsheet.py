@@ -0,0 +1,146 @@
+"""
+Streaming conversions between CSV and XLSX.
+
+CSV is parsed with pandas in chunks of CSV_CHUNK_ROWS rows and written through
+an openpyxl write-only workbook, which flushes rows to temporary files as they
+are appended, so memory stays bounded however large the upload is. Sheets are
+split automatically at Excel's row limit.
+
+XLSX is read with a read-only workbook, which parses worksheet XML row by row,
+and written out as CSV text in batches.
+"""
+import csv
+import io
+import os
+from datetime import date, datetime, time
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+# Excel's hard limit is 1,048,576 rows per sheet, the header included.
+MAX_SHEET_ROWS = 1048576
+CSV_CHUNK_ROWS = int(os.environ.get('CSV_CHUNK_ROWS', 20000))
+
+
+def iter_csv_chunks(source, encoding='utf-8', chunk_rows=CSV_CHUNK_ROWS):
+    """Yield DataFrames of at most chunk_rows rows from a CSV file object."""
+    reader = pd.read_csv(source, encoding=encoding, chunksize=chunk_rows)
+    with reader:
+        yield from reader
+
+
+def _cell_rows(chunk):
+    """Rows of a chunk as tuples, with NaN/NaT turned into empty cells."""
+    values = chunk.astype(object).where(chunk.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def write_xlsx(header, chunks, destination, sheet_prefix='Sheet', max_rows=MAX_SHEET_ROWS, lock_structure=True):
+    """
+    Write a header and DataFrame chunks into a write-only workbook saved to destination
+    (a path or binary file object). Sheets are named Sheet1, Sheet2, ...; a new one with
+    the header repeated is started whenever a sheet reaches max_rows rows.
+    Returns (data_rows, sheet_count).
+    """
+    workbook = Workbook(write_only=True)
+    if lock_structure:
+        workbook.security.lockStructure = True
+
+    sheet = None
+    sheet_rows = max_rows
+    total = 0
+    sheets = 0
+    for chunk in chunks:
+        for row in _cell_rows(chunk):
+            if sheet_rows >= max_rows:
+                sheets += 1
+                sheet = workbook.create_sheet(f"{sheet_prefix}{sheets}")
+                sheet.append(header)
+                sheet_rows = 1
+            sheet.append(row)
+            sheet_rows += 1
+            total += 1
+    if sheet is None:
+        sheets = 1
+        workbook.create_sheet(f"{sheet_prefix}1").append(header)
+    workbook.save(destination)
+    return total, sheets
+
+
+def csv_to_xlsx(source, destination, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Convert a seekable CSV file object to XLSX at destination without loading it whole.
+    Falls back to latin1 when the file is not valid UTF-8. Returns (data_rows, sheet_count).
+    Raises pandas.errors.ParserError for malformed CSV.
+    """
+    for encoding in ('utf-8', 'latin1'):
+        source.seek(0)
+        try:
+            chunks = iter_csv_chunks(source, encoding, chunk_rows)
+            first = next(chunks, None)
+            if first is None:
+                raise pd.errors.EmptyDataError("No columns to parse from file")
+            header = [str(column) for column in first.columns]
+
+            def all_chunks():
+                yield first
+                yield from chunks
+
+            if hasattr(destination, 'seek'):
+                destination.seek(0)
+                destination.truncate()
+            return write_xlsx(header, all_chunks(), destination)
+        except UnicodeDecodeError:
+            if encoding == 'latin1':
+                raise
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def open_xlsx(source):
+    """Open an XLSX file object in read-only mode; rows are parsed lazily as they are iterated."""
+    return load_workbook(source, read_only=True, data_only=True)
+
+
+def iter_sheet_csv(worksheet, batch_rows=1000):
+    """Yield a worksheet as CSV text in batches of batch_rows rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    pending = 0
+    for row in worksheet.iter_rows(values_only=True):
+        writer.writerow([_csv_cell(value) for value in row])
+        pending += 1
+        if pending >= batch_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_sheet_frames(worksheet, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Yield a worksheet as DataFrames of at most chunk_rows rows, with the first
+    row as column names. Short rows are padded with empty cells.
+    """
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [str(value) if value is not None else f"column_{i + 1}" for i, value in enumerate(header)]
+    width = len(columns)
+    batch = []
+    for row in rows:
+        batch.append(row[:width] if len(row) >= width else row + (None,) * (width - len(row)))
+        if len(batch) >= chunk_rows:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+            batch = []
+    if batch:
+        yield pd.DataFrame.from_records(batch, columns=columns)
@@ -0,0 +1,1179 @@
+"""
+Rule-based SQL dialect transpiler for MySQL, PostgreSQL, SQLite, SQL Server and Oracle.
+
+The script is tokenized, split into statements, and each statement is rewritten
+token by token: identifier quoting, data types and auto-increment columns in
+CREATE TABLE, common functions (NOW(), IFNULL, LEN, CONCAT, ...), boolean literals
+and row limiting (LIMIT / TOP / OFFSET ... FETCH). Statements using constructs the
+rules do not understand are reported as unsupported so the caller can hand just
+those to the LLM.
+"""
+import re
+from functools import lru_cache
+
+DIALECT_ALIASES = {
+    'mysql': 'mysql', 'mariadb': 'mysql',
+    'postgresql': 'postgresql', 'postgres': 'postgresql', 'pg': 'postgresql', 'psql': 'postgresql',
+    'sqlite': 'sqlite', 'sqlite3': 'sqlite',
+    'sqlserver': 'sqlserver', 'sql server': 'sqlserver', 'mssql': 'sqlserver', 't-sql': 'sqlserver', 'tsql': 'sqlserver',
+    'oracle': 'oracle', 'plsql': 'oracle', 'pl/sql': 'oracle',
+}
+
+DIALECTS = ('mysql', 'postgresql', 'sqlite', 'sqlserver', 'oracle')
+
+
+class UnsupportedSQL(Exception):
+    """Raised when a statement uses a construct the rules cannot translate."""
+
+
+def normalize_dialect(name):
+    """Map a user-facing dialect name ('SQL Server', 'Postgres', ...) to its key, or None."""
+    if not name:
+        return None
+    return DIALECT_ALIASES.get(name.strip().lower())
+
+
+# ---------------------------------------------------------------------------
+# Tokenizer
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _token_pattern(dialect):
+    string = r"[Nn]?'(?:[^'\\]|\\.|'')*'" if dialect == 'mysql' else r"[Nn]?'(?:[^']|'')*'"
+    quoted = [r'`(?:[^`]|``)*`', r'"(?:[^"]|"")*"']
+    if dialect in ('sqlserver', 'sqlite'):
+        quoted.append(r'\[[^\]]*\]')
+    comment = r'--[^\n]*|/\*[\s\S]*?\*/'
+    if dialect == 'mysql':
+        comment += r'|\#[^\n]*'
+    return re.compile(
+        rf"(?P<ws>\s+)"
+        rf"|(?P<comment>{comment})"
+        rf"|(?P<string>{string})"
+        rf"|(?P<qident>{'|'.join(quoted)})"
+        r"|(?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)"
+        r"|(?P<param>\?|:\w+|@@?\w+|\$\d+)"
+        r"|(?P<word>[A-Za-z_#][\w$#]*)"
+        r"|(?P<op>::|<=>|->>|->|<<|>>|<>|<=|>=|!=|\|\||[-+*/%=<>(),.;!~^&|\[\]])"
+    )
+
+
+def tokenize(sql, dialect):
+    """Split sql into (kind, text) tokens; kinds: ws, comment, string, qident, number, param, word, op."""
+    pattern = _token_pattern(dialect)
+    tokens = []
+    pos = 0
+    while pos < len(sql):
+        match = pattern.match(sql, pos)
+        if not match:
+            raise UnsupportedSQL(f"Unexpected character {sql[pos]!r}")
+        tokens.append((match.lastgroup, match.group()))
+        pos = match.end()
+    return tokens
+
+
+def split_statements(tokens):
+    """Split a token list on top-level semicolons; the semicolons themselves are dropped."""
+    statements = [[]]
+    for token in tokens:
+        if token == ('op', ';'):
+            statements.append([])
+        else:
+            statements[-1].append(token)
+    return statements
+
+
+def _is_sig(token):
+    return token[0] not in ('ws', 'comment')
+
+
+def _upper(token):
+    return token[1].upper() if token[0] == 'word' else None
+
+
+def _sig_tokens(tokens):
+    return [t for t in tokens if _is_sig(t)]
+
+
+def _render(tokens):
+    return ''.join(text for _, text in tokens)
+
+
+def _matching_paren(tokens, open_index):
+    depth = 0
+    for i in range(open_index, len(tokens)):
+        if tokens[i] == ('op', '('):
+            depth += 1
+        elif tokens[i] == ('op', ')'):
+            depth -= 1
+            if depth == 0:
+                return i
+    raise UnsupportedSQL("Unbalanced parentheses")
+
+
+def _next_sig(tokens, index):
+    for i in range(index + 1, len(tokens)):
+        if _is_sig(tokens[i]):
+            return i
+    return None
+
+
+def _split_top_level(tokens, separator=','):
+    """Split tokens on separators that are not nested inside parentheses."""
+    parts = [[]]
+    depth = 0
+    for token in tokens:
+        if token == ('op', '('):
+            depth += 1
+        elif token == ('op', ')'):
+            depth -= 1
+        if depth == 0 and token == ('op', separator):
+            parts.append([])
+        else:
+            parts[-1].append(token)
+    return parts
+
+
+def _strip(tokens):
+    start = 0
+    end = len(tokens)
+    while start < end and tokens[start][0] == 'ws':
+        start += 1
+    while end > start and tokens[end - 1][0] == 'ws':
+        end -= 1
+    return tokens[start:end]
+
+
+def _split_trailing(tokens):
+    """Split tokens into (body, trailing): the trailing whitespace and comments after the last token that counts."""
+    end = len(tokens)
+    while end and not _is_sig(tokens[end - 1]):
+        end -= 1
+    return tokens[:end], tokens[end:]
+
+
+def _append_clause(tokens, clause):
+    """Append generated SQL after the last token that counts, ahead of any trailing comment."""
+    body, trailing = _split_trailing(tokens)
+    return _strip(body) + _words(clause) + trailing
+
+
+def _tidy(tokens):
+    """Collapse whitespace left behind by removed tokens and drop it at the end."""
+    out = []
+    for token in tokens:
+        if token[0] == 'ws' and out and out[-1][0] == 'ws':
+            continue
+        out.append(token)
+    while out and out[-1][0] == 'ws':
+        out.pop()
+    return out
+
+
+def _words(text):
+    """Tokens for a snippet of generated SQL."""
+    return tokenize(text, 'sqlserver')
+
+
+# ---------------------------------------------------------------------------
+# Leaf rewrites: identifiers, strings, comments, literals
+# ---------------------------------------------------------------------------
+
+def quote_identifier(name, target):
+    if target == 'mysql':
+        return '`' + name.replace('`', '``') + '`'
+    if target == 'sqlserver':
+        return '[' + name.replace(']', ']]') + ']'
+    return '"' + name.replace('"', '""') + '"'
+
+
+def unquote_identifier(text):
+    if text[0] == '`':
+        return text[1:-1].replace('``', '`')
+    if text[0] == '[':
+        return text[1:-1]
+    return text[1:-1].replace('""', '"')
+
+
+def _rewrite_leaf(token, source, target):
+    kind, text = token
+    if kind == 'qident':
+        if source == 'mysql' and text[0] == '"':
+            # In MySQL double quotes delimit strings, not identifiers.
+            return ('string', "'" + text[1:-1].replace('""', '"').replace("'", "''") + "'")
+        return ('qident', quote_identifier(unquote_identifier(text), target))
+    if kind == 'string':
+        prefix = ''
+        if text[0] in 'Nn':
+            prefix, text = text[0], text[1:]
+            if target in ('postgresql', 'sqlite'):
+                prefix = ''
+        if source == 'mysql' and target != 'mysql':
+            text = "'" + text[1:-1].replace("\\'", "''").replace('\\\\', '\\') + "'"
+        elif target == 'mysql' and source != 'mysql':
+            text = text.replace('\\', '\\\\')
+        return ('string', prefix + text)
+    if kind == 'comment' and text.startswith('#'):
+        return ('comment', '--' + text[1:])
+    if kind == 'word' and text.upper() in ('TRUE', 'FALSE') and target in ('sqlserver', 'oracle'):
+        return ('number', '1' if text.upper() == 'TRUE' else '0')
+    return token
+
+
+# ---------------------------------------------------------------------------
+# Functions
+# ---------------------------------------------------------------------------
+
+# Functions that are spelled and behave the same in every supported dialect.
+PORTABLE_FUNCTIONS = {
+    'COUNT', 'SUM', 'AVG', 'MIN', 'MAX', 'COALESCE', 'NULLIF', 'UPPER', 'LOWER', 'TRIM',
+    'LTRIM', 'RTRIM', 'ROUND', 'ABS', 'CAST', 'REPLACE', 'ROW_NUMBER', 'RANK', 'DENSE_RANK',
+    'LAG', 'LEAD', 'FIRST_VALUE', 'LAST_VALUE', 'EXISTS', 'IN', 'ANY', 'ALL', 'SIGN', 'MOD',
+}
+
+CURRENT_TIMESTAMP = {
+    'mysql': 'NOW()',
+    'postgresql': 'NOW()',
+    'sqlite': 'CURRENT_TIMESTAMP',
+    'sqlserver': 'GETDATE()',
+    'oracle': 'SYSTIMESTAMP',
+}
+
+RANDOM = {
+    'mysql': 'RAND()',
+    'postgresql': 'RANDOM()',
+    'sqlite': 'RANDOM()',
+    'sqlserver': 'RAND()',
+    'oracle': 'DBMS_RANDOM.VALUE',
+}
+
+# Words before "name(" that mean name is a table/index/CTE, not a function call.
+NON_CALL_PRECEDERS = {'INTO', 'TABLE', 'REFERENCES', 'ON', 'INDEX', 'VIEW', 'EXISTS', 'WITH', 'JOIN', 'FROM', 'UPDATE', 'AS', 'KEY'}
+
+# Keywords that are followed by a parenthesis but are not function calls.
+PAREN_KEYWORDS = {
+    'VALUES', 'IN', 'EXISTS', 'AS', 'OVER', 'PARTITION', 'USING', 'KEY', 'CHECK', 'UNIQUE',
+    'AND', 'OR', 'NOT', 'ON', 'WHERE', 'SELECT', 'FROM', 'JOIN', 'BY', 'THEN', 'ELSE', 'WHEN',
+    'RETURN', 'SET', 'IS', 'LIKE', 'BETWEEN', 'ANY', 'ALL', 'SOME', 'UNION', 'INTERSECT', 'EXCEPT', 'CASE', 'DEFAULT',
+    'HAVING', 'FILTER', 'WITHIN', 'LIMIT', 'OFFSET', 'TOP',
+}
+
+
+def _call(name, args):
+    """Build tokens for name(arg1, arg2, ...) where args are token lists."""
+    tokens = [('word', name), ('op', '(')]
+    for i, arg in enumerate(args):
+        if i:
+            tokens += [('op', ','), ('ws', ' ')]
+        tokens += _strip(arg)
+    return tokens + [('op', ')')]
+
+
+def _rewrite_function(name, args, source, target):
+    """Return replacement tokens for a call to name(args), or None to keep it as is."""
+    if name in ('NOW', 'GETDATE', 'SYSDATETIME', 'CURRENT_TIMESTAMP', 'LOCALTIMESTAMP') and not any(_strip(a) for a in args):
+        return _words(CURRENT_TIMESTAMP[target])
+    if name in ('RAND', 'RANDOM') and not any(_strip(a) for a in args):
+        return _words(RANDOM[target])
+    if name in ('IFNULL', 'NVL') and len(args) == 2:
+        return _call('COALESCE', args)
+    if name == 'ISNULL':
+        if len(args) == 2:
+            return _call('COALESCE', args)
+        if len(args) == 1 and source == 'mysql':
+            return [('op', '(')] + _strip(args[0]) + _words(' IS NULL)')
+    if name in ('LEN', 'LENGTH', 'CHAR_LENGTH') and len(args) == 1:
+        return _call('LEN' if target == 'sqlserver' else 'LENGTH', args)
+    if name in ('SUBSTR', 'SUBSTRING') and len(args) in (2, 3):
+        if target == 'sqlserver' and len(args) == 2:
+            raise UnsupportedSQL("SQL Server SUBSTRING needs a length argument")
+        return _call('SUBSTR' if target in ('oracle', 'sqlite') else 'SUBSTRING', args)
+    if name == 'CONCAT' and args:
+        if target in ('sqlite', 'oracle'):
+            tokens = [('op', '(')]
+            for i, arg in enumerate(args):
+                if i:
+                    tokens += _words(' || ')
+                tokens += _strip(arg)
+            return tokens + [('op', ')')]
+        return _call('CONCAT', args)
+    if name in PORTABLE_FUNCTIONS:
+        return None
+    raise UnsupportedSQL(f"Function {name}() has no rule")
+
+
+# Operators that mean the same in every supported dialect ('%' is checked per target).
+PORTABLE_OPERATORS = {'<>', '<=', '>=', '!=', '=', '<', '>', '+', '-', '*', '/', '(', ')', ',', '.'}
+
+
+def _rewrite_expression(tokens, source, target):
+    """Rewrite a token list: leaves, function calls (recursively) and dialect-specific operators."""
+    out = []
+    i = 0
+    prev_word = None
+    while i < len(tokens):
+        token = tokens[i]
+        kind, text = token
+        upper = text.upper() if kind == 'word' else None
+
+        if token == ('op', '::'):
+            raise UnsupportedSQL("PostgreSQL '::' casts have no rule")
+        if token == ('op', '||') and target in ('mysql', 'sqlserver') and source != target:
+            raise UnsupportedSQL("'||' string concatenation has no rule for this target")
+        if kind == 'op' and text not in PORTABLE_OPERATORS and text not in ('::', '||'):
+            if not (text == '%' and target != 'oracle'):
+                raise UnsupportedSQL(f"Operator {text!r} has no rule for this target")
+
+        if kind == 'word':
+            nxt = _next_sig(tokens, i)
+            is_call = (
+                nxt is not None and tokens[nxt] == ('op', '(')
+                and upper not in PAREN_KEYWORDS
+                and prev_word not in NON_CALL_PRECEDERS
+                and not (out and out[-1] == ('op', '.'))
+            )
+            if is_call:
+                close = _matching_paren(tokens, nxt)
+                inner = _rewrite_expression(tokens[nxt + 1:close], source, target)
+                args = _split_top_level(inner) if _strip(inner) else []
+                replacement = _rewrite_function(upper, args, source, target)
+                out += replacement if replacement is not None else [token, ('op', '(')] + inner + [('op', ')')]
+                i = close + 1
+                prev_word = None
+                continue
+            if upper in ('CURRENT_TIMESTAMP', 'SYSDATE', 'SYSTIMESTAMP', 'LOCALTIMESTAMP'):
+                out += _words(CURRENT_TIMESTAMP[target])
+                i += 1
+                prev_word = upper
+                continue
+            if upper == 'CURRENT_DATE' and target == 'sqlserver':
+                out += _words('CAST(GETDATE() AS DATE)')
+                i += 1
+                prev_word = upper
+                continue
+
+        out.append(_rewrite_leaf(token, source, target))
+        if _is_sig(token):
+            prev_word = upper
+        i += 1
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Data types
+# ---------------------------------------------------------------------------
+
+# Source type name -> canonical type.
+TYPE_ALIASES = {
+    'INT': 'int', 'INTEGER': 'int', 'INT4': 'int', 'MEDIUMINT': 'int',
+    'BIGINT': 'bigint', 'INT8': 'bigint',
+    'SMALLINT': 'smallint', 'INT2': 'smallint',
+    'TINYINT': 'tinyint',
+    'SERIAL': 'int', 'BIGSERIAL': 'bigint', 'SMALLSERIAL': 'smallint',
+    'VARCHAR': 'varchar', 'VARCHAR2': 'varchar', 'NVARCHAR': 'nvarchar', 'NVARCHAR2': 'nvarchar',
+    'CHAR': 'char', 'CHARACTER': 'char', 'NCHAR': 'char',
+    'TEXT': 'text', 'TINYTEXT': 'text', 'MEDIUMTEXT': 'text', 'LONGTEXT': 'text', 'CLOB': 'text', 'NCLOB': 'text', 'NTEXT': 'text',
+    'BOOLEAN': 'boolean', 'BOOL': 'boolean', 'BIT': 'boolean',
+    'DATETIME': 'timestamp', 'DATETIME2': 'timestamp', 'SMALLDATETIME': 'timestamp', 'TIMESTAMP': 'timestamp',
+    'TIMESTAMPTZ': 'timestamp',
+    'DATE': 'date', 'TIME': 'time',
+    'DECIMAL': 'decimal', 'NUMERIC': 'decimal', 'NUMBER': 'decimal', 'DEC': 'decimal', 'MONEY': 'decimal',
+    'FLOAT': 'float', 'REAL': 'float', 'BINARY_FLOAT': 'float',
+    'DOUBLE': 'double', 'BINARY_DOUBLE': 'double',
+    'BLOB': 'blob', 'TINYBLOB': 'blob', 'MEDIUMBLOB': 'blob', 'LONGBLOB': 'blob', 'BYTEA': 'blob',
+    'VARBINARY': 'blob', 'BINARY': 'blob', 'IMAGE': 'blob', 'RAW': 'blob',
+    'JSON': 'json', 'JSONB': 'json',
+    'UUID': 'uuid', 'UNIQUEIDENTIFIER': 'uuid',
+}
+
+SERIAL_TYPES = {'SERIAL', 'BIGSERIAL', 'SMALLSERIAL'}
+
+
+def _render_type(canonical, params, target):
+    """Render a canonical type with its (already rewritten) parameter text for target."""
+    p = f"({params})" if params else ''
+    length = params if params and params.upper() != 'MAX' else None
+    if canonical == 'int':
+        return {'postgresql': 'INTEGER', 'sqlite': 'INTEGER', 'oracle': 'NUMBER(10)'}.get(target, 'INT')
+    if canonical == 'bigint':
+        return {'sqlite': 'INTEGER', 'oracle': 'NUMBER(19)'}.get(target, 'BIGINT')
+    if canonical == 'smallint':
+        return {'sqlite': 'INTEGER', 'oracle': 'NUMBER(5)'}.get(target, 'SMALLINT')
+    if canonical == 'tinyint':
+        return {'postgresql': 'SMALLINT', 'sqlite': 'INTEGER', 'oracle': 'NUMBER(3)'}.get(target, 'TINYINT')
+    if canonical in ('varchar', 'nvarchar'):
+        if not length:
+            # VARCHAR(MAX) / unbounded VARCHAR is really a text column.
+            if params and params.upper() == 'MAX' or target in ('mysql', 'sqlserver', 'oracle'):
+                return _render_type('text', None, target) if params else _render_type(canonical, '255', target)
+            return 'VARCHAR' if target == 'postgresql' else 'TEXT'
+        if target == 'oracle':
+            return f"{'NVARCHAR2' if canonical == 'nvarchar' else 'VARCHAR2'}({length})"
+        if target == 'sqlserver' and canonical == 'nvarchar':
+            return f"NVARCHAR({length})"
+        return f"VARCHAR({length})"
+    if canonical == 'char':
+        return f"CHAR{p}"
+    if canonical == 'text':
+        return {'sqlserver': 'NVARCHAR(MAX)', 'oracle': 'CLOB'}.get(target, 'TEXT')
+    if canonical == 'boolean':
+        return {'sqlite': 'INTEGER', 'sqlserver': 'BIT', 'oracle': 'NUMBER(1)'}.get(target, 'BOOLEAN')
+    if canonical == 'timestamp':
+        return {'mysql': 'DATETIME', 'sqlite': 'DATETIME', 'sqlserver': 'DATETIME2'}.get(target, 'TIMESTAMP')
+    if canonical == 'date':
+        return 'DATE'
+    if canonical == 'time':
+        return 'TIMESTAMP' if target == 'oracle' else 'TIME'
+    if canonical == 'decimal':
+        if target == 'oracle':
+            return f"NUMBER{p}"
+        if target == 'postgresql':
+            return f"NUMERIC{p}"
+        return f"DECIMAL{p}"
+    if canonical == 'float':
+        return {'postgresql': 'REAL', 'sqlite': 'REAL', 'oracle': 'BINARY_FLOAT'}.get(target, 'FLOAT')
+    if canonical == 'double':
+        return {'postgresql': 'DOUBLE PRECISION', 'sqlite': 'REAL', 'sqlserver': 'FLOAT', 'oracle': 'BINARY_DOUBLE'}.get(target, 'DOUBLE')
+    if canonical == 'blob':
+        return {'postgresql': 'BYTEA', 'sqlserver': 'VARBINARY(MAX)'}.get(target, 'BLOB')
+    if canonical == 'json':
+        return {'postgresql': 'JSONB', 'sqlite': 'TEXT', 'sqlserver': 'NVARCHAR(MAX)', 'oracle': 'CLOB'}.get(target, 'JSON')
+    if canonical == 'uuid':
+        return {'mysql': 'CHAR(36)', 'postgresql': 'UUID', 'sqlite': 'TEXT', 'sqlserver': 'UNIQUEIDENTIFIER', 'oracle': 'VARCHAR2(36)'}[target]
+    raise UnsupportedSQL(f"No rule for type {canonical}")
+
+
+def parse_type(tokens, start):
+    """
+    Read a column type starting at tokens[start] (a word).
+    Returns (type_name, params_text, end_index) where type_name is upper-cased and
+    multi-word names are joined with a space, e.g. 'DOUBLE PRECISION'.
+    """
+    name = _upper(tokens[start])
+    end = start + 1
+    # Multi-word type names.
+    follow_ups = {
+        'DOUBLE': ['PRECISION'], 'CHARACTER': ['VARYING'], 'TIMESTAMP': ['WITH', 'WITHOUT'],
+        'TIME': ['WITH', 'WITHOUT'], 'NATIONAL': ['CHARACTER', 'CHAR'],
+    }
+    nxt = _next_sig(tokens, end - 1)
+    if nxt is not None and name in follow_ups and _upper(tokens[nxt]) in follow_ups[name]:
+        word = _upper(tokens[nxt])
+        if word in ('WITH', 'WITHOUT'):
+            # TIMESTAMP WITH[OUT] TIME ZONE
+            words = [word]
+            j = nxt
+            for expected in ('TIME', 'ZONE'):
+                j = _next_sig(tokens, j)
+                if j is None or _upper(tokens[j]) != expected:
+                    raise UnsupportedSQL("Malformed TIMESTAMP WITH TIME ZONE")
+                words.append(expected)
+            name = name + ' ' + ' '.join(words)
+            end = j + 1
+        else:
+            name = name + ' ' + word
+            end = nxt + 1
+
+    params = None
+    nxt = _next_sig(tokens, end - 1)
+    if nxt is not None and tokens[nxt] == ('op', '('):
+        close = _matching_paren(tokens, nxt)
+        params = ''.join(t[1] for t in tokens[nxt + 1:close] if _is_sig(t) or t[0] == 'ws').strip()
+        params = re.sub(r'\s*,\s*', ',', params)
+        end = close + 1
+    return name, params, end
+
+
+def _canonical_type(type_name, params):
+    if type_name == 'DOUBLE PRECISION':
+        return 'double'
+    if type_name == 'CHARACTER VARYING':
+        return 'varchar'
+    if type_name.startswith('TIMESTAMP') or type_name.startswith('TIME WITH'):
+        return 'timestamp'
+    if type_name == 'TINYINT' and params == '1':
+        return 'boolean'
+    if type_name == 'BIT' and params not in (None, '1'):
+        raise UnsupportedSQL("BIT(n) has no rule")
+    canonical = TYPE_ALIASES.get(type_name)
+    if canonical is None:
+        raise UnsupportedSQL(f"Type {type_name} has no rule")
+    return canonical
+
+
+def _type_params(canonical, type_name, params):
+    """Keep only the parameters that mean the same thing on every target."""
+    if canonical in ('varchar', 'nvarchar', 'char', 'decimal'):
+        if type_name in ('MONEY',):
+            return '19,4'
+        return params
+    return None
+
+
+# ---------------------------------------------------------------------------
+# CREATE TABLE
+# ---------------------------------------------------------------------------
+
+MYSQL_TABLE_OPTIONS = {'ENGINE', 'CHARSET', 'CHARACTER', 'COLLATE', 'AUTO_INCREMENT', 'COMMENT', 'ROW_FORMAT', 'DEFAULT'}
+MYSQL_OPTION_VALUES = {'SET', 'UTF8', 'UTF8MB4', 'INNODB', 'MYISAM', 'LATIN1'}
+
+
+def _autoincrement_markers(rest):
+    """Remove auto-increment markers from a column's constraint tokens; return (tokens, found)."""
+    out = []
+    found = False
+    i = 0
+    while i < len(rest):
+        upper = _upper(rest[i])
+        if upper in ('AUTO_INCREMENT', 'AUTOINCREMENT'):
+            found = True
+            i += 1
+            continue
+        if upper == 'IDENTITY':
+            found = True
+            nxt = _next_sig(rest, i)
+            i = _matching_paren(rest, nxt) + 1 if nxt is not None and rest[nxt] == ('op', '(') else i + 1
+            continue
+        if upper == 'GENERATED':
+            words = []
+            j = i
+            while True:
+                j = _next_sig(rest, j)
+                if j is None or _upper(rest[j]) is None:
+                    break
+                words.append(_upper(rest[j]))
+                if words[-1] == 'IDENTITY':
+                    break
+            if words and words[-1] == 'IDENTITY':
+                found = True
+                nxt = _next_sig(rest, j)
+                i = _matching_paren(rest, nxt) + 1 if nxt is not None and rest[nxt] == ('op', '(') else j + 1
+                continue
+            raise UnsupportedSQL("Generated columns have no rule")
+        out.append(rest[i])
+        i += 1
+    return out, found
+
+
+def _boolean_defaults(rest):
+    """Spell a 0/1 default as FALSE/TRUE; PostgreSQL rejects integer defaults on BOOLEAN columns."""
+    out = list(rest)
+    for i, token in enumerate(out):
+        if _upper(token) != 'DEFAULT':
+            continue
+        start = _next_sig(out, i)
+        value = start
+        while value is not None and out[value] == ('op', '('):
+            value = _next_sig(out, value)
+        if value is None or out[value][1].strip("'") not in ('0', '1') or out[value][0] not in ('number', 'string'):
+            continue
+        end = _matching_paren(out, start) if start != value else value
+        out[start:end + 1] = [('word', 'TRUE' if out[value][1].strip("'") == '1' else 'FALSE')]
+        break
+    return out
+
+
+def _column_definition(item, source, target, table_pk, enum_checks):
+    """Rewrite one column definition. Returns (tokens, column_name, is_autoincrement)."""
+    sig = [i for i, t in enumerate(item) if _is_sig(t)]
+    name_token = item[sig[0]]
+    column_name = unquote_identifier(name_token[1]) if name_token[0] == 'qident' else name_token[1]
+    if len(sig) < 2 or item[sig[1]][0] != 'word':
+        raise UnsupportedSQL(f"Column {column_name} has no type")
+
+    type_name, params, type_end = parse_type(item, sig[1])
+    rest = item[type_end:]
+
+    if type_name == 'ENUM':
+        values = params
+        params = '255'
+        canonical = 'varchar'
+        enum_checks.append((column_name, values))
+    else:
+        canonical = _canonical_type(type_name, params)
+
+    rest, autoincrement = _autoincrement_markers(rest)
+    autoincrement = autoincrement or type_name in SERIAL_TYPES
+
+    # Drop MySQL-only column attributes.
+    cleaned = []
+    i = 0
+    while i < len(rest):
+        upper = _upper(rest[i])
+        if upper in ('UNSIGNED', 'ZEROFILL', 'SIGNED') and target != 'mysql':
+            i += 1
+            continue
+        if upper in ('COMMENT', 'COLLATE') and target != 'mysql':
+            nxt = _next_sig(rest, i)
+            i = (nxt + 1) if nxt is not None else i + 1
+            continue
+        if upper == 'CHARACTER' and target != 'mysql':
+            # CHARACTER SET name
+            j = _next_sig(rest, _next_sig(rest, i))
+            i = j + 1
+            continue
+        if upper in ('AFTER', 'FIRST') and target != 'mysql':
+            raise UnsupportedSQL("Column positions (AFTER/FIRST) have no rule")
+        if upper == 'ON' and target != source:
+            nxt = _next_sig(rest, i)
+            if nxt is not None and _upper(rest[nxt]) == 'UPDATE':
+                raise UnsupportedSQL("ON UPDATE column clauses have no rule")
+        cleaned.append(rest[i])
+        i += 1
+    rest = _tidy(_rewrite_expression(cleaned, source, target))
+
+    rest_upper = [_upper(t) for t in rest if _is_sig(t)]
+    inline_pk = 'PRIMARY' in rest_upper
+    type_text = _render_type(canonical, _type_params(canonical, type_name, params), target)
+    if type_text == 'BOOLEAN':
+        rest = _boolean_defaults(rest)
+
+    if autoincrement:
+        if canonical not in ('int', 'bigint', 'smallint', 'tinyint', 'decimal'):
+            raise UnsupportedSQL("Auto-increment on a non-integer column has no rule")
+        int_kind = canonical if canonical in ('bigint', 'smallint') else 'int'
+        if target == 'postgresql':
+            type_text = {'int': 'SERIAL', 'bigint': 'BIGSERIAL', 'smallint': 'SMALLSERIAL'}[int_kind]
+        elif target == 'sqlite':
+            # SQLite only auto-increments an inline INTEGER PRIMARY KEY.
+            if not inline_pk and table_pk != [column_name]:
+                raise UnsupportedSQL("SQLite AUTOINCREMENT needs the column to be the primary key")
+            rest = _tidy(_remove_primary_key(rest))
+            type_text = 'INTEGER PRIMARY KEY AUTOINCREMENT'
+        elif target == 'mysql':
+            type_text += ' AUTO_INCREMENT'
+        elif target == 'sqlserver':
+            type_text += ' IDENTITY(1,1)'
+        elif target == 'oracle':
+            type_text += ' GENERATED BY DEFAULT AS IDENTITY'
+
+    out = [_rewrite_leaf(name_token, source, target), ('ws', ' ')] + _words(type_text) + rest
+    return out, column_name, autoincrement and target == 'sqlite'
+
+
+def _remove_primary_key(tokens):
+    out = []
+    i = 0
+    while i < len(tokens):
+        if _upper(tokens[i]) == 'PRIMARY':
+            nxt = _next_sig(tokens, i)
+            if nxt is not None and _upper(tokens[nxt]) == 'KEY':
+                i = nxt + 1
+                continue
+        out.append(tokens[i])
+        i += 1
+    return out
+
+
+def _column_list(tokens):
+    """Names inside '(a, b)' tokens."""
+    names = []
+    for part in _split_top_level(tokens):
+        sig = _sig_tokens(part)
+        if sig:
+            names.append(unquote_identifier(sig[0][1]) if sig[0][0] == 'qident' else sig[0][1])
+    return names
+
+
+def _convert_create_table(tokens, source, target):
+    """Rewrite a CREATE TABLE statement; returns a list of statements (extra CREATE INDEX may follow)."""
+    sig = [i for i, t in enumerate(tokens) if _is_sig(t)]
+    words = [_upper(tokens[i]) for i in sig]
+
+    # CREATE [TEMPORARY|TEMP] TABLE [IF NOT EXISTS] name ( ... ) [options]
+    pos = 1
+    temporary = words[pos] in ('TEMPORARY', 'TEMP')
+    if temporary:
+        if target in ('sqlserver', 'oracle'):
+            raise UnsupportedSQL("Temporary tables have no rule for this target")
+        pos += 1
+    pos += 1  # TABLE
+    if_not_exists = words[pos:pos + 3] == ['IF', 'NOT', 'EXISTS']
+    if if_not_exists:
+        if target == 'oracle':
+            raise UnsupportedSQL("CREATE TABLE IF NOT EXISTS has no rule for Oracle")
+        pos += 3
+    name_start = sig[pos]
+    open_index = next(i for i in range(name_start, len(tokens)) if tokens[i] == ('op', '('))
+    close_index = _matching_paren(tokens, open_index)
+    if tokens[open_index + 1:] and any(_upper(t) in ('AS', 'SELECT') for t in tokens[name_start:open_index]):
+        raise UnsupportedSQL("CREATE TABLE ... AS SELECT has no rule")
+    table_tokens = [_rewrite_leaf(t, source, target) for t in tokens[name_start:open_index]]
+    table_name = _render(_strip(table_tokens))
+
+    items = _split_top_level(tokens[open_index + 1:close_index])
+
+    # Find a table-level single-column primary key (needed for SQLite AUTOINCREMENT).
+    table_pk = None
+    for item in items:
+        item_words = [_upper(t) for t in item if _is_sig(t)]
+        if 'PRIMARY' in item_words[:3] and item_words[0] in ('PRIMARY', 'CONSTRAINT'):
+            open_pk = next(i for i, t in enumerate(item) if t == ('op', '('))
+            table_pk = _column_list(item[open_pk + 1:_matching_paren(item, open_pk)])
+
+    new_items = []
+    extra_statements = []
+    enum_checks = []
+    inline_sqlite_pk = False
+    for item in items:
+        item_sig = _sig_tokens(item)
+        if not item_sig:
+            raise UnsupportedSQL("Empty column definition")
+        first = _upper(item_sig[0])
+        leading_ws = item[:next(i for i, t in enumerate(item) if _is_sig(t))]
+        body = _strip(item)
+
+        if first in ('PRIMARY', 'CONSTRAINT', 'FOREIGN', 'CHECK') or (first == 'UNIQUE' and _upper(item_sig[1]) not in ('KEY', 'INDEX')):
+            new_items.append((leading_ws, _rewrite_expression(body, source, target), first == 'PRIMARY'))
+            continue
+        if first in ('KEY', 'INDEX') or (first == 'UNIQUE' and _upper(item_sig[1]) in ('KEY', 'INDEX')):
+            # MySQL inline index definitions.
+            unique = first == 'UNIQUE'
+            open_cols = next(i for i, t in enumerate(body) if t == ('op', '('))
+            columns = _rewrite_expression(body[open_cols:_matching_paren(body, open_cols) + 1], source, target)
+            name_sig = [t for t in body[:open_cols] if _is_sig(t) and _upper(t) not in ('UNIQUE', 'KEY', 'INDEX')]
+            if target == 'mysql':
+                new_items.append((leading_ws, _rewrite_expression(body, source, target), False))
+            elif unique:
+                constraint = _words('CONSTRAINT ') + [_rewrite_leaf(name_sig[0], source, target), ('ws', ' ')] if name_sig else []
+                new_items.append((leading_ws, constraint + _words('UNIQUE ') + columns, False))
+            else:
+                index_name = _render([_rewrite_leaf(name_sig[0], source, target)]) if name_sig else None
+                if index_name is None:
+                    raise UnsupportedSQL("Unnamed inline index has no rule")
+                extra_statements.append(f"CREATE INDEX {index_name} ON {table_name} {_render(columns)}")
+            continue
+        if first in ('FULLTEXT', 'SPATIAL', 'PERIOD', 'EXCLUDE', 'LIKE'):
+            raise UnsupportedSQL(f"{first} in CREATE TABLE has no rule")
+
+        column_tokens, _, sqlite_inline_pk = _column_definition(body, source, target, table_pk, enum_checks)
+        inline_sqlite_pk = inline_sqlite_pk or sqlite_inline_pk
+        new_items.append((leading_ws, column_tokens, False))
+
+    if inline_sqlite_pk:
+        # The primary key moved inline onto the AUTOINCREMENT column.
+        new_items = [item for item in new_items if not item[2]]
+
+    for column, values in enum_checks:
+        quoted = _render([_rewrite_leaf(('qident', '"' + column + '"'), 'postgresql', target)])
+        leading_ws = (new_items[-1][0] if new_items else None) or [('ws', ' ')]
+        new_items.append((leading_ws, _words(f"CHECK ({quoted} IN ({values}))"), False))
+
+    # Table options after the closing parenthesis.
+    tail = tokens[close_index + 1:]
+    tail_sig = _sig_tokens(tail)
+    if tail_sig:
+        tail_words = {_upper(t) for t in tail_sig if t[0] == 'word'}
+        # Option names, plus values such as InnoDB, latin1 or utf8mb4_unicode_ci.
+        option_values = {w for w in tail_words if w.startswith('UTF8') or '_' in w}
+        if source == 'mysql' and tail_words - option_values <= MYSQL_TABLE_OPTIONS | MYSQL_OPTION_VALUES:
+            tail = [] if target != 'mysql' else tail
+        elif source == 'sqlite' and tail_words <= {'WITHOUT', 'ROWID', 'STRICT'}:
+            tail = [] if target != 'sqlite' else tail
+        elif source != target:
+            raise UnsupportedSQL("Table options have no rule")
+
+    head = [_rewrite_leaf(t, source, target) for t in tokens[:name_start]]
+    if if_not_exists and target == 'sqlserver':
+        # SQL Server has no CREATE TABLE IF NOT EXISTS.
+        head = _remove_words(head, ['IF', 'NOT', 'EXISTS'])
+        plain_name = _render(_strip([('word', unquote_identifier(t[1])) if t[0] == 'qident' else t for t in tokens[name_start:open_index]]))
+        head = _words(f"IF OBJECT_ID(N'{plain_name}', N'U') IS NULL\n") + head
+
+    body = []
+    for i, (leading_ws, item_tokens, _) in enumerate(new_items):
+        if i:
+            body.append(('op', ','))
+        body += leading_ws + item_tokens
+    trailing_ws = [t for t in tokens[open_index + 1:close_index][::-1]]
+    closing_ws = []
+    for t in trailing_ws:
+        if t[0] != 'ws':
+            break
+        closing_ws.insert(0, t)
+
+    statement = head + table_tokens + [('op', '(')] + body + closing_ws + [('op', ')')] + [_rewrite_leaf(t, source, target) for t in tail]
+    return [_render(statement).rstrip()] + extra_statements
+
+
+def _remove_words(tokens, words):
+    out = []
+    i = 0
+    while i < len(tokens):
+        if _upper(tokens[i]) == words[0]:
+            j = i
+            matched = True
+            for word in words[1:]:
+                j = _next_sig(tokens, j)
+                if j is None or _upper(tokens[j]) != word:
+                    matched = False
+                    break
+            if matched:
+                i = j + 1
+                while i < len(tokens) and tokens[i][0] == 'ws':
+                    i += 1
+                continue
+        out.append(tokens[i])
+        i += 1
+    return out
+
+
+# ---------------------------------------------------------------------------
+# SELECT row limiting
+# ---------------------------------------------------------------------------
+
+def _depth_map(tokens):
+    depths = []
+    depth = 0
+    for token in tokens:
+        if token == ('op', ')'):
+            depth -= 1
+        depths.append(depth)
+        if token == ('op', '('):
+            depth += 1
+    return depths
+
+
+def _take_value(tokens, index):
+    """Read a LIMIT/TOP value (number, parameter or parenthesized number) at tokens[index]."""
+    token = tokens[index]
+    if token[0] in ('number', 'param'):
+        return token[1], index
+    if token == ('op', '('):
+        close = _matching_paren(tokens, index)
+        inner = _sig_tokens(tokens[index + 1:close])
+        if len(inner) == 1 and inner[0][0] in ('number', 'param'):
+            return inner[0][1], close
+    raise UnsupportedSQL("Row limits must be a number or parameter")
+
+
+def _extract_row_limit(tokens):
+    """
+    Remove LIMIT/OFFSET/TOP/FETCH clauses from the top level of a SELECT.
+    Returns (tokens, limit, offset).
+    """
+    depths = _depth_map(tokens)
+    limit = offset = None
+    remove = set()
+    sig = [i for i, t in enumerate(tokens) if _is_sig(t) and depths[i] == 0]
+
+    def words_at(k, count):
+        return [_upper(tokens[sig[j]]) if j < len(sig) else None for j in range(k, k + count)]
+
+    k = 0
+    while k < len(sig):
+        upper = _upper(tokens[sig[k]])
+        if upper == 'TOP':
+            limit, end = _take_value(tokens, sig[k + 1])
+            # The count may be parenthesized, so look past its closing parenthesis.
+            nxt = next((j for j, i in enumerate(sig) if i > end), len(sig))
+            if words_at(nxt, 1)[0] == 'PERCENT' or words_at(nxt, 2) == ['WITH', 'TIES']:
+                raise UnsupportedSQL("TOP PERCENT / WITH TIES has no rule")
+            remove.update(range(sig[k], end + 1))
+            k = nxt
+            continue
+        if upper == 'LIMIT':
+            first, end = _take_value(tokens, sig[k + 1])
+            nxt = next((j for j, i in enumerate(sig) if i > end), len(sig))
+            if nxt < len(sig) and tokens[sig[nxt]] == ('op', ','):
+                offset = first
+                limit, end = _take_value(tokens, sig[nxt + 1])
+                nxt = next((j for j, i in enumerate(sig) if i > end), len(sig))
+            else:
+                limit = first
+            remove.update(range(sig[k], end + 1))
+            k = nxt
+            continue
+        if upper == 'OFFSET':
+            offset, end = _take_value(tokens, sig[k + 1])
+            nxt = next((j for j, i in enumerate(sig) if i > end), len(sig))
+            if nxt < len(sig) and _upper(tokens[sig[nxt]]) in ('ROW', 'ROWS'):
+                end = sig[nxt]
+                nxt += 1
+            remove.update(range(sig[k], end + 1))
+            k = nxt
+            continue
+        if upper == 'FETCH':
+            # FETCH {FIRST|NEXT} n {ROW|ROWS} ONLY
+            if words_at(k + 1, 1)[0] not in ('FIRST', 'NEXT'):
+                raise UnsupportedSQL("Malformed FETCH clause")
+            limit, end = _take_value(tokens, sig[k + 2])
+            nxt = next((j for j, i in enumerate(sig) if i > end), len(sig))
+            if words_at(nxt, 2) not in (['ROW', 'ONLY'], ['ROWS', 'ONLY']):
+                raise UnsupportedSQL("FETCH ... WITH TIES has no rule")
+            remove.update(range(sig[k], sig[nxt + 1] + 1))
+            k = nxt + 2
+            continue
+        k += 1
+
+    # Also drop the whitespace in front of each removed clause.
+    for i in sorted(remove):
+        j = i - 1
+        while j >= 0 and tokens[j][0] == 'ws' and j not in remove:
+            remove.add(j)
+            j -= 1
+    return [t for i, t in enumerate(tokens) if i not in remove], limit, offset
+
+
+def _apply_row_limit(tokens, limit, offset, target):
+    if limit is None and offset is None:
+        return tokens
+    depths = _depth_map(tokens)
+    top_words = [(_upper(t), i) for i, t in enumerate(tokens) if _is_sig(t) and depths[i] == 0]
+
+    if target in ('mysql', 'postgresql', 'sqlite'):
+        clause = ''
+        if limit is not None:
+            clause += f" LIMIT {limit}"
+        elif offset is not None and target != 'postgresql':
+            clause += ' LIMIT 18446744073709551615' if target == 'mysql' else ' LIMIT -1'
+        if offset is not None:
+            clause += f" OFFSET {offset}"
+        return _append_clause(tokens, clause)
+
+    if target == 'sqlserver' and offset is None:
+        if any(word in ('UNION', 'INTERSECT', 'EXCEPT') for word, _ in top_words):
+            raise UnsupportedSQL("TOP on a compound SELECT has no rule")
+        # SELECT [DISTINCT|ALL] TOP n ...
+        select_index = next(i for word, i in top_words if word == 'SELECT')
+        insert_at = select_index + 1
+        nxt = _next_sig(tokens, select_index)
+        if nxt is not None and _upper(tokens[nxt]) in ('DISTINCT', 'ALL'):
+            insert_at = nxt + 1
+        return tokens[:insert_at] + _words(f" TOP {limit}") + tokens[insert_at:]
+
+    clause = ''
+    if target == 'sqlserver' and not any(word == 'ORDER' for word, _ in top_words):
+        # OFFSET/FETCH requires an ORDER BY in SQL Server.
+        clause += ' ORDER BY (SELECT NULL)'
+    clause += f" OFFSET {offset or 0} ROWS"
+    if limit is not None:
+        clause += f" FETCH NEXT {limit} ROWS ONLY"
+    if target == 'oracle' and not offset:
+        clause = f" FETCH FIRST {limit} ROWS ONLY"
+    return _append_clause(tokens, clause)
+
+
+# Words that end a FROM/JOIN table list at the same parenthesis depth.
+FROM_LIST_END = {
+    'WHERE', 'GROUP', 'HAVING', 'ORDER', 'UNION', 'INTERSECT', 'EXCEPT', 'MINUS', 'ON', 'USING',
+    'LIMIT', 'OFFSET', 'FETCH', 'WINDOW', 'SET', 'VALUES', 'SELECT',
+}
+
+
+def _drop_table_alias_as(tokens):
+    """Oracle rejects AS before a table alias: drop it inside FROM and JOIN table lists."""
+    out = []
+    in_from = [False]
+    skip_ws = False
+    for token in tokens:
+        if skip_ws and token[0] == 'ws':
+            continue
+        skip_ws = False
+        upper = _upper(token)
+        if token == ('op', '('):
+            in_from.append(False)
+        elif token == ('op', ')'):
+            if len(in_from) > 1:
+                in_from.pop()
+        elif upper in ('FROM', 'JOIN'):
+            in_from[-1] = True
+        elif upper in FROM_LIST_END:
+            in_from[-1] = False
+        elif upper == 'AS' and in_from[-1]:
+            skip_ws = True
+            continue
+        out.append(token)
+    return out
+
+
+def _oracle_dual(tokens, source, target):
+    """Add FROM DUAL to a FROM-less SELECT for Oracle, or drop it for dialects without DUAL."""
+    depths = _depth_map(tokens)
+    top = [(_upper(t), i) for i, t in enumerate(tokens) if _is_sig(t) and depths[i] == 0]
+    words = [w for w, _ in top]
+    if target == 'oracle' and words and words[0] == 'SELECT' and 'FROM' not in words:
+        return _append_clause(tokens, ' FROM DUAL')
+    if target in ('postgresql', 'sqlite', 'sqlserver'):
+        for k, (word, i) in enumerate(top):
+            if word == 'FROM' and k + 1 < len(top) and top[k + 1][0] == 'DUAL' and (k + 2 == len(top)):
+                return _strip(tokens[:i]) + _split_trailing(tokens)[1]
+    return tokens
+
+
+# ---------------------------------------------------------------------------
+# Statements
+# ---------------------------------------------------------------------------
+
+SUPPORTED_VERBS = {'SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER'}
+
+# Words that always need the model when the dialects differ.
+UNSUPPORTED_WORDS = {
+    'DUPLICATE', 'RETURNING', 'OUTPUT', 'MERGE', 'PIVOT', 'UNPIVOT', 'CONNECT', 'ROWNUM',
+    'ILIKE', 'REGEXP', 'RLIKE', 'LATERAL', 'APPLY', 'DECLARE', 'BEGIN', 'PROCEDURE',
+    'FUNCTION', 'TRIGGER', 'GO', 'CONFLICT', 'IGNORE', 'STRAIGHT_JOIN', 'ARRAY', 'INTERVAL',
+    'DATE_FORMAT', 'DATEADD', 'DATEDIFF', 'DATE_ADD', 'DATE_SUB', 'GROUP_CONCAT', 'STRING_AGG', 'LISTAGG',
+    'DIV', 'XOR', 'SOUNDS', 'MATCH', 'AGAINST',
+}
+
+
+def _convert_statement(tokens, source, target):
+    """Convert one statement (without its semicolon). Returns a list of output statements."""
+    sig = _sig_tokens(tokens)
+    if not sig:
+        return [_render(tokens)]
+    verb = _upper(sig[0])
+    words = [_upper(t) for t in sig]
+    if sig.count(('op', '(')) != sig.count(('op', ')')):
+        raise UnsupportedSQL("Unbalanced parentheses")
+    if verb not in SUPPORTED_VERBS:
+        raise UnsupportedSQL(f"{sig[0][1]} statements have no rule")
+    unsupported = UNSUPPORTED_WORDS.intersection(words)
+    if unsupported:
+        raise UnsupportedSQL(f"{sorted(unsupported)[0]} has no rule")
+    if verb == 'WITH' and 'RECURSIVE' in words and target in ('sqlserver', 'oracle'):
+        tokens = _remove_words(tokens, ['RECURSIVE'])
+
+    if verb == 'CREATE':
+        kind = next((w for w in words[1:4] if w in ('TABLE', 'INDEX', 'VIEW')), None)
+        if kind == 'TABLE' and words[1] in ('TABLE', 'TEMPORARY', 'TEMP'):
+            return _convert_create_table(tokens, source, target)
+        if kind == 'INDEX':
+            tokens = _remove_words(tokens, ['USING', 'BTREE']) if target != 'mysql' else tokens
+            if 'IF' in words and target in ('sqlserver', 'oracle', 'mysql'):
+                raise UnsupportedSQL("CREATE INDEX IF NOT EXISTS has no rule for this target")
+            return [_render(_rewrite_expression(tokens, source, target))]
+        if kind == 'VIEW' and words[1] == 'VIEW':
+            return [_render(_convert_query(tokens, source, target))]
+        raise UnsupportedSQL(f"CREATE {words[1]} has no rule")
+
+    if verb == 'DROP':
+        if words[1] not in ('TABLE', 'INDEX', 'VIEW'):
+            raise UnsupportedSQL(f"DROP {words[1]} has no rule")
+        if 'IF' in words and target == 'oracle':
+            raise UnsupportedSQL("DROP ... IF EXISTS has no rule for Oracle")
+        if words[1] == 'INDEX' and 'ON' in words and target != 'mysql':
+            raise UnsupportedSQL("DROP INDEX ... ON has no rule for this target")
+        if 'CASCADE' in words and target in ('sqlserver', 'sqlite', 'mysql'):
+            tokens = _remove_words(tokens, ['CASCADE'])
+        return [_render(_rewrite_expression(tokens, source, target))]
+
+    if verb == 'ALTER':
+        return [_convert_alter(tokens, source, target)]
+
+    if verb in ('UPDATE', 'DELETE') and ('LIMIT' in words or 'TOP' in words):
+        raise UnsupportedSQL("Row limits on UPDATE/DELETE have no rule")
+
+    if verb == 'INSERT':
+        values_at = [i for i, w in enumerate(words) if w == 'VALUES']
+        if values_at and target == 'oracle':
+            rows = _split_top_level([t for t in tokens[tokens.index(sig[values_at[0]]) + 1:]])
+            if len([r for r in rows if _sig_tokens(r)]) > 1:
+                raise UnsupportedSQL("Multi-row INSERT has no rule for Oracle")
+        return [_render(_convert_query(tokens, source, target))]
+
+    return [_render(_convert_query(tokens, source, target))]
+
+
+def _convert_query(tokens, source, target):
+    words = [_upper(t) for t in _sig_tokens(tokens)]
+    depths = _depth_map(tokens)
+    nested_limits = any(
+        _upper(t) in ('LIMIT', 'TOP', 'FETCH') and depths[i] > 0 for i, t in enumerate(tokens)
+    )
+    if nested_limits:
+        raise UnsupportedSQL("Row limits inside subqueries have no rule")
+    limit = offset = None
+    if any(w in ('LIMIT', 'TOP', 'OFFSET', 'FETCH') for w in words):
+        tokens, limit, offset = _extract_row_limit(tokens)
+    tokens = _rewrite_expression(tokens, source, target)
+    if target == 'oracle':
+        tokens = _drop_table_alias_as(tokens)
+    tokens = _oracle_dual(tokens, source, target)
+    return _apply_row_limit(tokens, limit, offset, target)
+
+
+def _convert_alter(tokens, source, target):
+    sig = [i for i, t in enumerate(tokens) if _is_sig(t)]
+    words = [_upper(tokens[i]) for i in sig]
+    if words[1] != 'TABLE' or len(words) < 5:
+        raise UnsupportedSQL("Only ALTER TABLE has rules")
+    action = words[3]
+    if action == 'DROP' or (action == 'RENAME' and target != 'sqlserver'):
+        return _render(_rewrite_expression(tokens, source, target))
+    if action != 'ADD':
+        raise UnsupportedSQL(f"ALTER TABLE {action} has no rule")
+    column_start = 4
+    if words[4] == 'COLUMN':
+        column_start = 5
+    elif words[4] in ('CONSTRAINT', 'PRIMARY', 'FOREIGN', 'UNIQUE', 'CHECK', 'INDEX', 'KEY'):
+        if words[4] in ('INDEX', 'KEY'):
+            raise UnsupportedSQL("ALTER TABLE ADD INDEX has no rule")
+        return _render(_rewrite_expression(tokens, source, target))
+    column_tokens, _, _ = _column_definition(_strip(tokens[sig[column_start]:]), source, target, None, [])
+    head = _rewrite_expression(tokens[:sig[4]], source, target)
+    keyword = 'ADD ' if target in ('sqlserver', 'oracle') else 'ADD COLUMN '
+    head = _strip(_strip(head)[:-1]) + [('ws', ' ')]
+    return _render(head) + keyword + _render(column_tokens)
+
+
+def convert_statement(statement_sql, source, target):
+    """Convert a single statement; raises UnsupportedSQL if any part has no rule."""
+    return _convert_statement(tokenize(statement_sql, source), source, target)
+
+
+def transpile(sql, source, target):
+    """
+    Convert a (multi-statement) script between dialects.
+
+    Returns a list of dicts, one per input statement:
+        {"source": original text, "converted": converted text or None, "error": reason or None}
+    'converted' may hold several statements separated by ';\\n' when the rules
+    split one statement (e.g. MySQL inline indexes become CREATE INDEX statements).
+    """
+    if source not in DIALECTS or target not in DIALECTS:
+        raise ValueError(f"Supported dialects are: {', '.join(DIALECTS)}")
+
+    try:
+        statements = split_statements(tokenize(sql, source))
+    except UnsupportedSQL as e:
+        return [{"source": sql.strip(), "converted": None, "error": str(e)}]
+
+    results = []
+    for tokens in statements:
+        text = _render(tokens).strip()
+        if not _sig_tokens(tokens):
+            continue
+        if source == target:
+            results.append({"source": text, "converted": text, "error": None})
+            continue
+        try:
+            converted = join_statements(_convert_statement(tokens, source, target), target, terminate_last=False)
+            results.append({"source": text, "converted": converted, "error": None})
+        except (UnsupportedSQL, StopIteration, IndexError) as e:
+            results.append({"source": text, "converted": None, "error": str(e) or "Statement has no rule"})
+    return results
+
+
+def _terminate(statement, dialect):
+    try:
+        body, trailing = _split_trailing(tokenize(statement, dialect))
+    except UnsupportedSQL:
+        # Not valid input for the tokenizer (e.g. model output): a new line keeps ';' out of a line comment.
+        return statement + '\n;'
+    if body and body[-1] == ('op', ';'):
+        return statement
+    return _render(body) + ';' + _render(trailing)
+
+
+def join_statements(statements, dialect, terminate_last=True):
+    """
+    Join statements into one script, ending each with ';'. The semicolon goes in
+    front of a statement's trailing comments, so a '-- comment' cannot swallow it.
+    With terminate_last unset the last statement is left without one.
+    """
+    statements = [s.strip() for s in statements]
+    return '\n'.join(
+        _terminate(s, dialect) if k + 1 < len(statements) or terminate_last else s
+        for k, s in enumerate(statements)
+    )
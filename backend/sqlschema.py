@@ -0,0 +1,450 @@
+"""
+Local parser for CREATE TABLE statements.
+
+Turns a DDL script (one table or a whole schema dump) into the JSON shape
+/api/sql-to-schema has always returned, plus table-level constraints:
+
+    {"table_name": ..., "schema": ..., "columns": [{"name", "type", "nullable", "primary_key", "default", ...}],
+     "primary_key": [...], "foreign_keys": [...], "unique": [...], "indexes": [...], "checks": [...]}
+
+"schema" is the qualifier of a schema-qualified name such as audit.users, or
+None. CREATE INDEX and ALTER TABLE ... ADD CONSTRAINT statements (as written by
+pg_dump and mysqldump) are applied to the tables they refer to.
+"""
+from sqldialect import UnsupportedSQL, tokenize, split_statements, unquote_identifier, parse_type
+
+# Column modifiers that belong to the type rather than to the constraints.
+TYPE_MODIFIERS = {'UNSIGNED', 'SIGNED', 'ZEROFILL'}
+SERIAL_TYPES = {'SERIAL', 'BIGSERIAL', 'SMALLSERIAL'}
+LENGTH_TYPES = {'CHAR', 'VARCHAR', 'NCHAR', 'NVARCHAR', 'VARCHAR2', 'NVARCHAR2', 'CHARACTER', 'CHARACTER VARYING', 'BINARY', 'VARBINARY', 'BIT'}
+DECIMAL_TYPES = {'DECIMAL', 'NUMERIC', 'NUMBER', 'DEC'}
+REFERENTIAL_ACTIONS = {'CASCADE', 'RESTRICT', 'SET', 'NO', 'NULL', 'DEFAULT', 'ACTION'}
+
+
+def _upper(token):
+    return token[1].upper() if token and token[0] == 'word' else None
+
+
+def _name(token):
+    return unquote_identifier(token[1]) if token[0] == 'qident' else token[1]
+
+
+def _at(tokens, i):
+    return tokens[i] if i < len(tokens) else None
+
+
+def _group(tokens, i):
+    """tokens[i] is '('; return (inner tokens, index after the matching ')')."""
+    depth = 0
+    for j in range(i, len(tokens)):
+        if tokens[j] == ('op', '('):
+            depth += 1
+        elif tokens[j] == ('op', ')'):
+            depth -= 1
+            if depth == 0:
+                return tokens[i + 1:j], j + 1
+    raise UnsupportedSQL("Unbalanced parentheses")
+
+
+def _split(tokens):
+    parts = [[]]
+    depth = 0
+    for token in tokens:
+        if token == ('op', '('):
+            depth += 1
+        elif token == ('op', ')'):
+            depth -= 1
+        if depth == 0 and token == ('op', ','):
+            parts.append([])
+        else:
+            parts[-1].append(token)
+    return [part for part in parts if part]
+
+
+def _text(tokens):
+    """Render significant tokens back to SQL with conventional spacing."""
+    out = ''
+    prev = None
+    for token in tokens:
+        text = token[1]
+        if prev is not None and not (
+            text in (',', ')', '.', '::', ']') or prev[1] in ('(', '.', '::', '[')
+            or (text == '(' and prev[0] in ('word', 'qident'))
+            or (text == '[' and prev[0] in ('word', 'qident'))
+        ):
+            out += ' '
+        out += text
+        prev = token
+    return out
+
+
+def _qualified_name(tokens, i):
+    """Read name(.name)*; returns (last part, qualifier or None, index after the name)."""
+    parts = [_name(tokens[i])]
+    i += 1
+    while _at(tokens, i) == ('op', '.') and i + 1 < len(tokens):
+        parts.append(_name(tokens[i + 1]))
+        i += 2
+    return parts[-1], '.'.join(parts[:-1]) or None, i
+
+
+def _column_names(tokens):
+    names = []
+    for part in _split(tokens):
+        names.append(_name(part[0]))
+    return names
+
+
+def _read_value(tokens, i):
+    """Read a DEFAULT / ON UPDATE expression; returns (value, index after it)."""
+    token = tokens[i]
+    if token == ('op', '('):
+        inner, end = _group(tokens, i)
+        value, _ = _read_value(inner, 0) if len(inner) == 1 else (_text(inner), None)
+    elif token[0] == 'op' and token[1] in ('-', '+') and _at(tokens, i + 1) and tokens[i + 1][0] == 'number':
+        value, end = token[1] + tokens[i + 1][1] if token[1] == '-' else tokens[i + 1][1], i + 2
+    elif token[0] == 'string':
+        text = token[1][1:] if token[1][0] in 'Nn' else token[1]
+        value, end = text[1:-1].replace("''", "'").replace("\\'", "'"), i + 1
+    elif _upper(token) == 'NULL':
+        value, end = None, i + 1
+    elif token[0] == 'word' and _at(tokens, i + 1) == ('op', '('):
+        inner, end = _group(tokens, i + 1)
+        value = token[1] + '(' + _text(inner) + ')'
+    else:
+        value, end = token[1], i + 1
+    # PostgreSQL casts such as 'active'::character varying.
+    while _at(tokens, end) == ('op', '::'):
+        end += 2
+        while _at(tokens, end) and _at(tokens, end)[0] == 'word' and _upper(_at(tokens, end)) in ('VARYING', 'PRECISION'):
+            end += 1
+        if _at(tokens, end) == ('op', '('):
+            _, end = _group(tokens, end)
+    return value, end
+
+
+def _read_references(tokens, i):
+    """tokens[i] is REFERENCES; returns (reference dict, index after the clause)."""
+    table, _, i = _qualified_name(tokens, i + 1)
+    columns = []
+    if _at(tokens, i) == ('op', '('):
+        inner, i = _group(tokens, i)
+        columns = _column_names(inner)
+    reference = {'table': table, 'columns': columns, 'on_delete': None, 'on_update': None}
+    while _upper(_at(tokens, i)) in ('ON', 'MATCH', 'DEFERRABLE', 'NOT', 'INITIALLY'):
+        if _upper(tokens[i]) == 'ON' and _upper(_at(tokens, i + 1)) in ('DELETE', 'UPDATE'):
+            event = 'on_' + _upper(tokens[i + 1]).lower()
+            i += 2
+            action = []
+            while _upper(_at(tokens, i)) in REFERENTIAL_ACTIONS:
+                action.append(_upper(tokens[i]))
+                i += 1
+            reference[event] = ' '.join(action)
+        else:
+            i += 2 if _upper(tokens[i]) in ('MATCH', 'INITIALLY', 'NOT') else 1
+    return reference, i
+
+
+def _new_column(name, type_name, params, type_text):
+    column = {
+        'name': name,
+        'type': type_text,
+        'nullable': True,
+        'primary_key': False,
+        'default': None,
+        'unique': False,
+        'auto_increment': type_name in SERIAL_TYPES,
+        'references': None,
+        'length': None,
+        'precision': None,
+        'scale': None,
+        'values': None,
+    }
+    numbers = [p.strip() for p in params.split(',')] if params else []
+    if type_name in LENGTH_TYPES and numbers and numbers[0].isdigit():
+        column['length'] = int(numbers[0])
+    elif type_name in DECIMAL_TYPES and numbers and numbers[0].isdigit():
+        column['precision'] = int(numbers[0])
+        column['scale'] = int(numbers[1]) if len(numbers) > 1 and numbers[1].lstrip('-').isdigit() else 0
+    elif type_name in ('ENUM', 'SET') and params:
+        values = tokenize(params, 'sqlserver')
+        column['values'] = [t[1][1:-1].replace("''", "'") for t in values if t[0] == 'string']
+    return column
+
+
+def _parse_column(item, checks):
+    """Parse one column definition; its CHECK constraints are added to checks."""
+    name = _name(item[0])
+    if len(item) < 2 or item[1][0] != 'word':
+        # SQLite allows columns without a type.
+        type_name, params, i = '', None, 1
+    else:
+        type_name, params, i = parse_type(item, 1)
+    type_text = type_name + (f"({params})" if params is not None else '')
+    while _upper(_at(item, i)) in TYPE_MODIFIERS:
+        type_text += ' ' + _upper(item[i])
+        i += 1
+    while _at(item, i) == ('op', '[') or (_at(item, i) and item[i][0] == 'qident' and item[i][1].startswith('[')):
+        # PostgreSQL array types, e.g. TEXT[]
+        if item[i] == ('op', '['):
+            while _at(item, i) != ('op', ']'):
+                i += 1
+        type_text += '[]'
+        i += 1
+
+    column = _new_column(name, type_name, params, type_text)
+    while i < len(item):
+        upper = _upper(item[i])
+        if upper == 'NOT' and _upper(_at(item, i + 1)) == 'NULL':
+            column['nullable'] = False
+            i += 2
+        elif upper == 'NULL':
+            i += 1
+        elif upper == 'PRIMARY' and _upper(_at(item, i + 1)) == 'KEY':
+            column['primary_key'] = True
+            column['nullable'] = False
+            i += 2
+        elif upper == 'UNIQUE':
+            column['unique'] = True
+            i += 2 if _upper(_at(item, i + 1)) == 'KEY' else 1
+        elif upper == 'DEFAULT':
+            column['default'], i = _read_value(item, i + 1)
+        elif upper in ('AUTO_INCREMENT', 'AUTOINCREMENT'):
+            column['auto_increment'] = True
+            i += 1
+        elif upper == 'IDENTITY':
+            column['auto_increment'] = True
+            i += 1
+            if _at(item, i) == ('op', '('):
+                _, i = _group(item, i)
+        elif upper == 'GENERATED':
+            # GENERATED {ALWAYS | BY DEFAULT} AS {IDENTITY | (expr)}
+            while i < len(item) and _upper(item[i]) != 'AS':
+                i += 1
+            i += 1
+            if _upper(_at(item, i)) == 'IDENTITY':
+                column['auto_increment'] = True
+                i += 1
+            if _at(item, i) == ('op', '('):
+                _, i = _group(item, i)
+        elif upper == 'REFERENCES':
+            reference, i = _read_references(item, i)
+            column['references'] = {
+                'table': reference['table'],
+                'column': reference['columns'][0] if reference['columns'] else None,
+                'on_delete': reference['on_delete'],
+                'on_update': reference['on_update'],
+            }
+        elif upper == 'ON' and _upper(_at(item, i + 1)) == 'UPDATE':
+            _, i = _read_value(item, i + 2)
+        elif upper == 'CHECK' and _at(item, i + 1) == ('op', '('):
+            inner, i = _group(item, i + 1)
+            checks.append(_text(inner))
+        elif upper in ('CONSTRAINT', 'COMMENT', 'COLLATE', 'CHARSET'):
+            i += 2
+        elif upper == 'CHARACTER' and _upper(_at(item, i + 1)) == 'SET':
+            i += 3
+        elif item[i] == ('op', '('):
+            _, i = _group(item, i)
+        else:
+            i += 1
+    return column
+
+
+def _apply_constraint(table, item):
+    """Apply a table-level constraint (the tokens of one item). Returns False if item is not one."""
+    i = 0
+    name = None
+    if _upper(item[0]) == 'CONSTRAINT':
+        name = _name(item[1])
+        i = 2
+    kind = _upper(_at(item, i))
+    columns_by_name = {c['name']: c for c in table['columns']}
+
+    def column_list(start):
+        while _at(item, start) != ('op', '('):
+            start += 1
+        inner, end = _group(item, start)
+        return _column_names(inner), end
+
+    if kind == 'PRIMARY':
+        columns, _ = column_list(i)
+        table['primary_key'] = columns
+        for column_name in columns:
+            if column_name in columns_by_name:
+                columns_by_name[column_name]['primary_key'] = True
+                columns_by_name[column_name]['nullable'] = False
+    elif kind == 'UNIQUE':
+        columns, _ = column_list(i)
+        table['unique'].append(columns)
+        if len(columns) == 1 and columns[0] in columns_by_name:
+            columns_by_name[columns[0]]['unique'] = True
+    elif kind == 'FOREIGN':
+        columns, end = column_list(i)
+        while _upper(_at(item, end)) != 'REFERENCES':
+            end += 1
+        reference, _ = _read_references(item, end)
+        table['foreign_keys'].append({
+            'name': name,
+            'columns': columns,
+            'references_table': reference['table'],
+            'references_columns': reference['columns'],
+            'on_delete': reference['on_delete'],
+            'on_update': reference['on_update'],
+        })
+        if len(columns) == 1 and columns[0] in columns_by_name:
+            columns_by_name[columns[0]]['references'] = {
+                'table': reference['table'],
+                'column': reference['columns'][0] if reference['columns'] else None,
+                'on_delete': reference['on_delete'],
+                'on_update': reference['on_update'],
+            }
+    elif kind == 'CHECK':
+        inner, _ = _group(item, i + 1)
+        table['checks'].append(_text(inner))
+    elif kind in ('KEY', 'INDEX', 'FULLTEXT', 'SPATIAL'):
+        index_name = None
+        j = i + 1
+        while _at(item, j) != ('op', '('):
+            if _upper(item[j]) not in ('KEY', 'INDEX'):
+                index_name = _name(item[j])
+            j += 1
+        columns, _ = column_list(j)
+        table['indexes'].append({'name': index_name, 'columns': columns, 'unique': False})
+    elif kind in ('EXCLUDE', 'PERIOD'):
+        pass
+    else:
+        return False
+    return True
+
+
+def _parse_create_table(tokens):
+    i = 1
+    while _upper(tokens[i]) != 'TABLE':
+        i += 1
+    i += 1
+    if [_upper(t) for t in tokens[i:i + 3]] == ['IF', 'NOT', 'EXISTS']:
+        i += 3
+    table_name, schema, i = _qualified_name(tokens, i)
+    table = {
+        'table_name': table_name,
+        'schema': schema,
+        'columns': [],
+        'primary_key': [],
+        'foreign_keys': [],
+        'unique': [],
+        'indexes': [],
+        'checks': [],
+    }
+    if _at(tokens, i) != ('op', '('):
+        # CREATE TABLE ... AS SELECT / LIKE: the columns come from elsewhere.
+        raise UnsupportedSQL(f"CREATE TABLE {table_name} without a column list (AS SELECT or LIKE) is not supported; "
+                             f"list the columns explicitly")
+    inner, _ = _group(tokens, i)
+    items = _split(inner)
+    constraints = []
+    for item in items:
+        first = _upper(item[0])
+        if first == 'LIKE':
+            raise UnsupportedSQL(f"CREATE TABLE {table_name} (LIKE ...) is not supported; list the columns explicitly")
+        is_constraint = first in ('CONSTRAINT', 'PRIMARY', 'FOREIGN', 'CHECK', 'KEY', 'INDEX', 'FULLTEXT', 'SPATIAL', 'EXCLUDE', 'PERIOD') or (
+            first == 'UNIQUE' and (_upper(_at(item, 1)) in ('KEY', 'INDEX') or _at(item, 1) == ('op', '('))
+        )
+        if is_constraint:
+            constraints.append(item)
+        else:
+            table['columns'].append(_parse_column(item, table['checks']))
+    if not table['columns']:
+        raise UnsupportedSQL(f"CREATE TABLE {table_name} has no columns")
+    for item in constraints:
+        _apply_constraint(table, item)
+    if not table['primary_key']:
+        table['primary_key'] = [c['name'] for c in table['columns'] if c['primary_key']]
+    return table
+
+
+def _find_table(tables, table_name, schema):
+    """
+    The table a CREATE INDEX or ALTER TABLE refers to: the exact schema-qualified
+    match, else the only table of that name. None when there is no such table or
+    an unqualified name is ambiguous.
+    """
+    table = tables.get((schema, table_name))
+    if table is None:
+        matches = [t for (_, name), t in tables.items() if name == table_name]
+        table = matches[0] if len(matches) == 1 else None
+    return table
+
+
+def _apply_create_index(tables, tokens):
+    unique = _upper(tokens[1]) == 'UNIQUE'
+    i = tokens.index(next(t for t in tokens if _upper(t) == 'ON'))
+    index_name = None
+    for token in tokens[2:i]:
+        if _upper(token) not in ('INDEX', 'UNIQUE', 'CONCURRENTLY', 'IF', 'NOT', 'EXISTS', 'CLUSTERED', 'NONCLUSTERED'):
+            index_name = _name(token)
+    table_name, schema, j = _qualified_name(tokens, i + 1 + (_upper(_at(tokens, i + 1)) == 'ONLY'))
+    table = _find_table(tables, table_name, schema)
+    if table is None:
+        return
+    while _at(tokens, j) and _at(tokens, j) != ('op', '('):
+        j += 1
+    if _at(tokens, j) is None:
+        return
+    inner, _ = _group(tokens, j)
+    columns = _column_names(inner)
+    table['indexes'].append({'name': index_name, 'columns': columns, 'unique': unique})
+    if unique:
+        table['unique'].append(columns)
+        if len(columns) == 1:
+            for column in table['columns']:
+                if column['name'] == columns[0]:
+                    column['unique'] = True
+
+
+def _apply_alter_table(tables, tokens):
+    i = 2
+    while _upper(_at(tokens, i)) in ('ONLY', 'IF', 'EXISTS'):
+        i += 1
+    table_name, schema, i = _qualified_name(tokens, i)
+    table = _find_table(tables, table_name, schema)
+    if table is None:
+        return
+    for action in _split(tokens[i:]):
+        if _upper(action[0]) == 'ADD' and len(action) > 1:
+            item = action[1:]
+            if _upper(item[0]) == 'COLUMN':
+                item = item[1:]
+            if not _apply_constraint(table, item) and item[0][0] in ('word', 'qident'):
+                table['columns'].append(_parse_column(item, table['checks']))
+
+
+def parse_schema(sql, dialect=None):
+    """
+    Parse every CREATE TABLE in sql. dialect picks the tokenizer rules
+    ('mysql' for backslash escapes and # comments); by default MySQL is assumed
+    when the script uses backtick quoting.
+    Returns a list of table dicts in the order they were created; tables of the
+    same name in different schemas are kept apart.
+    """
+    if dialect is None:
+        dialect = 'mysql' if '`' in sql else 'sqlserver'
+    tables = {}
+    for statement in split_statements(tokenize(sql, dialect)):
+        tokens = [t for t in statement if t[0] not in ('ws', 'comment')]
+        if len(tokens) < 3:
+            continue
+        verb = _upper(tokens[0])
+        try:
+            if verb == 'CREATE':
+                words = [_upper(t) for t in tokens[1:4]]
+                if 'TABLE' in words:
+                    table = _parse_create_table(tokens)
+                    tables[(table['schema'], table['table_name'])] = table
+                elif 'INDEX' in words:
+                    _apply_create_index(tables, tokens)
+            elif verb == 'ALTER' and _upper(tokens[1]) == 'TABLE':
+                _apply_alter_table(tables, tokens)
+        except (IndexError, StopIteration):
+            raise UnsupportedSQL(f"Could not parse: {_text(tokens)[:80]}")
+    return list(tables.values())
@@ -0,0 +1,45 @@
+"""
+Write a zip archive as a stream of byte chunks, so a response can start before
+all its members are produced and no member is ever held in memory whole.
+"""
+import io
+import zipfile
+
+
+class _Sink(io.RawIOBase):
+    """Unseekable write-only file that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(entries, compression=zipfile.ZIP_DEFLATED):
+    """
+    Yield the bytes of a zip archive built from entries, an iterable of
+    (member_name, chunks) where chunks is an iterable of bytes or str.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=compression) as archive:
+        for name, chunks in entries:
+            with archive.open(name, 'w', force_zip64=True) as member:
+                for chunk in chunks:
+                    member.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
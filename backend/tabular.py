@@ -0,0 +1,335 @@
+"""
+Conversions between tabular file formats: CSV, XLSX, Parquet, Feather (Arrow IPC)
+and NDJSON.
+
+Every source is read as a stream of Arrow record batches. Column types are
+inferred from the first block of the file, and that schema is reused to parse
+every later block and to set up the output writer, so nothing is inferred
+twice. When a later block has a value that does not fit its column's type,
+convert() starts over with that column read as text.
+
+Needs the 'pyarrow' package (listed in requirements.txt); plain CSV <-> XLSX
+conversion lives in spreadsheet.py.
+"""
+import json
+import os
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.ipc as paipc
+import pyarrow.json as pajson
+import pyarrow.parquet as pq
+
+from spreadsheet import open_xlsx, write_xlsx
+
+FORMATS = ('csv', 'xlsx', 'parquet', 'feather', 'ndjson')
+
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.xlsx': 'xlsx',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.ipc': 'feather',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+FILE_EXTENSIONS = {'csv': '.csv', 'xlsx': '.xlsx', 'parquet': '.parquet', 'feather': '.feather', 'ndjson': '.ndjson'}
+
+MIMETYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+    'feather': 'application/vnd.apache.arrow.file',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows per record batch for sources read row by row (XLSX, Parquet).
+BATCH_ROWS = int(os.environ.get('TABLE_BATCH_ROWS', 65536))
+# Bytes per block for CSV/NDJSON; the first block is what types are inferred from.
+BLOCK_BYTES = int(os.environ.get('TABLE_BLOCK_BYTES', 4 * 1024 * 1024))
+PARQUET_COMPRESSION = os.environ.get('PARQUET_COMPRESSION', 'snappy')
+FEATHER_COMPRESSION = os.environ.get('FEATHER_COMPRESSION', 'lz4')
+
+
+class ColumnTypeError(ValueError):
+    """A value later in the file does not fit the type inferred for its column."""
+
+    def __init__(self, column, message):
+        super().__init__(message)
+        self.column = column
+
+
+def format_for_filename(filename):
+    """The format key for a file name by its extension, or None."""
+    return EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+
+def _without_null_types(schema):
+    """Columns that were empty in the first block are read as strings instead of the null type."""
+    return {field.name: pa.string() for field in schema if pa.types.is_null(field.type)}
+
+
+def _failed_column(error, schema):
+    """Name of the column an Arrow CSV/JSON conversion error is about, or None."""
+    message = str(error)
+    match = re.search(r'In CSV column #(\d+)', message)
+    if match and int(match.group(1)) < len(schema):
+        return schema.names[int(match.group(1))]
+    match = re.search(r'Column\(/([^/)]*)', message)
+    if match:
+        return match.group(1).replace('~1', '/').replace('~0', '~')
+    return None
+
+
+def _checked(reader, schema):
+    """Re-raise conversion errors in a column that is not already text as ColumnTypeError."""
+    try:
+        yield from reader
+    except pa.ArrowInvalid as e:
+        column = _failed_column(e, schema)
+        if column is None or column not in schema.names or pa.types.is_string(schema.field(column).type):
+            raise
+        raise ColumnTypeError(column, f"Column '{column}': {e}") from e
+
+
+def _csv_batches(source, encoding, column_types):
+    read_options = pacsv.ReadOptions(block_size=BLOCK_BYTES, encoding=encoding)
+    schema = pacsv.open_csv(
+        source, read_options=read_options, convert_options=pacsv.ConvertOptions(column_types=column_types)
+    ).schema
+    source.seek(0)
+    if encoding == 'utf8' and any(pa.types.is_binary(field.type) for field in schema):
+        # Text that is not valid UTF-8 is inferred as binary; read it as latin1 instead.
+        return _csv_batches(source, 'latin1', column_types)
+    reader = pacsv.open_csv(
+        source,
+        read_options=read_options,
+        convert_options=pacsv.ConvertOptions(
+            column_types={**{f.name: f.type for f in schema}, **_without_null_types(schema), **column_types}
+        ),
+    )
+    return reader.schema, _checked(reader, reader.schema)
+
+
+def _ndjson_batches(source, column_types):
+    if column_types:
+        # Arrow's JSON reader cannot read numbers or objects as text; parse the lines here instead.
+        return _ndjson_row_batches(source, column_types)
+    read_options = pajson.ReadOptions(block_size=BLOCK_BYTES)
+    schema = pajson.open_json(source, read_options=read_options).schema
+    fields = [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in schema]
+    source.seek(0)
+    reader = pajson.open_json(
+        source,
+        read_options=read_options,
+        parse_options=pajson.ParseOptions(explicit_schema=pa.schema(fields), unexpected_field_behavior='ignore'),
+    )
+    return reader.schema, _checked(reader, reader.schema)
+
+
+def _text(value):
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else str(value)
+
+
+def _column_array(values, name, data_type=None):
+    if data_type is not None and pa.types.is_string(data_type):
+        return pa.array([None if v is None else _text(v) for v in values], type=pa.string())
+    if data_type is not None:
+        try:
+            return pa.array(values, type=data_type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError, OverflowError):
+            raise ColumnTypeError(name, f"Column '{name}' has values that do not match its type {data_type}")
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError, OverflowError):
+        # Mixed types in one column: keep it as text.
+        array = pa.array([None if v is None else _text(v) for v in values], type=pa.string())
+    if pa.types.is_null(array.type):
+        array = array.cast(pa.string())
+    return array
+
+
+def _row_batches(names, rows, column_types, close=None):
+    """
+    (schema, batches) for an iterator of row tuples: types are inferred from the first
+    BATCH_ROWS rows, or taken from column_types, and later batches must match them.
+    """
+    def take(count):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= count:
+                break
+        return batch
+
+    def columns(batch):
+        return [[row[i] if i < len(row) else None for row in batch] for i in range(len(names))]
+
+    first = take(BATCH_ROWS)
+    arrays = [_column_array(values, name, column_types.get(name)) for values, name in zip(columns(first), names)]
+    schema = pa.schema([pa.field(name, array.type) for name, array in zip(names, arrays)])
+
+    def batches():
+        try:
+            if first:
+                yield pa.record_batch(arrays, schema=schema)
+            while True:
+                batch = take(BATCH_ROWS)
+                if not batch:
+                    break
+                yield pa.record_batch(
+                    [_column_array(values, f.name, f.type) for values, f in zip(columns(batch), schema)],
+                    schema=schema,
+                )
+        finally:
+            if close:
+                close()
+
+    return schema, batches()
+
+
+def _xlsx_batches(source, column_types):
+    workbook = open_xlsx(source)
+    rows = workbook.active.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        workbook.close()
+        raise ValueError("The worksheet is empty")
+    names = [str(value) if value is not None else f"column_{i + 1}" for i, value in enumerate(header)]
+    return _row_batches(names, rows, column_types, workbook.close)
+
+
+def _ndjson_row_batches(source, column_types):
+    def objects():
+        for number, line in enumerate(source, 1):
+            if line.strip():
+                value = json.loads(line)
+                if not isinstance(value, dict):
+                    raise ValueError(f"Line {number} is not a JSON object")
+                yield value
+
+    objects = objects()
+    # Columns are the keys seen in the first batch, like Arrow's reader; later extra keys are ignored.
+    head = [value for _, value in zip(range(BATCH_ROWS), objects)]
+    names = list(dict.fromkeys(key for value in head for key in value))
+
+    def rows():
+        for value in head:
+            yield tuple(value.get(name) for name in names)
+        for value in objects:
+            yield tuple(value.get(name) for name in names)
+
+    return _row_batches(names, rows(), column_types)
+
+
+def read_batches(source, fmt, encoding='utf8', column_types=None):
+    """
+    Open a seekable binary file object as (schema, record batch iterator).
+    encoding only applies to CSV; column_types ({name: Arrow type}) overrides
+    inferred types for CSV, NDJSON and XLSX. Iterating raises ColumnTypeError
+    when a later value does not fit its column's type.
+    """
+    column_types = column_types or {}
+    if fmt == 'csv':
+        return _csv_batches(source, encoding, column_types)
+    if fmt == 'ndjson':
+        return _ndjson_batches(source, column_types)
+    if fmt == 'parquet':
+        parquet_file = pq.ParquetFile(source)
+        return parquet_file.schema_arrow, parquet_file.iter_batches(batch_size=BATCH_ROWS)
+    if fmt == 'feather':
+        reader = paipc.open_file(source)
+        return reader.schema, (reader.get_batch(i) for i in range(reader.num_record_batches))
+    if fmt == 'xlsx':
+        return _xlsx_batches(source, column_types)
+    raise ValueError(f"Unsupported source format: {fmt}")
+
+
+def _xlsx_frames(batches):
+    for batch in batches:
+        frame = batch.to_pandas()
+        for column in frame.columns:
+            # Excel cannot store time zones; write the UTC time they were normalised to.
+            if isinstance(frame[column].dtype, pd.DatetimeTZDtype):
+                frame[column] = frame[column].dt.tz_localize(None)
+        yield frame
+
+
+def _iso_strings(batch):
+    """Dates and times as ISO 8601 text, formatted by Arrow; pandas is slow at tz-aware values."""
+    columns = []
+    for column, field in zip(batch.columns, batch.schema):
+        if pa.types.is_timestamp(field.type):
+            column = pc.strftime(column, '%Y-%m-%dT%H:%M:%S' + ('%z' if field.type.tz else ''))
+        elif pa.types.is_date(field.type) or pa.types.is_time(field.type):
+            column = column.cast(pa.string())
+        columns.append(column)
+    return pa.record_batch(columns, names=batch.schema.names)
+
+
+def write_batches(schema, batches, destination, fmt):
+    """Write record batches to a binary file object in the given format. Returns the row count."""
+    rows = 0
+
+    def counted():
+        nonlocal rows
+        for batch in batches:
+            rows += batch.num_rows
+            yield batch
+
+    if fmt == 'parquet':
+        with pq.ParquetWriter(destination, schema, compression=PARQUET_COMPRESSION) as writer:
+            for batch in counted():
+                writer.write_batch(batch)
+    elif fmt == 'feather':
+        options = paipc.IpcWriteOptions(compression=FEATHER_COMPRESSION)
+        with paipc.new_file(destination, schema, options=options) as writer:
+            for batch in counted():
+                writer.write_batch(batch)
+    elif fmt == 'csv':
+        with pacsv.CSVWriter(destination, schema) as writer:
+            for batch in counted():
+                writer.write_batch(batch)
+    elif fmt == 'ndjson':
+        for batch in counted():
+            lines = _iso_strings(batch).to_pandas().to_json(orient='records', lines=True, force_ascii=False)
+            destination.write(lines.encode('utf-8'))
+            if lines and not lines.endswith('\n'):
+                destination.write(b'\n')
+    elif fmt == 'xlsx':
+        write_xlsx(schema.names, _xlsx_frames(counted()), destination)
+    else:
+        raise ValueError(f"Unsupported target format: {fmt}")
+    return rows
+
+
+def convert(source, source_format, destination, target_format):
+    """
+    Convert between any two FORMATS. source must be seekable; CSV that is not
+    valid UTF-8, in the first block or later, is re-read as latin1, and a column
+    with a value that does not fit the inferred type is re-read as text.
+    Returns (rows, schema).
+    """
+    column_types = {}
+    for encoding in ('utf8', 'latin1'):
+        while True:
+            source.seek(0)
+            destination.seek(0)
+            destination.truncate()
+            try:
+                schema, batches = read_batches(source, source_format, encoding, column_types)
+                return write_batches(schema, batches, destination, target_format), schema
+            except ColumnTypeError as e:
+                if e.column in column_types:
+                    raise
+                column_types[e.column] = pa.string()
+            except pa.ArrowInvalid as e:
+                if source_format != 'csv' or encoding == 'latin1' or 'UTF8' not in str(e).upper().replace('-', ''):
+                    raise
+                break
@@ -0,0 +1,52 @@
+"""
+Shared fixtures. The backend modules import each other by bare name, so the
+backend directory goes on sys.path, and model calls go to the offline stub
+provider from llmstub.py instead of Gemini.
+"""
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LLM_PROVIDER', 'stub')
+os.environ.setdefault('LLM_STUB_LATENCY_MS', '0')
+
+import pytest
+
+
+@pytest.fixture
+def client():
+    from app import app
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    """GET /<n> answers with n bytes of 'x'; GET /cookie also sets a cookie."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        path = self.path.split('?')[0].strip('/')
+        body = b'x' * (int(path) if path.isdigit() else 2)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        if path == 'cookie':
+            self.send_header('Set-Cookie', 'session=secret')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='session')
+def upstream():
+    """Base URL of a local keep-alive HTTP server for the outbound client tests."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), UpstreamHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
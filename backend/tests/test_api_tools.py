@@ -0,0 +1,66 @@
+import pytest
+
+from metrics import percentile
+
+
+@pytest.mark.parametrize('pct, expected', [(0, 1), (50, 5), (95, 10), (99, 10), (100, 10)])
+def test_percentile_nearest_rank(pct, expected):
+    assert percentile(list(range(1, 11)), pct) == expected
+
+
+def test_percentile_of_nothing():
+    assert percentile([], 50) is None
+
+
+def test_batch_keeps_order_and_summarizes(client, upstream):
+    specs = [{'url': f"{upstream}/{n}"} for n in (5, 10, 15)]
+    response = client.post('/api/request/batch', json={'requests': specs, 'concurrency': 2})
+    assert response.status_code == 200
+    assert [r['body_bytes'] for r in response.json['results']] == [5, 10, 15]
+    summary = response.json['summary']
+    assert (summary['succeeded'], summary['status_counts'], summary['concurrency']) == (3, {'200': 3}, 2)
+
+
+def test_batch_bodies_share_a_budget(client, upstream, monkeypatch):
+    monkeypatch.setattr('routes.ApiTools_route.BATCH_MAX_TOTAL_BODY_BYTES', 25)
+    specs = [{'url': f"{upstream}/10"} for _ in range(4)]
+    results = client.post('/api/request/batch', json={'requests': specs, 'concurrency': 1}).json['results']
+    assert [r.get('body_omitted', False) for r in results] == [False, False, False, True]
+    assert results[2]['truncated']
+
+
+def test_load_test(client, upstream):
+    response = client.post('/api/request/load-test', json={
+        'request': {'url': f"{upstream}/100"}, 'iterations': 20, 'concurrency': 4})
+    assert response.status_code == 200
+    summary = response.json['summary']
+    assert summary['total'] == summary['succeeded'] == 20
+    assert summary['latency_ms']['p50'] <= summary['latency_ms']['p99']
+
+
+@pytest.mark.parametrize('body, message', [
+    ({}, "'requests' list"),
+    ({'requests': []}, "'requests' list"),
+    ({'requests': [{'url': 'http://x', 'method': 'TRACE'}]}, 'requests[0]: Unsupported HTTP method'),
+    ({'requests': [{'url': 'http://x'}, 'x']}, 'requests[1]: Each request must be an object'),
+    ({'requests': [{'url': 5}]}, 'url must be a string'),
+    ({'requests': [{'url': 'http://x', 'timeout': 0}]}, 'timeout'),
+    ({'requests': [{'url': 'http://x', 'headers': []}]}, 'headers must be an object'),
+    ({'requests': [{'url': 'http://x'}], 'concurrency': 0}, 'Invalid concurrency'),
+    ({'requests': [{'url': 'http://x'}], 'concurrency': 'many'}, 'Invalid concurrency'),
+])
+def test_batch_rejects(client, body, message):
+    response = client.post('/api/request/batch', json=body)
+    assert response.status_code == 400
+    assert message in response.json['error']
+
+
+@pytest.mark.parametrize('body', [
+    {},
+    {'request': 'http://x'},
+    {'request': {'url': 'http://x'}, 'iterations': 0},
+    {'request': {'url': 'http://x'}, 'iterations': 'lots'},
+    {'request': {'url': 'http://x', 'max_body_bytes': -1}},
+])
+def test_load_test_rejects(client, body):
+    assert client.post('/api/request/load-test', json=body).status_code == 400
@@ -0,0 +1,66 @@
+import json
+
+from chunking import split_for_formatting
+
+
+def test_python_splits_at_definitions_with_their_comments():
+    code = 'import os\n\n# helper\n@decorator\ndef a():\n    return 1\n\nclass B:\n    pass\n'
+    chunks, join = split_for_formatting(code, 'python', 20)
+    assert chunks == ['import os\n', '\n# helper\n@decorator\ndef a():\n    return 1\n', '\nclass B:\n    pass\n']
+    assert join(chunks) == 'import os\n\n\n# helper\n@decorator\ndef a():\n    return 1\n\n\nclass B:\n    pass'
+
+
+def test_small_units_are_packed_together():
+    code = ''.join(f'x{i} = {i}\n' for i in range(10))
+    chunks, _ = split_for_formatting(code, 'python', 30)
+    assert all(len(chunk) <= 30 for chunk in chunks)
+    assert ''.join(chunks) == code
+
+
+def test_javascript_keeps_continuations_with_their_block():
+    code = ('if (a) {\n  f();\n}\nelse {\n  g();\n}\n'
+            'try {\n  h();\n}\ncatch (e) {\n}\n'
+            'do {\n  i();\n}\nwhile (x);\n'
+            'promise.then(() => {\n})\n.catch(() => {\n});\n')
+    chunks, _ = split_for_formatting(code, 'javascript', 1)
+    assert [chunk.split('\n')[0] for chunk in chunks] == ['if (a) {', 'try {', 'do {', 'promise.then(() => {']
+
+
+def test_css_splits_before_class_selectors():
+    chunks, _ = split_for_formatting('a {\n}\n.b {\n}\n', 'css', 1)
+    assert chunks == ['a {\n}\n', '.b {\n}\n']
+
+
+def test_json_chunks_are_valid_documents():
+    code = json.dumps({f'k{i}': {'v': i} for i in range(20)})
+    chunks, join = split_for_formatting(code, 'json', 60)
+    assert len(chunks) > 1
+    parts = [json.loads(chunk) for chunk in chunks]
+    formatted = [json.dumps(part, indent=2) for part in parts]
+    assert json.loads(join(formatted)) == json.loads(code)
+
+
+def test_json_keys_keep_non_ascii_text():
+    chunks, _ = split_for_formatting('{"ключ": "значение", "b": 1}', 'json', 1)
+    assert chunks[0] == '{"ключ": "значение"}'
+
+
+def test_xml_chunks_are_root_children():
+    code = '<?xml version="1.0"?><root a="1">' + ''.join(f'<item n="{i}"/>' for i in range(5)) + '</root>'
+    chunks, join = split_for_formatting(code, 'xml', 30)
+    assert chunks[0].startswith('<item')
+    joined = join(chunks)
+    assert joined.startswith('<?xml version="1.0"?>\n<root a="1">\n    <item n="0"/>')
+    assert joined.endswith('</root>')
+
+
+def test_yaml_splits_at_top_level_keys():
+    chunks, join = split_for_formatting('a:\n  b: 1\nc: 2\n', 'yaml', 1)
+    assert chunks == ['a:\n  b: 1\n', 'c: 2\n']
+    assert join(chunks) == 'a:\n  b: 1\nc: 2'
+
+
+def test_unsplittable_input_is_one_chunk():
+    for code, language in (('def f(:\n', 'python'), ('{"a": ', 'json'), ('<a>', 'xml'), ('text', 'cobol')):
+        chunks, join = split_for_formatting(code, language, 1)
+        assert chunks == [code] and join(chunks) == code
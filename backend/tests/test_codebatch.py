@@ -0,0 +1,83 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+import codebatch
+
+ITEMS = [(f"item-{i}", 'qr', 'png') for i in range(5)] + [('bad', 'ean13', 'svg'), ('SKU-1', 'code128', 'svg')]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_render_batch_keeps_input_order(workers):
+    results = list(codebatch.render_batch(ITEMS, workers=workers, chunk_items=2))
+    assert [index for index, _, _, _ in results] == list(range(len(ITEMS)))
+    assert [item for _, item, _, _ in results] == ITEMS
+    errors = [index for index, _, data, error in results if error]
+    assert errors == [5]
+    assert all(data for _, _, data, error in results if not error)
+
+
+def test_iter_batch_zip():
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(codebatch.iter_batch_zip(ITEMS, workers=1))))
+    names = archive.namelist()
+    assert names[0] == '00001-item-0.png' and '00007-SKU-1.svg' in names
+    summary = json.loads(archive.read('summary.json'))
+    assert (summary['total'], summary['rendered'], summary['failed']) == (7, 6, 1)
+    assert summary['errors'][0]['index'] == 5
+
+
+def test_iter_batch_ndjson():
+    lines = [json.loads(line) for line in ''.join(codebatch.iter_batch_ndjson(ITEMS, workers=1)).splitlines()]
+    assert len(lines) == 8
+    assert 'data' in lines[0] and 'error' in lines[5]
+    assert lines[-1]['summary']['rendered'] == 6
+
+
+def test_generate_codes_route_ndjson(client):
+    response = client.post('/api/generate-codes', json={
+        'items': ['a', {'text': 'SKU-1', 'symbology': 'code128', 'format': 'svg'}], 'output': 'ndjson', 'size': 3})
+    assert response.status_code == 200
+    assert response.headers['X-Code-Count'] == '2'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line.get('format') for line in lines[:2]] == ['png', 'svg']
+
+
+def test_generate_codes_route_accepts_bare_list(client):
+    response = client.post('/api/generate-codes', json=['a', 'b', 'c'])
+    assert response.status_code == 200
+    assert response.mimetype == 'application/zip'
+    assert response.headers['X-Code-Count'] == '3'
+    assert len(zipfile.ZipFile(io.BytesIO(response.data)).namelist()) == 4
+
+
+def test_generate_codes_route_csv_upload(client):
+    response = client.post('/api/generate-codes', data={
+        'file': (io.BytesIO(b'sku,name\nA-1,x\nA-2,y\n,z\n'), 'skus.csv'), 'column': 'sku', 'output': 'ndjson'},
+        content_type='multipart/form-data')
+    assert response.headers['X-Code-Count'] == '2'
+
+
+@pytest.mark.parametrize('body', [
+    {},
+    5,
+    {'items': 'abc'},
+    {'items': []},
+    {'items': ['a'], 'symbology': 5},
+    {'items': ['a'], 'format': ['png']},
+    {'items': ['a'], 'output': 5},
+    {'items': ['a'], 'output': 'tar'},
+    {'items': ['a'], 'size': 0},
+    {'items': [{'text': 'a', 'symbology': 'pdf417'}]},
+    {'items': [{'text': 'a', 'format': 'gif'}]},
+])
+def test_generate_codes_route_rejects(client, body):
+    response = client.post('/api/generate-codes', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.json
+
+
+def test_generate_codes_route_rejects_too_many(client, monkeypatch):
+    monkeypatch.setattr(codebatch, 'BATCH_MAX_ITEMS', 2)
+    assert client.post('/api/generate-codes', json=['a', 'b', 'c']).status_code == 400
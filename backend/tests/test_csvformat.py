@@ -0,0 +1,137 @@
+import io
+
+import pytest
+
+import csvformat
+
+
+def normalize(data, **options):
+    info, chunks = csvformat.format_csv(io.BytesIO(data), **options)
+    return info, ''.join(chunks)
+
+
+@pytest.mark.parametrize('text, delimiter, quotechar', [
+    ('a,b,c\n1,2,3\n', ',', '"'),
+    ('a;b\n"x;y";2\n"z";3\n', ';', '"'),
+    ("a;b\n'x;y';2\n'z';3\n", ';', "'"),
+    ('a\tb\n1\t2\n', '\t', '"'),
+    ('a|b|c\n1|2|3\n', '|', '"'),
+])
+def test_sniff_dialect(text, delimiter, quotechar):
+    dialect = csvformat.sniff_dialect(text)
+    assert (dialect.delimiter, dialect.quotechar) == (delimiter, quotechar)
+
+
+def test_sniff_dialect_backslash_escapes():
+    dialect = csvformat.sniff_dialect('a,b\n"say \\"hi\\" now",2\n"x",3\n')
+    assert dialect.escapechar == '\\' and not dialect.doublequote
+
+
+def test_sniff_dialect_ignores_cut_off_last_line():
+    dialect = csvformat.sniff_dialect('a;b;c\n1;2;3\n4;5;6\n"7', truncated=True)
+    assert dialect.delimiter == ';'
+
+
+@pytest.mark.parametrize('sample, encoding', [
+    (b'\xef\xbb\xbfa,b', 'utf-8-sig'),
+    (b'\xff\xfea\x00', 'utf-16'),
+    ('café'.encode('utf-8'), 'utf-8'),
+    ('café'.encode('utf-8')[:-1], 'utf-8'),
+    ('café ok'.encode('latin1'), 'latin1'),
+])
+def test_detect_encoding(sample, encoding):
+    assert csvformat.detect_encoding(sample) == encoding
+
+
+def test_format_csv_normalizes():
+    info, output = normalize(b'name ; age\r\n  Ann ; 30\r\n\r\nBob;25\r\nBob;25\r\n', dedupe=True)
+    assert info['delimiter'] == ';'
+    assert output == 'name,age\nAnn,30\nBob,25\n'
+
+
+def test_format_csv_pads_short_rows_and_selects_columns():
+    stats = {}
+    _, output = normalize(b'a,b,c\n1,2,3\n4\n', columns=['c', 'a'], stats=stats)
+    assert output == 'c,a\n3,1\n,4\n'
+    assert stats['rows_out'] == 2
+
+
+def test_format_csv_output_options():
+    _, output = normalize(b'a,b\n1,2\n', output_delimiter='\t', quoting='all', line_ending='crlf')
+    assert output == '"a"\t"b"\r\n"1"\t"2"\r\n'
+
+
+def test_format_csv_latin1_input():
+    _, output = normalize('name\ncafé\n'.encode('latin1') + b'x,y\n')
+    assert 'café' in output
+
+
+def test_resolve_columns():
+    assert csvformat.resolve_columns(['a', 'b', 'a'], ['b', 'a', '2']) == [1, 0, 2]
+    with pytest.raises(ValueError, match='Unknown column'):
+        csvformat.resolve_columns(['a'], ['z'])
+
+
+def test_bounded_dedupe_saturates():
+    seen = csvformat.BoundedDedupe(max_keys=2)
+    assert [seen.is_duplicate([str(i)]) for i in (1, 2, 1, 3, 3)] == [False, False, True, False, False]
+    assert seen.saturated
+
+
+def test_route_json(client):
+    response = client.post('/api/csv-formatter', json={'csv_data': 'a;b\n1;2\n1;2\n', 'dedupe': True})
+    assert response.status_code == 200
+    assert response.json['formatted_csv'] == 'a,b\n1,2\n'
+    assert response.json['stats']['duplicate_rows'] == 1
+
+
+def test_route_streams_raw_body(client):
+    response = client.post('/api/csv-formatter?output_delimiter=|', data=b'a,b\n1,2\n', content_type='text/csv')
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == 'a|b\n1|2\n'
+    assert response.headers['X-Detected-Delimiter'] == "','"
+
+
+def test_route_streams_upload(client):
+    response = client.post('/api/csv-formatter', data={'file': (io.BytesIO(b'a\tb\n1\t2\n'), 'x.tsv'), 'columns': 'b'},
+                           content_type='multipart/form-data')
+    assert response.get_data(as_text=True) == 'b\n2\n'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=x.tsv'
+
+
+def test_route_encodes_the_download_name(client):
+    response = client.post('/api/csv-formatter', data={'file': (io.BytesIO(b'a\n'), 'données 1.csv')},
+                           content_type='multipart/form-data')
+    assert response.get_data(as_text=True) == 'a\n'
+    assert response.headers['Content-Disposition'] == (
+        "attachment; filename=\"donnees 1.csv\"; filename*=UTF-8''donn%C3%A9es%201.csv"
+    )
+
+
+@pytest.mark.parametrize('body', [
+    {'csv_data': 5},
+    ['a,b'],
+    {'csv_data': 'a,b\n', 'delimiter': 5},
+    {'csv_data': 'a,b\n', 'delimiter': ';;'},
+    {'csv_data': 'a,b\n', 'quoting': 'some'},
+    {'csv_data': 'a,b\n', 'line_ending': 'cr'},
+    {'csv_data': 'a,b\n', 'columns': ['z']},
+    {'csv_data': 'a,b\n', 'columns': 5},
+    {'csv_data': 'a,b\n', 'encoding': 'no-such-codec'},
+])
+def test_route_rejects(client, body):
+    response = client.post('/api/csv-formatter', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.json
+
+
+def test_route_rejects_unknown_upload_column(client):
+    response = client.post('/api/csv-formatter?columns=z', data=b'a,b\n1,2\n', content_type='text/csv')
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('encoding', ['no-such-codec', 'hex'])
+def test_route_rejects_unknown_upload_encoding(client, encoding):
+    response = client.post(f'/api/csv-formatter?encoding={encoding}', data=b'a,b\n1,2\n', content_type='text/csv')
+    assert response.status_code == 400
+    assert 'encoding' in response.json['error']
@@ -0,0 +1,13 @@
+from downloads import content_disposition
+
+
+def test_ascii_names_are_quoted_when_needed():
+    assert content_disposition('data.csv') == 'attachment; filename=data.csv'
+    assert content_disposition('my data;1.csv') == 'attachment; filename="my data;1.csv"'
+    assert content_disposition('code.png', 'inline') == 'inline; filename=code.png'
+
+
+def test_non_ascii_names_get_an_encoded_form():
+    value = content_disposition('数据 é.csv')
+    assert value == "attachment; filename=\" e.csv\"; filename*=UTF-8''%E6%95%B0%E6%8D%AE%20%C3%A9.csv"
+    value.encode('latin-1')
@@ -0,0 +1,68 @@
+import httpclient
+
+
+def test_connections_are_reused(upstream):
+    session = httpclient.build_session()
+    first = httpclient.request('GET', f"{upstream}/5", client_session=session)
+    second = httpclient.request('GET', f"{upstream}/5", client_session=session)
+    assert (first.connection_reused, second.connection_reused) == (False, True)
+    assert first.text == 'xxxxx'
+
+
+def test_cookies_are_never_kept(upstream):
+    session = httpclient.build_session()
+    httpclient.request('GET', f"{upstream}/cookie", client_session=session)
+    assert len(session.cookies) == 0
+
+
+def test_idle_pools_are_closed(upstream):
+    session = httpclient.build_session()
+    adapter = session.get_adapter(upstream)
+    httpclient.request('GET', upstream, client_session=session)
+    assert len(adapter.poolmanager.pools) == 1
+    adapter.idle_timeout = 0
+    adapter.evict_idle(force=True)
+    assert len(adapter.poolmanager.pools) == 0
+    assert httpclient.request('GET', upstream, client_session=session).connection_reused is False
+
+
+def test_host_key():
+    assert httpclient._host_key('HTTPS://Example.com/a') == ('https', 'example.com', 443)
+    assert httpclient._host_key('http://example.com:8080') == ('http', 'example.com', 8080)
+
+
+def test_response_http_version(upstream):
+    response = httpclient.request('GET', upstream, client_session=httpclient.build_session())
+    assert httpclient.response_http_version(response) == 'HTTP/1.1'
+
+
+def test_request_phase_timings(upstream):
+    session = httpclient.build_session()
+    fresh = httpclient.request('GET', upstream, client_session=session).timings
+    reused = httpclient.request('GET', upstream, client_session=session).timings
+    assert set(fresh) == {'dns_ms', 'connect_ms', 'tls_ms', 'ttfb_ms', 'total_ms'}
+    assert fresh['connect_ms'] > 0 and fresh['tls_ms'] == 0
+    assert reused['connect_ms'] == 0 and reused['ttfb_ms'] > 0
+    assert fresh['total_ms'] >= fresh['connect_ms'] + fresh['ttfb_ms']
+
+
+def test_proxy_reports_timings_and_truncates(client, upstream):
+    response = client.post('/api/request', json={'url': f"{upstream}/100", 'max_body_bytes': 10})
+    assert response.status_code == 200
+    result = response.json
+    assert (result['body_bytes'], result['truncated'], result['body']) == (10, True, 'x' * 10)
+    assert result['timing']['transfer_ms'] is not None
+
+
+def test_proxy_raw_passthrough(client, upstream):
+    response = client.post('/api/request', json={'url': f"{upstream}/100", 'raw': True, 'max_body_bytes': 40})
+    assert response.data == b'x' * 40
+    # The upstream length (100) would be wrong for the truncated body.
+    assert 'Content-Length' not in response.headers
+    assert 'total;dur=' in response.headers['Server-Timing']
+    assert response.headers['X-Max-Body-Bytes'] == '40'
+
+
+def test_proxy_rejects_bad_specs(client):
+    assert client.post('/api/request', json={'url': 'http://x', 'max_body_bytes': 'all'}).status_code == 400
+    assert client.post('/api/request', json={'method': 'GET'}).status_code == 400
@@ -0,0 +1,119 @@
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from imageconverter import ImageTooLarge, convert_image_bytes, fit_size
+
+
+def image_bytes(size=(40, 20), mode='RGBA', fmt='PNG', color=(255, 0, 0, 128)):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def open_bytes(data):
+    return Image.open(io.BytesIO(data))
+
+
+@pytest.mark.parametrize('size, width, height, expected', [
+    ((400, 200), 100, None, (100, 50)),
+    ((400, 200), None, 50, (100, 50)),
+    ((400, 200), 100, 10, (20, 10)),
+    ((400, 200), 1000, 1000, (400, 200)),
+    ((4000, 1), 10, None, (10, 1)),
+])
+def test_fit_size(size, width, height, expected):
+    assert fit_size(size, width, height) == expected
+
+
+@pytest.mark.parametrize('fmt', ['JPEG', 'PNG', 'GIF', 'BMP', 'TIFF', 'WEBP', 'PDF'])
+def test_convert_every_format(fmt):
+    data = convert_image_bytes(image_bytes(), fmt)
+    if fmt == 'PDF':
+        assert data.startswith(b'%PDF')
+    else:
+        assert open_bytes(data).format == fmt
+
+
+def test_alpha_is_flattened_onto_white_for_jpeg():
+    image = open_bytes(convert_image_bytes(image_bytes(color=(0, 0, 0, 0)), 'JPEG'))
+    assert image.mode == 'RGB'
+    assert all(channel > 250 for channel in image.getpixel((5, 5)))
+
+
+def test_resize_and_jpeg_options():
+    source = image_bytes((1600, 1200), 'RGB', 'JPEG', (10, 120, 200))
+    data = convert_image_bytes(source, 'JPEG', width=400, quality=50, progressive=True, optimize=True)
+    image = open_bytes(data)
+    assert image.size == (400, 300)
+    assert image.info.get('progressive') or image.info.get('progression')
+
+
+def test_accepts_file_objects():
+    assert open_bytes(convert_image_bytes(io.BytesIO(image_bytes()), 'PNG')).size == (40, 20)
+
+
+def test_pixel_limit():
+    with pytest.raises(ImageTooLarge, match='40x20'):
+        convert_image_bytes(image_bytes(), 'PNG', max_pixels=799)
+    assert convert_image_bytes(image_bytes(), 'PNG', max_pixels=800)
+
+
+def test_downscaled_jpeg_is_checked_at_its_draft_size():
+    source = image_bytes((1600, 1200), 'RGB', 'JPEG', (0, 0, 0))
+    with pytest.raises(ImageTooLarge):
+        convert_image_bytes(source, 'PNG', max_pixels=500000)
+    assert open_bytes(convert_image_bytes(source, 'PNG', width=200, max_pixels=500000)).size == (200, 150)
+
+
+@pytest.mark.parametrize('options', [{'quality': 0}, {'quality': 96}, {'width': 0}, {'height': -5}])
+def test_rejects_bad_options(options):
+    with pytest.raises(ValueError):
+        convert_image_bytes(image_bytes(), 'PNG', **options)
+
+
+def test_rejects_non_images():
+    with pytest.raises(ValueError, match='Error converting image'):
+        convert_image_bytes(b'not an image', 'PNG')
+
+
+def convert(client, data, headers=None, filename='photo.png', **form):
+    return client.post('/api/convert-image', data={'image': (io.BytesIO(data), filename), **form},
+                       content_type='multipart/form-data', headers=headers)
+
+
+def test_route_json_and_raw(client):
+    response = convert(client, image_bytes(), format='WEBP', width='20')
+    assert response.status_code == 200
+    assert open_bytes(base64.b64decode(response.json['converted_image'])).size == (20, 10)
+
+    response = convert(client, image_bytes(), headers={'Accept': 'image/jpeg'}, format='JPEG')
+    assert response.mimetype == 'image/jpeg'
+    assert response.headers['Content-Disposition'] == 'inline; filename=photo.jpeg'
+    assert response.headers['ETag']
+
+    response = convert(client, image_bytes(), headers={'Accept': 'image/png'}, filename='фото 1.png', format='PNG')
+    assert response.headers['Content-Disposition'] == (
+        "inline; filename=\" 1.png\"; filename*=UTF-8''%D1%84%D0%BE%D1%82%D0%BE%201.png"
+    )
+
+
+def test_route_refuses_huge_image(client):
+    # 1-bit pixels keep the test image small; the limit is checked from the header.
+    response = convert(client, image_bytes((8000, 7000), '1', 'PNG', 0))
+    assert response.status_code == 413
+    assert '8000x7000' in response.json['error']
+
+
+@pytest.mark.parametrize('form', [{'format': 'HEIC'}, {'width': 'wide'}, {'quality': '100'}])
+def test_route_rejects(client, form):
+    response = convert(client, image_bytes(), **form)
+    assert response.status_code == 400
+    assert 'error' in response.json
+
+
+def test_route_rejects_missing_and_broken_uploads(client):
+    assert client.post('/api/convert-image', data={}, content_type='multipart/form-data').status_code == 400
+    assert convert(client, b'not an image').status_code == 400
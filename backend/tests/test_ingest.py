@@ -0,0 +1,91 @@
+import io
+
+import pytest
+from flask import Flask, jsonify
+
+import ingest
+
+LIMIT = 1000
+
+
+@pytest.fixture
+def upload_client():
+    app = Flask(__name__)
+
+    @app.route('/file', methods=['POST'])
+    def file():
+        try:
+            with ingest.receive_file('file', LIMIT) as upload:
+                return jsonify({'name': upload.filename, 'size': upload.size, 'head': bytes(upload.buffer()[:3]).decode()})
+        except ingest.UploadError as e:
+            return jsonify({'error': e.message}), e.status
+
+    @app.route('/detached', methods=['POST'])
+    def detached():
+        upload = ingest.receive_file('file', LIMIT, detach=True)
+        try:
+            return jsonify({'size': upload.size, 'data': upload.file.read().decode()})
+        finally:
+            upload.close()
+
+    @app.route('/body', methods=['POST'])
+    def body():
+        try:
+            with ingest.receive_body(LIMIT, 'body.bin') as upload:
+                return jsonify({'size': upload.size, 'head': bytes(upload.buffer()[:3]).decode()})
+        except ingest.UploadError as e:
+            return jsonify({'error': e.message}), e.status
+
+    return app.test_client()
+
+
+def post_file(client, path, data, filename='a.txt'):
+    return client.post(path, data={'file': (io.BytesIO(data), filename)}, content_type='multipart/form-data')
+
+
+def test_file_upload(upload_client):
+    assert post_file(upload_client, '/file', b'abcdef').json == {'name': 'a.txt', 'size': 6, 'head': 'abc'}
+    assert post_file(upload_client, '/detached', b'abcdef').json == {'size': 6, 'data': 'abcdef'}
+
+
+def test_spooled_upload_is_memory_mapped(upload_client, monkeypatch):
+    monkeypatch.setattr(ingest, 'UPLOAD_SPOOL_MEMORY_BYTES', 10)
+    assert upload_client.post('/body', data=b'xyz' * 100).json == {'size': 300, 'head': 'xyz'}
+
+
+def test_file_over_limit(upload_client):
+    response = post_file(upload_client, '/file', b'x' * (LIMIT + 1))
+    assert response.status_code == 413
+
+
+def test_request_over_limit_with_overhead(upload_client):
+    response = post_file(upload_client, '/file', b'x' * (LIMIT + ingest.FORM_OVERHEAD_BYTES + 1))
+    assert response.status_code == 413
+
+
+def test_missing_and_unnamed_files(upload_client):
+    assert upload_client.post('/file', data={}, content_type='multipart/form-data').json['error'] == 'No file part'
+    assert post_file(upload_client, '/file', b'x', filename='').json['error'] == 'No selected file'
+
+
+def test_raw_body_limit(upload_client):
+    assert upload_client.post('/body', data=b'x' * (LIMIT + 1)).status_code == 413
+
+
+def test_chunked_body_limit(upload_client):
+    # No Content-Length: the limit can only be enforced while reading. Servers that
+    # decode chunked bodies set wsgi.input_terminated; the test client does not.
+    response = upload_client.post('/body', input_stream=io.BytesIO(b'x' * 2000),
+                                  headers={'Transfer-Encoding': 'chunked'},
+                                  environ_overrides={'wsgi.input_terminated': True})
+    assert response.status_code == 413
+
+
+def test_route_limits_use_ingest(client, monkeypatch):
+    monkeypatch.setattr('routes.TextFormatter_route.CSV_FORMATTER_MAX_BYTES', 10)
+    response = client.post('/api/csv-formatter', data=b'a,b\n' * 10, content_type='text/csv')
+    assert response.status_code == 413
+    monkeypatch.setattr('routes.ImageGen_route.CONVERT_IMAGE_MAX_BYTES', 10)
+    response = client.post('/api/convert-image', data={'image': (io.BytesIO(b'x' * (70 * 1024)), 'a.png')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 413
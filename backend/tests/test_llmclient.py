@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+import llmclient
+from llmclient import LLMClient, LLMTimeoutError
+from llmstub import StubProvider
+
+
+class FlakyProvider(StubProvider):
+    """Fails with a retryable 503 the first `failures` times."""
+
+    def __init__(self, failures):
+        super().__init__(latency_ms=0, responses={'r': 'ok'})
+        self.failures = failures
+
+    def generate(self, prompt, model_name, generation_config=None, timeout=None, route=None):
+        if self.failures:
+            self.failures -= 1
+            raise google_exceptions.ServiceUnavailable('busy')
+        return super().generate(prompt, model_name, generation_config, timeout, route)
+
+
+class HangingProvider(StubProvider):
+    """Answers only after `seconds`, whatever the timeout."""
+
+    def __init__(self, seconds):
+        super().__init__(latency_ms=0)
+        self.seconds = seconds
+
+    def generate(self, prompt, model_name, generation_config=None, timeout=None, route=None):
+        threading.Event().wait(self.seconds)
+        return 'late', {}
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    # The backoff is scaled by (0.5 + random()), so this makes it zero.
+    monkeypatch.setattr(llmclient.random, 'random', lambda: -0.5)
+
+
+def test_generate_and_metrics():
+    client = LLMClient(StubProvider(latency_ms=0, responses={'r': 'hello world'}), max_concurrency=2)
+    assert client.generate('prompt', 'r') == 'hello world'
+    metrics = client.metrics()
+    assert metrics['provider'] == 'stub' and metrics['in_flight'] == 0
+    route = metrics['routes']['r']
+    assert (route['calls'], route['errors'], route['output_tokens']) == (1, 0, 2)
+    assert route['latency_ms']['p50'] is not None
+
+
+def test_transient_errors_are_retried(no_backoff):
+    client = LLMClient(FlakyProvider(failures=2), max_retries=2)
+    assert client.generate('prompt', 'r') == 'ok'
+    assert client.metrics()['routes']['r']['retries'] == 2
+
+
+def test_retries_run_out(no_backoff):
+    client = LLMClient(FlakyProvider(failures=5), max_retries=1)
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        client.generate('prompt', 'r')
+    assert client.metrics()['routes']['r']['errors'] == 1
+
+
+def test_timeout_is_reported():
+    client = LLMClient(HangingProvider(0.5), timeout=0.05, max_retries=0)
+    with pytest.raises(LLMTimeoutError):
+        client.generate('prompt', 'r')
+    assert client.metrics()['routes']['r']['timeouts'] == 1
+
+
+def poll(client, job):
+    for _ in range(200):
+        result = client.get(job['poll_url']).json
+        if result['status'] != 'pending':
+            return result
+        time.sleep(0.01)
+    raise AssertionError('job did not finish')
+
+
+def test_async_job_returns_the_route_answer(client):
+    response = client.post('/api/sql-generate-mock', json={
+        'table_schema': 'CREATE TABLE t (id INT PRIMARY KEY);', 'num_records': 3, 'engine': 'local', 'async': True})
+    assert response.status_code == 202
+    job = poll(client, response.json)
+    assert (job['status'], job['status_code'], job['result']['count']) == ('done', 200, 3)
+
+
+def test_async_job_keeps_streamed_bodies(client):
+    response = client.post('/api/sql-generate-mock', json={
+        'table_schema': 'CREATE TABLE t (id INT PRIMARY KEY);', 'num_records': 2, 'format': 'csv',
+        'engine': 'local', 'async': True})
+    job = poll(client, response.json)
+    assert job['mimetype'] == 'text/csv'
+    assert job['body'].splitlines()[0] == 'id'
+
+
+def test_async_job_keeps_error_status(client):
+    response = client.post('/api/sql-generate-mock', json={
+        'table_schema': 'CREATE TABLE t (id INT PRIMARY KEY);', 'num_records': 'abc', 'engine': 'local',
+        'async': True})
+    assert poll(client, response.json)['status_code'] == 400
+
+
+def test_too_many_pending_jobs(client, monkeypatch):
+    monkeypatch.setattr(llmclient, 'MAX_PENDING_JOBS', 0)
+    response = client.post('/api/sql-to-schema', json={'create_table_sql': 'CREATE TABLE t (id INT);', 'async': True})
+    assert response.status_code == 429
+    assert 'Too many pending jobs' in response.json['error']
+
+
+def test_unknown_job(client):
+    assert client.get('/api/llm/jobs/missing').status_code == 404
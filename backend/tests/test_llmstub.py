@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+import benchmark_llm
+import llmclient
+from llmstub import StubProvider
+
+
+def test_format_response_echoes_the_code_block():
+    prompt = "Format this:\n        ```python\n        def f():\n            pass\n        ```\n"
+    text, usage = StubProvider(latency_ms=0).generate(prompt, 'model', route='format')
+    assert text == "```python\ndef f():\n    pass\n```"
+    assert usage['prompt_tokens'] == len(prompt) // 4
+
+
+def test_mock_data_response_has_the_requested_rows():
+    text, _ = StubProvider(latency_ms=0).generate('Generate 3 rows of data', 'model', route='sql-generate-mock')
+    assert len(json.loads(text.strip('`').removeprefix('json\n'))) == 3
+
+
+def test_fixed_responses_and_unknown_routes(tmp_path, monkeypatch):
+    responses = tmp_path / 'responses.json'
+    responses.write_text(json.dumps({'validate': 'STATUS: INVALID'}))
+    monkeypatch.setenv('LLM_STUB_RESPONSES', str(responses))
+    provider = StubProvider(latency_ms=0)
+    assert provider.generate('x', 'model', route='validate')[0] == 'STATUS: INVALID'
+    assert provider.generate('x', 'model', route='other')[0] == ''
+    assert provider.calls == 2
+
+
+def test_simulated_failures():
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        StubProvider(latency_ms=0, error_rate=1).generate('x', 'model')
+    with pytest.raises(google_exceptions.DeadlineExceeded):
+        StubProvider(latency_ms=50).generate('x', 'model', timeout=0.01)
+
+
+def test_benchmark_scenario_report(client):
+    def send(path, payload):
+        return client.post(path, json=payload).status_code
+
+    report = benchmark_llm.run_scenario(send, 'sql-to-schema', total=6, concurrency=3, unique=True)
+    assert report['status_counts'] == {'200': 6}
+    assert report['successful'] == 6
+    assert report['p50_ms'] <= report['p99_ms'] <= report['max_ms']
+
+
+@pytest.mark.parametrize('scenario', ['sql-convert', 'sql-generate-mock', 'sql-to-schema'])
+def test_benchmark_sql_scenarios_call_the_model(client, scenario):
+    def calls():
+        return llmclient.client.metrics()['routes'].get(scenario, {}).get('calls', 0)
+
+    before = calls()
+    report = benchmark_llm.run_scenario(lambda path, payload: client.post(path, json=payload).status_code,
+                                        scenario, total=2, concurrency=1, unique=True)
+    assert report['status_counts'] == {'200': 2}
+    assert calls() == before + 2
+
+
+def test_benchmark_report_without_successes():
+    report = benchmark_llm.run_scenario(lambda path, payload: 503, 'format', total=2, concurrency=1, unique=False)
+    assert report['status_counts'] == {'503': 2}
+    assert report['p50_ms'] is None and report['max_ms'] is None
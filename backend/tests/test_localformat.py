@@ -0,0 +1,68 @@
+import json
+
+import pytest
+import yaml
+from xml.parsers.expat import ExpatError
+
+from localformat import format_json_local, format_xml_local, format_yaml_local, indent_string
+
+
+def test_indent_string():
+    assert indent_string('spaces', 2) == '  '
+    assert indent_string('tabs', 2) == '\t'
+
+
+def test_json_keeps_key_order_and_unicode():
+    assert format_json_local('{"b": 1, "a": ["é"]}', indent_size=2) == '{\n  "b": 1,\n  "a": [\n    "é"\n  ]\n}'
+    assert format_json_local('[1]', indent_type='tabs') == '[\n\t1\n]'
+
+
+def test_json_rejects_invalid():
+    with pytest.raises(json.JSONDecodeError):
+        format_json_local('{"a": }')
+
+
+def test_xml_keeps_declaration_and_comments():
+    code = '<?xml version="1.0" encoding="UTF-8"?><root><!-- note --><a x="1">text</a>  <b/></root>'
+    assert format_xml_local(code, indent_size=2) == (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<root>\n  <!-- note -->\n  <a x="1">text</a>\n  <b/>\n</root>')
+
+
+def test_xml_without_declaration():
+    assert format_xml_local('<r><a/></r>').startswith('<r>')
+
+
+def test_xml_rejects_malformed():
+    with pytest.raises(ExpatError):
+        format_xml_local('<r><a></r>')
+
+
+def test_yaml_block_style_and_documents():
+    assert format_yaml_local('b: {x: 1}\na: [1, 2]', indent_size=2) == 'b:\n  x: 1\na:\n- 1\n- 2'
+    assert format_yaml_local('a: 1\n---\nb: 2').startswith('---\na: 1')
+
+
+def test_yaml_rejects_invalid():
+    with pytest.raises(yaml.YAMLError):
+        format_yaml_local('a: [1, 2')
+
+
+@pytest.mark.parametrize('language, code, expected', [
+    ('json', '{"a":1}', '{\n    "a": 1\n}'),
+    ('xml', '<r><a/></r>', '<r>\n    <a/>\n</r>'),
+    ('yaml', 'a: {b: 1}', 'a:\n    b: 1'),
+])
+def test_format_route_is_local(client, language, code, expected):
+    response = client.post('/api/format', json={'code': code, 'language': language})
+    assert response.status_code == 201
+    assert response.json == {'formatted_code': expected, 'errors': None}
+
+
+def test_format_route_reports_invalid_input(client):
+    response = client.post('/api/format', json={'code': '{"a": }', 'language': 'json'})
+    assert response.json['errors'] and response.json['formatted_code'] == '{"a": }'
+
+
+@pytest.mark.parametrize('body', [{}, {'language': 'json'}, {'code': 'x'}, {'code': 'x', 'language': 'cobol'}])
+def test_format_route_rejects(client, body):
+    assert client.post('/api/format', json=body).status_code == 400
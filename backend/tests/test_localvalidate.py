@@ -0,0 +1,72 @@
+import pytest
+
+from localvalidate import check_syntax, describe_errors, top_level_breaks
+
+
+@pytest.mark.parametrize('language, code', [
+    ('python', 'def f(x):\n    return x\n'),
+    ('javascript', 'const re = /[)}]/g;\nfunction f(a) { return a / 2 + "}"; }\n'),
+    ('javascript', 'const s = `a ${b} }`;\n// }\n/* ( */\n'),
+    ('c', '#include <stdio.h>\nint main() { printf("%d}", 1); return 0; }\n'),
+    ('css', 'a { color: red; }\n/* } */\n'),
+    ('html', '<!DOCTYPE html><html><body><p>one<p>two<br><img src="x"></body></html>'),
+])
+def test_valid_code_has_no_errors(language, code):
+    assert check_syntax(code, language) == []
+
+
+@pytest.mark.parametrize('language, code, line', [
+    ('python', 'def f(:\n', 1),
+    ('javascript', 'function f() {\n  return [1, 2;\n}\n', 3),
+    ('javascript', 'const s = "open;\n', 1),
+    ('c', 'int main() {\n  /* unterminated\n', 2),
+    ('css', 'a { color: red;\n', 1),
+    ('html', '<div>\n<span></div>', 2),
+])
+def test_invalid_code_reports_a_line(language, code, line):
+    errors = check_syntax(code, language)
+    assert errors and errors[0]['line'] == line
+
+
+def test_unknown_language_has_no_checker():
+    assert check_syntax('x', 'cobol') is None
+
+
+def test_describe_errors():
+    assert describe_errors([{'message': 'bad', 'line': 2, 'column': 5}]) == 'Syntax Errors:\n- bad on line 2, column 5'
+
+
+def test_top_level_breaks():
+    code = 'function a() {\n  return 1;\n}\nconst b = 2;\n'
+    assert top_level_breaks(code, 'javascript') == [code.index('}\n') + 1, len(code) - 1]
+    assert top_level_breaks('function a() {\n', 'javascript') == []
+
+
+def test_validate_route_python_is_fully_checked(client):
+    response = client.post('/api/validate', json={'code': 'x = 1\n', 'language': 'python'})
+    assert response.status_code == 201
+    assert (response.json['valid'], response.json['checked']) == (True, 'syntax')
+
+
+def test_validate_route_balance_only_asks_the_model(client):
+    response = client.post('/api/validate', json={'code': 'let x = ;\n', 'language': 'javascript'})
+    assert (response.json['valid'], response.json['checked']) == (True, 'model')
+
+
+def test_validate_route_reports_nul_bytes_as_errors(client):
+    response = client.post('/api/validate', json={'code': 'x = 1\x00\n', 'language': 'python'})
+    assert response.status_code == 201
+    assert response.json['valid'] is False
+    assert response.json['checked_by'] == 'local'
+
+
+def test_validate_route_reports_local_errors(client):
+    response = client.post('/api/validate', json={'code': 'if x\n', 'language': 'python', 'analyze': True})
+    assert response.json['valid'] is False
+    assert response.json['checked_by'] == 'local'
+    assert response.json['errors'].startswith('Syntax Errors:')
+
+
+@pytest.mark.parametrize('body', [{}, {'language': 'python'}, {'code': 'x'}, {'code': 'x', 'language': 'cobol'}])
+def test_validate_route_rejects(client, body):
+    assert client.post('/api/validate', json=body).status_code == 400
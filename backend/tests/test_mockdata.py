@@ -0,0 +1,173 @@
+import csv
+import io
+import json
+
+import pytest
+
+import mockdata
+from sqlschema import parse_schema
+
+SCHEMA = """
+CREATE TABLE users (id INT AUTO_INCREMENT PRIMARY KEY, email VARCHAR(100) UNIQUE, active BOOLEAN);
+CREATE TABLE tags (id SMALLINT PRIMARY KEY, name VARCHAR(20));
+CREATE TABLE user_tags (
+    user_id INT REFERENCES users (id),
+    tag_id SMALLINT REFERENCES tags (id),
+    PRIMARY KEY (user_id, tag_id)
+);
+"""
+
+
+@pytest.fixture
+def tables():
+    return mockdata.sort_tables(parse_schema(SCHEMA))
+
+
+def generate(tables, count, seed='s'):
+    row_counts = mockdata.plan_row_counts(tables, count)
+    return {t['table_name']: list(mockdata.generate_rows(t, row_counts[t['table_name']], tables, row_counts, seed))
+            for t in tables}
+
+
+def test_sort_tables_puts_parents_first():
+    names = [t['table_name'] for t in mockdata.sort_tables(list(reversed(parse_schema(SCHEMA))))]
+    assert names.index('user_tags') > names.index('users')
+    assert names.index('user_tags') > names.index('tags')
+
+
+def test_keys_are_unique_and_references_exist(tables):
+    rows = generate(tables, 50)
+    user_ids = [r['id'] for r in rows['users']]
+    assert len(set(user_ids)) == 50
+    emails = [r['email'] for r in rows['users'] if r['email'] is not None]
+    assert len(set(emails)) == len(emails)
+    tag_ids = {r['id'] for r in rows['tags']}
+    pairs = [(r['user_id'], r['tag_id']) for r in rows['user_tags']]
+    assert len(set(pairs)) == len(pairs)
+    assert all(u in user_ids and t in tag_ids for u, t in pairs)
+
+
+def test_link_table_is_capped_at_parent_combinations(tables):
+    assert mockdata.plan_row_counts(tables, 3) == {'users': 3, 'tags': 3, 'user_tags': 3}
+    link = tables[-1]
+    rows = list(mockdata.generate_rows(link, 10, tables, {'users': 2, 'tags': 2}, seed=1))
+    assert len({(r['user_id'], r['tag_id']) for r in rows}) == len(rows) == 4
+
+
+def test_seed_makes_output_reproducible(tables):
+    assert generate(tables, 10, 'a') == generate(tables, 10, 'a')
+    assert generate(tables, 10, 'a') != generate(tables, 10, 'b')
+
+
+def test_key_space_overflow_is_rejected():
+    tables = parse_schema('CREATE TABLE t (id TINYINT PRIMARY KEY);')
+    assert mockdata.key_capacity(tables[0]['columns'][0]) == 127
+    with pytest.raises(ValueError, match='127'):
+        mockdata.plan_row_counts(tables, 200)
+
+
+def test_short_text_key_capacity():
+    column = parse_schema('CREATE TABLE t (code CHAR(2) UNIQUE);')[0]['columns'][0]
+    assert mockdata.key_capacity(column) == 1295
+
+
+def test_keys_match_the_column_type():
+    tables = parse_schema("""
+        CREATE TABLE days (day DATE PRIMARY KEY);
+        CREATE TABLE flags (flag TINYINT(1) PRIMARY KEY, kind ENUM('a', 'b') UNIQUE);
+        CREATE TABLE events (day DATE REFERENCES days (day), at TIMESTAMP UNIQUE);
+    """, 'mysql')
+    rows = generate(mockdata.sort_tables(tables), 2)
+    assert rows['days'] == [{'day': '2015-01-01'}, {'day': '2015-01-02'}]
+    assert rows['flags'] == [{'flag': False, 'kind': 'a'}, {'flag': True, 'kind': 'b'}]
+    assert {r['day'] for r in rows['events']} <= {'2015-01-01', '2015-01-02'}
+    assert [r['at'] for r in rows['events']] == ['2015-01-01 00:00:00', '2015-01-01 00:00:01']
+    with pytest.raises(ValueError, match='only 2'):
+        mockdata.plan_row_counts(tables, 3)
+
+
+@pytest.mark.parametrize('dialect, literal', [
+    (None, "X'00ff'"),
+    ('postgresql', "'\\x00ff'::bytea"),
+    ('sqlserver', '0x00ff'),
+    ('oracle', "HEXTORAW('00ff')"),
+])
+def test_binary_literals(dialect, literal):
+    assert mockdata.sql_literal(b'\x00\xff', dialect) == literal
+
+
+def test_sql_literal_escapes_quotes():
+    assert mockdata.sql_literal("O'Brien") == "'O''Brien'"
+    assert mockdata.sql_literal(None) == 'NULL'
+
+
+def test_writers():
+    rows = [{'id': 1, 'data': b'\x01', 'flag': True}, {'id': 2, 'data': None, 'flag': False}]
+    columns = ['id', 'data', 'flag']
+    assert list(csv.reader(io.StringIO(''.join(mockdata.iter_csv(rows, columns))))) == [
+        columns, ['1', '01', 'true'], ['2', '', 'false']]
+    lines = ''.join(mockdata.iter_ndjson(rows, 't')).splitlines()
+    assert json.loads(lines[0]) == {'table': 't', 'row': {'id': 1, 'data': '01', 'flag': True}}
+    statements = list(mockdata.iter_sql_inserts(rows, 't', columns, batch_size=1))
+    assert len(statements) == 2 and statements[0].startswith('INSERT INTO t (id, data, flag) VALUES')
+
+
+def mock(client, **body):
+    return client.post('/api/sql-generate-mock', json={'table_schema': SCHEMA, 'engine': 'local', **body})
+
+
+def test_mock_route_json(client):
+    response = mock(client, num_records=5, table='users', seed=1)
+    assert response.status_code == 200
+    assert response.json['count'] == 5 and response.json['engine'] == 'local'
+
+
+def test_mock_route_streams_csv_and_sql(client):
+    response = mock(client, num_records=3, format='csv', table='tags')
+    assert response.mimetype == 'text/csv'
+    assert len(response.get_data(as_text=True).splitlines()) == 4
+    assert response.headers['Content-Disposition'] == 'attachment; filename=tags.csv'
+    response = mock(client, num_records=3, format='sql', dialect='postgresql')
+    assert response.get_data(as_text=True).count('INSERT INTO') == 3
+
+
+@pytest.mark.parametrize('body', [
+    {'num_records': 'abc'},
+    {'num_records': -1},
+    {'format': 'xml'},
+    {'dialect': 5},
+    {'table': 'missing'},
+    {'num_records': 100000},
+])
+def test_mock_route_rejects(client, body):
+    response = mock(client, **body)
+    assert response.status_code == 400
+    assert response.json['success'] is False
+
+
+def test_mock_route_rejects_key_overflow(client):
+    response = client.post('/api/sql-generate-mock', json={
+        'table_schema': 'CREATE TABLE t (id TINYINT PRIMARY KEY);', 'num_records': 500, 'format': 'ndjson',
+        'engine': 'local'})
+    assert response.status_code == 400
+    assert 'TINYINT' in response.json['error']
+
+
+def test_mock_route_encodes_the_download_name(client):
+    response = client.post('/api/sql-generate-mock', json={
+        'table_schema': 'CREATE TABLE "données; v2" (id INT);', 'num_records': 1, 'format': 'csv', 'engine': 'local'})
+    assert response.get_data(as_text=True).splitlines()[0] == 'id'
+    assert response.headers['Content-Disposition'] == (
+        "attachment; filename=\"donnees; v2.csv\"; filename*=UTF-8''donn%C3%A9es%3B%20v2.csv"
+    )
+
+
+def test_mock_route_rejects_repeated_table_names(client):
+    response = client.post('/api/sql-generate-mock', json={
+        'table_schema': 'CREATE TABLE a.t (id INT); CREATE TABLE b.t (id INT);', 'engine': 'local'})
+    assert response.status_code == 400
+    assert 'more than one schema' in response.json['error']
+
+
+def test_mock_route_requires_schema(client):
+    assert client.post('/api/sql-generate-mock', json={}).status_code == 400
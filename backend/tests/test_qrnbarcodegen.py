@@ -0,0 +1,149 @@
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+import qrnbarcodegen
+from qrnbarcodegen import code_options, render_code
+
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+
+LINEAR = [('code128', 'SKU-12345'), ('code39', 'SKU-12345'), ('ean13', '5901234123457'), ('upca', '036000291452')]
+
+
+@pytest.mark.parametrize('output_format', ['png', 'svg'])
+@pytest.mark.parametrize('symbology, text', [('qr', 'https://example.com')] + LINEAR)
+def test_render_code(symbology, text, output_format):
+    data = render_code(text, symbology, output_format, cache=False)
+    if output_format == 'png':
+        assert data.startswith(PNG_MAGIC)
+    else:
+        assert data.startswith(b'<svg') or data.startswith(b'<?xml')
+
+
+@pytest.mark.skipif(qrnbarcodegen.dmtx_encode is None, reason='pylibdmtx is not installed')
+def test_render_datamatrix():
+    assert render_code('SKU-1', 'datamatrix', 'png', cache=False).startswith(PNG_MAGIC)
+
+
+@pytest.mark.skipif(qrnbarcodegen.dmtx_encode is not None, reason='pylibdmtx is installed')
+def test_datamatrix_without_library():
+    with pytest.raises(RuntimeError, match='pylibdmtx'):
+        render_code('SKU-1', 'datamatrix', cache=False)
+
+
+def test_qr_png_size_follows_options():
+    matrix = qrnbarcodegen.qr_matrix('hello')
+    image = Image.open(io.BytesIO(render_code('hello', 'qr', 'png', cache=False, size=3, border=2)))
+    assert image.size == ((len(matrix) + 4) * 3,) * 2
+
+
+def test_qr_colors_in_svg():
+    svg = render_code('hello', 'qr', 'svg', cache=False, foreground='rgb(51,102,153)', background='white')
+    assert b'#336699' in svg and b'#ffffff' in svg
+
+
+def test_linear_svg_escapes_human_text():
+    assert b'&amp;' in render_code('A&B', 'code128', 'svg', cache=False)
+
+
+def test_code_options_defaults_and_errors():
+    assert code_options('qr') == {'error_correction': 'L', 'size': 10, 'border': 4,
+                                  'foreground': '#000000', 'background': '#ffffff'}
+    assert code_options('code128', error_correction='H')['error_correction'] is None
+    for options in ({'size': 0}, {'border': 51}, {'error_correction': 'X'}, {'foreground': 'notacolor'}):
+        with pytest.raises(ValueError):
+            code_options('qr', **options)
+
+
+@pytest.mark.parametrize('symbology, text', [('code39', 'lower~case'), ('ean13', 'not digits'), ('upca', '1'), ('pdf417', 'x')])
+def test_render_code_rejects(symbology, text):
+    with pytest.raises(ValueError):
+        render_code(text, symbology, cache=False)
+
+
+def test_text_and_pixel_caps(monkeypatch):
+    with pytest.raises(ValueError, match='longer than'):
+        render_code('x' * (qrnbarcodegen.MAX_TEXT_LENGTH + 1), 'qr', cache=False)
+    monkeypatch.setattr(qrnbarcodegen, 'MAX_PIXELS', 10000)
+    with pytest.raises(ValueError, match='pixels'):
+        render_code('hello', 'qr', cache=False, size=50)
+
+
+def test_render_cache_reuses_bytes(monkeypatch):
+    calls = []
+    render = qrnbarcodegen.render_qr_code
+    monkeypatch.setattr(qrnbarcodegen, 'render_qr_code', lambda *args: calls.append(args) or render(*args))
+    text = 'cached-payload-for-test'
+    first = render_code(text, 'qr', 'png', size=7)
+    assert render_code(text, 'qr', 'png', size=7) == first
+    assert len(calls) == 1
+    render_code(text, 'qr', 'png', size=8)
+    assert len(calls) == 2
+
+
+def test_qrcode_route_json_and_raw(client):
+    response = client.post('/api/generate-qrcode', json={'text': 'hello'})
+    assert response.status_code == 200
+    assert base64.b64decode(response.json['qr_code']).startswith(PNG_MAGIC)
+
+    response = client.get('/api/generate-qrcode?text=hello&format=svg', headers={'Accept': 'image/svg+xml'})
+    assert response.mimetype == 'image/svg+xml'
+    etag = response.headers['ETag']
+    response = client.get('/api/generate-qrcode?text=hello&format=svg',
+                          headers={'Accept': 'image/svg+xml', 'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_barcode_route(client):
+    response = client.post('/api/generate-barcode', json={'text': '5901234123457', 'symbology': 'ean13'},
+                           headers={'Accept': 'image/png'})
+    assert response.status_code == 200
+    assert response.data.startswith(PNG_MAGIC)
+
+
+@pytest.mark.parametrize('path', ['/api/generate-barcode', '/api/generate-qrcode'])
+@pytest.mark.parametrize('body', [
+    {},
+    ['hello'],
+    {'text': ''},
+    {'text': 'hello', 'symbology': 5},
+    {'text': 'hello', 'symbology': 'pdf417'},
+    {'text': 'hello', 'format': 'gif'},
+    {'text': 'hello', 'size': 'big'},
+    {'text': 'hello', 'size': 500},
+    {'text': 'hello', 'foreground': 'notacolor'},
+    {'text': 'x' * 5000},
+])
+def test_single_code_routes_reject(client, path, body):
+    response = client.post(path, json=body)
+    assert response.status_code == 400
+    assert 'error' in response.json
+
+
+def test_cache_stats_route(client):
+    response = client.get('/api/codes/cache-stats')
+    assert response.status_code == 200
+    assert response.json['name'] == 'codes'
+
+
+@pytest.mark.parametrize('accept, mimetype', [
+    (None, 'application/json'),
+    ('*/*', 'application/json'),
+    ('image/*', 'image/png'),
+    ('image/svg+xml', 'image/svg+xml'),
+    ('image/png;q=0.5, application/json;q=0.9', 'application/json'),
+])
+def test_accept_header_picks_the_response_type(client, accept, mimetype):
+    headers = {'Accept': accept} if accept else {}
+    response = client.get('/api/generate-qrcode?text=hello', headers=headers)
+    assert response.mimetype == mimetype
+    assert 'Accept' in response.vary
+
+
+def test_raw_code_responses_are_cacheable(client):
+    response = client.get('/api/generate-barcode?text=SKU-1', headers={'Accept': 'image/png'})
+    assert 'immutable' in response.headers['Cache-Control']
+    other = client.get('/api/generate-barcode?text=SKU-2', headers={'Accept': 'image/png'})
+    assert response.headers['ETag'] != other.headers['ETag']
@@ -0,0 +1,98 @@
+import os
+import time
+
+from responsecache import ResponseCache, make_key
+
+
+def test_make_key_is_stable():
+    assert make_key('format', {'a': 1, 'b': 2}) == make_key('format', {'b': 2, 'a': 1})
+    assert make_key('format', 'x') != make_key('validate', 'x')
+
+
+def test_get_set_and_stats():
+    cache = ResponseCache('t')
+    assert cache.get('k') is None
+    cache.set('k', {'formatted': 'x'})
+    assert cache.get('k') == {'formatted': 'x'}
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries'], stats['hit_rate']) == (1, 1, 1, 0.5)
+
+
+def test_lru_eviction_by_entries():
+    cache = ResponseCache('t', max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('responsecache.time.time', lambda: now[0])
+    cache = ResponseCache('t', ttl=10)
+    cache.set('k', 'v')
+    now[0] += 5
+    assert cache.get('k') == 'v'
+    now[0] += 10
+    assert cache.get('k') is None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    ResponseCache('t', disk_dir=str(tmp_path)).set('k', {'v': [1, 2]})
+    ResponseCache('t', disk_dir=str(tmp_path)).set('b', b'\x89PNG')
+    cache = ResponseCache('t', disk_dir=str(tmp_path))
+    assert cache.get('k') == {'v': [1, 2]}
+    assert cache.get('b') == b'\x89PNG'
+    assert cache.stats()['disk_hits'] == 2
+
+
+def test_disk_tier_is_pruned_to_its_bound(tmp_path):
+    cache = ResponseCache('t', disk_dir=str(tmp_path), disk_max_bytes=10000)
+    for i in range(100):
+        cache.set(str(i), b'x' * 500)
+    stats = cache.stats()
+    on_disk = sum(entry.stat().st_size for entry in os.scandir(tmp_path))
+    assert stats['disk_bytes'] == on_disk <= 10000
+    assert stats['disk_evictions'] > 0
+    # A new instance picks up the size of what is already there.
+    assert ResponseCache('t', disk_dir=str(tmp_path), disk_max_bytes=10000).stats()['disk_bytes'] == on_disk
+
+
+def test_memory_tier_bounded_by_bytes():
+    cache = ResponseCache('t', max_bytes=1000)
+    for i in range(10):
+        cache.set(str(i), b'x' * 300)
+    stats = cache.stats()
+    assert stats['bytes'] <= 1000 and stats['entries'] == 3
+    assert cache.get('9') == b'x' * 300 and cache.get('0') is None
+
+
+def test_overwriting_an_entry_counts_its_new_size_only(tmp_path):
+    cache = ResponseCache('t', disk_dir=str(tmp_path), disk_max_bytes=10000)
+    for size in (4000, 3000, 4000, 2000):
+        cache.set('k', b'x' * size)
+    stats = cache.stats()
+    assert stats['disk_bytes'] == sum(entry.stat().st_size for entry in os.scandir(tmp_path)) == 2001
+    assert stats['disk_evictions'] == 0
+
+
+def test_expired_disk_entries_are_uncounted(tmp_path):
+    cache = ResponseCache('t', ttl=0, disk_dir=str(tmp_path), disk_max_bytes=10000)
+    cache.set('k', b'x' * 100)
+    cache.clear()
+    time.sleep(0.01)
+    assert cache.get('k') is None
+    assert cache.stats()['disk_bytes'] == 0
+
+
+def test_oversize_value_stays_on_disk_only(tmp_path):
+    cache = ResponseCache('t', max_bytes=100, disk_dir=str(tmp_path))
+    cache.set('small', b'x' * 50)
+    cache.set('big', b'x' * 500)
+    assert cache.stats()['entries'] == 1
+    assert cache.get('small') == b'x' * 50
+    assert cache.get('big') == b'x' * 500
+    assert cache.stats()['disk_hits'] == 1
@@ -0,0 +1,93 @@
+import io
+
+import pandas as pd
+import pytest
+
+from profiling import profile_frames
+from sketches import HyperLogLog, TopK, hash_values
+
+
+def test_hash_values_are_stable_and_distinct():
+    values = pd.Series([f"id-{i}" for i in range(1000)])
+    hashes = hash_values(values)
+    assert len(set(hashes.tolist())) == 1000
+    assert (hash_values(values) == hashes).all()
+
+
+@pytest.mark.parametrize('n', [10, 1000, 200000])
+def test_hyperloglog_estimate(n):
+    sketch = HyperLogLog()
+    for start in range(0, n, 50000):
+        sketch.update(pd.Series([f"user{i}@example.com" for i in range(start, min(n, start + 50000))]))
+    assert abs(sketch.estimate() - n) <= max(1, 0.03 * n)
+
+
+def test_hyperloglog_ignores_repeats_and_merges():
+    a, b = HyperLogLog(), HyperLogLog()
+    a.update(pd.Series(range(5000)))
+    a.update(pd.Series(range(5000)))
+    b.update(pd.Series(range(2500, 7500)))
+    a.merge(b)
+    assert abs(a.estimate() - 7500) <= 225
+
+
+def test_topk_exact_below_capacity():
+    top = TopK(k=2)
+    top.update(pd.Series(['a', 'b', 'a', 'c', 'a', 'b']))
+    top.update(pd.Series(['c', 'c', 'c']))
+    assert top.top() == [('c', 4), ('a', 3)]
+    assert top.exact
+
+
+def test_topk_bounded_error_over_capacity():
+    values = pd.Series(['hot'] * 500 + ['warm'] * 300 + [f"cold{i}" for i in range(2000)])
+    top = TopK(k=2, capacity=50)
+    for start in range(0, len(values), 400):
+        top.update(values.iloc[start:start + 400])
+    assert len(top.counts) <= 50
+    assert not top.exact
+    (first, hot), (second, warm) = top.top()
+    assert (first, second) == ('hot', 'warm')
+    assert 500 - top.error <= hot <= 500 and 300 - top.error <= warm <= 300
+
+
+def test_profile_frames_types_and_stats():
+    frames = [
+        pd.DataFrame({'n': [1, 2, None], 'f': ['1.5', '2', 'x'], 'b': ['true', 'false', 'true'],
+                      'd': ['2024-01-01', '2024-02-01', None]}),
+        pd.DataFrame({'n': [10, 3, 4], 'f': ['3', '4', '5'], 'b': ['false', None, 'true'],
+                      'd': ['2023-12-31', '2024-03-01', '2024-01-15']}),
+    ]
+    profile = profile_frames(frames, top_k=1)
+    columns = {c['name']: c for c in profile['columns']}
+    assert profile['rows'] == 6
+    assert columns['n']['type'] == 'integer'
+    assert (columns['n']['min'], columns['n']['max'], columns['n']['nulls']) == (1, 10, 1)
+    assert columns['f']['type'] == 'string'
+    assert columns['b']['type'] == 'boolean'
+    assert columns['b']['top'] == [{'value': 'true', 'count': 3}]
+    assert columns['d']['type'] == 'datetime'
+    assert columns['d']['min'].startswith('2023-12-31')
+
+
+def profile(client, data, filename='t.csv', **form):
+    return client.post('/api/profile-table', data={'file': (io.BytesIO(data), filename), **form},
+                       content_type='multipart/form-data')
+
+
+def test_profile_route(client):
+    response = profile(client, b'id,name\n1,a\n2,b\n3,a\n', top_k='1')
+    assert response.status_code == 200
+    assert response.json['rows'] == 3
+    assert response.json['columns'][1]['top'] == [{'value': 'a', 'count': 2}]
+
+
+@pytest.mark.parametrize('top_k', ['abc', '0', '-1', '100000'])
+def test_profile_route_rejects_top_k(client, top_k):
+    assert profile(client, b'a\n1\n', top_k=top_k).status_code == 400
+
+
+def test_profile_route_rejects_other_uploads(client):
+    assert profile(client, b'a\n1\n', filename='t.exe').status_code == 400
+    assert client.post('/api/profile-table').status_code == 400
+    assert profile(client, b'{"a": ', filename='t.ndjson').status_code == 400
@@ -0,0 +1,125 @@
+import io
+import zipfile
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+from spreadsheet import csv_to_xlsx, write_xlsx
+from streamzip import iter_zip
+
+
+def read_workbook(data):
+    workbook = load_workbook(io.BytesIO(data), read_only=True)
+    return {name: [list(row) for row in workbook[name].iter_rows(values_only=True)] for name in workbook.sheetnames}
+
+
+def test_csv_to_xlsx_in_chunks():
+    destination = io.BytesIO()
+    rows, sheets = csv_to_xlsx(io.BytesIO(b'id,name,score\n1,a,1.5\n2,b,\n3,c,2\n'), destination, chunk_rows=2)
+    assert (rows, sheets) == (3, 1)
+    # Empty cells are not written, so the read-only reader gives a shorter row.
+    assert read_workbook(destination.getvalue()) == {
+        'Sheet1': [['id', 'name', 'score'], [1, 'a', 1.5], [2, 'b'], [3, 'c', 2]]}
+
+
+def test_sheets_split_at_row_limit():
+    destination = io.BytesIO()
+    frame = pd.DataFrame({'n': range(5)})
+    rows, sheets = write_xlsx(['n'], [frame], destination, max_rows=3)
+    assert (rows, sheets) == (5, 3)
+    workbook = read_workbook(destination.getvalue())
+    assert list(workbook) == ['Sheet1', 'Sheet2', 'Sheet3']
+    assert workbook['Sheet3'] == [['n'], [4]]
+
+
+def test_header_only_csv():
+    destination = io.BytesIO()
+    assert csv_to_xlsx(io.BytesIO(b'a,b\n'), destination) == (0, 1)
+    assert read_workbook(destination.getvalue()) == {'Sheet1': [['a', 'b']]}
+
+
+def test_latin1_csv():
+    destination = io.BytesIO()
+    csv_to_xlsx(io.BytesIO('name\ncafé\n'.encode('latin1')), destination)
+    assert read_workbook(destination.getvalue())['Sheet1'][1] == ['café']
+
+
+def csv_upload(client, data, filename='data.csv', content_type='text/csv'):
+    return client.post('/api/csv-to-excel', data={'file': (io.BytesIO(data), filename, content_type)},
+                       content_type='multipart/form-data')
+
+
+def test_csv_to_excel_route(client):
+    response = csv_upload(client, b'a,b\n1,2\n3,4\n')
+    assert response.status_code == 200
+    assert (response.headers['X-Row-Count'], response.headers['X-Sheet-Count']) == ('2', '1')
+    assert 'data.xlsx' in response.headers['Content-Disposition']
+    assert read_workbook(response.data)['Sheet1'][2] == [3, 4]
+
+
+def test_csv_to_excel_route_rejects(client):
+    assert csv_upload(client, b'', filename='empty.csv').status_code == 400
+    assert csv_upload(client, b'a,b\n', filename='data.txt').status_code == 400
+    assert csv_upload(client, b'a,b\n', content_type='image/png').status_code == 400
+    assert client.post('/api/csv-to-excel', data={}, content_type='multipart/form-data').status_code == 400
+
+
+def workbook_bytes(sheets):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        sheet = workbook.create_sheet(name)
+        for row in rows:
+            sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def excel_upload(client, data, filename='book.xlsx', **form):
+    return client.post('/api/excel-to-csv', data={'file': (io.BytesIO(data), filename), **form},
+                       content_type='multipart/form-data')
+
+
+def test_iter_zip_streams_members():
+    chunks = list(iter_zip([('a.txt', ['hello ', b'world']), ('b.txt', iter(['x' * 100000]))]))
+    assert len(chunks) > 2
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+    assert archive.read('a.txt') == b'hello world' and len(archive.read('b.txt')) == 100000
+
+
+def test_excel_to_csv_route_picks_sheets(client):
+    data = workbook_bytes({'First': [['a', 'b'], [1, None]], 'Second': [['when'], [datetime(2024, 1, 2, 3, 4)]]})
+    response = excel_upload(client, data)
+    assert response.get_data(as_text=True) == 'a,b\n1,\n'
+    response = excel_upload(client, data, sheet='1')
+    assert response.get_data(as_text=True) == 'when\n2024-01-02T03:04:00\n'
+    assert 'book-Second.csv' in response.headers['Content-Disposition']
+
+
+def test_excel_to_csv_route_all_sheets_get_unique_names(client):
+    data = workbook_bytes({'a b': [['x']], 'a+b': [['y']], 'A B ': [['z']]})
+    response = excel_upload(client, data, all_sheets='true')
+    assert response.mimetype == 'application/zip'
+    archive = zipfile.ZipFile(io.BytesIO(response.data))
+    assert archive.namelist() == ['a_b.csv', 'a_b-2.csv', 'A_B-3.csv']
+    assert archive.read('a_b-2.csv') == b'y\n'
+
+
+def test_excel_to_csv_route_encodes_the_download_name(client):
+    data = workbook_bytes({'Only': [['a']]})
+    response = excel_upload(client, data, filename='数据.xlsx')
+    assert response.headers['Content-Disposition'] == "attachment; filename=.csv; filename*=UTF-8''%E6%95%B0%E6%8D%AE.csv"
+    assert response.data == b'a\n'
+    response = excel_upload(client, data, filename='my book.xlsx', all_sheets='true')
+    assert response.headers['Content-Disposition'] == 'attachment; filename="my book.zip"'
+    assert zipfile.ZipFile(io.BytesIO(response.data)).namelist() == ['Only.csv']
+
+
+def test_excel_to_csv_route_rejects(client):
+    data = workbook_bytes({'Only': [['a']]})
+    response = excel_upload(client, data, sheet='Missing')
+    assert response.status_code == 400
+    assert response.json['sheets'] == ['Only']
+    assert excel_upload(client, data, filename='book.ods').status_code == 400
@@ -0,0 +1,128 @@
+import pytest
+
+from sqldialect import UnsupportedSQL, join_statements, normalize_dialect, split_statements, tokenize, transpile
+
+
+def convert(sql, source, target):
+    [result] = transpile(sql, source, target)
+    return result
+
+
+def test_normalize_dialect_aliases():
+    assert normalize_dialect('SQL Server') == 'sqlserver'
+    assert normalize_dialect('Postgres') == 'postgresql'
+    assert normalize_dialect('unknown') is None
+    assert normalize_dialect(None) is None
+
+
+def test_split_statements_ignores_semicolons_in_strings():
+    statements = split_statements(tokenize("SELECT ';'; SELECT 2", 'mysql'))
+    assert len(statements) == 2
+
+
+def test_unbalanced_quote_is_reported():
+    with pytest.raises(UnsupportedSQL):
+        tokenize("SELECT 'open", 'mysql')
+
+
+def test_unknown_dialect_raises():
+    with pytest.raises(ValueError):
+        transpile('SELECT 1', 'mysql', 'db2')
+
+
+def test_mysql_identifiers_to_postgresql():
+    result = convert('SELECT `id`, name FROM `users` LIMIT 5', 'mysql', 'postgresql')
+    assert result == {'source': 'SELECT `id`, name FROM `users` LIMIT 5',
+                      'converted': 'SELECT "id", name FROM "users" LIMIT 5', 'error': None}
+
+
+def test_top_becomes_limit():
+    assert convert('SELECT TOP 5 * FROM users', 'sqlserver', 'postgresql')['converted'] == 'SELECT * FROM users LIMIT 5'
+
+
+@pytest.mark.parametrize('sql', ['SELECT TOP (5) PERCENT * FROM users', 'SELECT TOP 5 WITH TIES * FROM users ORDER BY a'])
+def test_top_percent_and_with_ties_have_no_rule(sql):
+    result = convert(sql, 'sqlserver', 'postgresql')
+    assert result['converted'] is None
+    assert 'TOP PERCENT' in result['error']
+
+
+@pytest.mark.parametrize('sql', ['SELECT a <=> b FROM t', 'SELECT 5 DIV 2', 'SELECT a XOR b FROM t'])
+def test_mysql_only_operators_have_no_rule(sql):
+    result = convert(sql, 'mysql', 'postgresql')
+    assert result['converted'] is None
+    assert result['error']
+
+
+def test_column_position_only_kept_for_mysql():
+    sql = 'ALTER TABLE t ADD COLUMN b INT AFTER a'
+    assert convert(sql, 'mysql', 'postgresql')['error']
+    assert convert(sql, 'mysql', 'mysql')['converted'] == sql
+
+
+def test_oracle_table_aliases_drop_as():
+    assert convert('SELECT u.id FROM users AS u', 'postgresql', 'oracle')['converted'] == 'SELECT u.id FROM users u'
+
+
+def test_auto_increment_becomes_serial():
+    result = convert('CREATE TABLE t (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(20))', 'mysql', 'postgresql')
+    assert result['converted'] == 'CREATE TABLE t (id SERIAL PRIMARY KEY, name VARCHAR(20))'
+
+
+def test_boolean_defaults_become_literals():
+    result = convert("CREATE TABLE t (a TINYINT(1) NOT NULL DEFAULT '0',b ENUM('x','y'))", 'mysql', 'postgresql')
+    assert result['converted'] == (
+        'CREATE TABLE t (a BOOLEAN NOT NULL DEFAULT FALSE,b VARCHAR(255), CHECK ("b" IN (\'x\',\'y\')))'
+    )
+
+
+@pytest.mark.parametrize('sql, target, expected', [
+    ('SELECT a FROM t LIMIT 5 -- first five', 'postgresql', 'SELECT a FROM t LIMIT 5 -- first five'),
+    ('SELECT a FROM t ORDER BY a LIMIT 5 OFFSET 2 -- c', 'sqlserver',
+     'SELECT a FROM t ORDER BY a OFFSET 2 ROWS FETCH NEXT 5 ROWS ONLY -- c'),
+    ('SELECT 1 -- one', 'oracle', 'SELECT 1 FROM DUAL -- one'),
+])
+def test_appended_clauses_go_before_trailing_comments(sql, target, expected):
+    assert convert(sql, 'mysql', target)['converted'] == expected
+
+
+def test_join_statements_terminates_before_comments():
+    assert join_statements(['SELECT 1 -- c', 'SELECT 2'], 'postgresql') == 'SELECT 1; -- c\nSELECT 2;'
+    assert join_statements(['SELECT 1;', 'SELECT 2 -- c'], 'postgresql', terminate_last=False) == 'SELECT 1;\nSELECT 2 -- c'
+
+
+def test_now_for_sqlite():
+    assert convert('SELECT NOW()', 'mysql', 'sqlite')['converted'] == 'SELECT CURRENT_TIMESTAMP'
+
+
+def test_each_statement_is_reported():
+    results = transpile('SELECT 1; SELECT a <=> b FROM t', 'mysql', 'postgresql')
+    assert [r['error'] is None for r in results] == [True, False]
+
+
+def test_convert_route_requires_parameters(client):
+    response = client.post('/api/sql-convert', json={'source_sql': 'SELECT 1'})
+    assert response.status_code == 400
+
+
+def test_convert_route_rules_only_reports_unsupported(client):
+    response = client.post('/api/sql-convert', json={
+        'source_sql': 'SELECT 1; SELECT 5 DIV 2', 'source_dialect': 'MySQL',
+        'target_dialect': 'PostgreSQL', 'engine': 'rules',
+    })
+    assert response.status_code == 400
+    assert [u['source'] for u in response.json['unsupported']] == ['SELECT 5 DIV 2']
+
+
+def test_convert_route_rules_only_needs_known_dialects(client):
+    response = client.post('/api/sql-convert', json={
+        'source_sql': 'SELECT 1', 'source_dialect': 'DB2', 'target_dialect': 'PostgreSQL', 'engine': 'rules',
+    })
+    assert response.status_code == 400
+
+
+def test_convert_route_keeps_terminators_out_of_comments(client):
+    response = client.post('/api/sql-convert', json={
+        'source_sql': 'SELECT 1 -- c\n;SELECT 2', 'source_dialect': 'MySQL', 'target_dialect': 'PostgreSQL',
+    })
+    assert response.json['converted_sql'] == 'SELECT 1; -- c\nSELECT 2;'
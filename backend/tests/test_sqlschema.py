@@ -0,0 +1,106 @@
+import pytest
+
+from sqldialect import UnsupportedSQL
+from sqlschema import parse_schema
+
+SCHEMA = """
+CREATE TABLE users (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    status ENUM('a', 'b') DEFAULT 'a',
+    price DECIMAL(10, 2)
+);
+CREATE TABLE orders (
+    id SERIAL,
+    user_id INT,
+    PRIMARY KEY (id),
+    FOREIGN KEY (user_id) REFERENCES users (id)
+);
+CREATE INDEX idx_user ON orders (user_id);
+ALTER TABLE orders ADD COLUMN note TEXT;
+"""
+
+
+@pytest.fixture
+def tables():
+    return {table['table_name']: table for table in parse_schema(SCHEMA, 'mysql')}
+
+
+def column(table, name):
+    return next(c for c in table['columns'] if c['name'] == name)
+
+
+def test_columns_and_types(tables):
+    users = tables['users']
+    assert [c['name'] for c in users['columns']] == ['id', 'email', 'status', 'price']
+    assert column(users, 'email')['length'] == 255
+    assert column(users, 'status')['values'] == ['a', 'b']
+    assert column(users, 'status')['default'] == 'a'
+    assert (column(users, 'price')['precision'], column(users, 'price')['scale']) == (10, 2)
+
+
+def test_keys_and_constraints(tables):
+    users, orders = tables['users'], tables['orders']
+    assert users['primary_key'] == ['id']
+    assert column(users, 'id')['auto_increment']
+    assert column(users, 'email')['unique'] and not column(users, 'email')['nullable']
+    assert orders['primary_key'] == ['id']
+    assert column(orders, 'user_id')['references']['table'] == 'users'
+    assert orders['foreign_keys'][0]['references_columns'] == ['id']
+
+
+def test_create_index_and_alter_table_apply_to_the_table(tables):
+    orders = tables['orders']
+    assert orders['indexes'] == [{'name': 'idx_user', 'columns': ['user_id'], 'unique': False}]
+    assert column(orders, 'note')['type'] == 'TEXT'
+
+
+def test_tables_in_different_schemas_are_kept_apart():
+    tables = parse_schema("""
+        CREATE TABLE public.users (id INT PRIMARY KEY, age INT CHECK (age >= 0));
+        CREATE TABLE audit.users (id INT, CONSTRAINT positive CHECK (id > 0));
+        CREATE INDEX idx_id ON audit.users (id);
+        ALTER TABLE ONLY public.users ADD CONSTRAINT one_age UNIQUE (age);
+    """)
+    assert [(t['schema'], t['table_name']) for t in tables] == [('public', 'users'), ('audit', 'users')]
+    public, audit = tables
+    assert public['checks'] == ['age >= 0'] and public['unique'] == [['age']] and public['indexes'] == []
+    assert audit['checks'] == ['id > 0'] and audit['indexes'][0]['name'] == 'idx_id'
+
+
+def test_unqualified_statements_find_the_only_table_of_that_name():
+    tables = parse_schema('CREATE TABLE public.t (a INT); CREATE INDEX i ON t (a);')
+    assert tables[0]['indexes'][0]['columns'] == ['a']
+    assert tables[0]['schema'] == 'public'
+
+
+def test_no_create_table():
+    assert parse_schema('SELECT 1;') == []
+
+
+@pytest.mark.parametrize('sql', [
+    'CREATE TABLE a AS SELECT * FROM b;',
+    'CREATE TABLE a LIKE b;',
+    'CREATE TABLE a (LIKE b INCLUDING ALL);',
+    'CREATE TABLE a ();',
+])
+def test_tables_without_a_column_list_are_unsupported(sql):
+    with pytest.raises(UnsupportedSQL):
+        parse_schema(sql)
+
+
+def test_schema_route_parses_locally(client):
+    response = client.post('/api/sql-to-schema', json={'create_table_sql': SCHEMA, 'engine': 'local'})
+    assert response.status_code == 200
+    assert response.json['engine'] == 'local'
+    assert [s['table_name'] for s in response.json['schemas']] == ['users', 'orders']
+
+
+@pytest.mark.parametrize('body', [
+    {},
+    {'create_table_sql': 'CREATE TABLE a AS SELECT * FROM b;', 'engine': 'local'},
+    {'create_table_sql': 'SELECT 1;', 'engine': 'local'},
+    {'create_table_sql': SCHEMA, 'dialect': 5},
+])
+def test_schema_route_rejects(client, body):
+    assert client.post('/api/sql-to-schema', json=body).status_code == 400
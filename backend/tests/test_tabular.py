@@ -0,0 +1,102 @@
+import io
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import tabular
+
+CSV = b'id,name,price,when\n1,a,1.5,2024-01-02 03:04:05\n2,b,,2024-02-03 04:05:06\n'
+
+
+def convert(data, source_format, target_format):
+    destination = io.BytesIO()
+    rows, schema = tabular.convert(io.BytesIO(data), source_format, destination, target_format)
+    return rows, schema, destination.getvalue()
+
+
+def test_format_for_filename():
+    assert tabular.format_for_filename('Data.CSV') == 'csv'
+    assert tabular.format_for_filename('x.jsonl') == 'ndjson'
+    assert tabular.format_for_filename('x.txt') is None
+
+
+@pytest.mark.parametrize('target', tabular.FORMATS)
+def test_round_trip_through_every_format(target):
+    rows, schema, data = convert(CSV, 'csv', target)
+    assert rows == 2
+    assert str(schema.field('price').type) == 'double'
+    back = io.BytesIO()
+    assert tabular.convert(io.BytesIO(data), target, back, 'csv')[0] == 2
+    lines = back.getvalue().decode('utf-8').splitlines()
+    assert lines[0].replace('"', '') == 'id,name,price,when'
+    assert lines[1].replace('"', '').startswith('1,a,1.5,2024-01-02')
+
+
+def test_parquet_keeps_types():
+    _, _, data = convert(CSV, 'csv', 'parquet')
+    table = pq.read_table(io.BytesIO(data))
+    assert table.schema.field('id').type == pa.int64()
+    assert pa.types.is_timestamp(table.schema.field('when').type)
+    assert table.column('price').to_pylist() == [1.5, None]
+
+
+def test_ndjson_output_has_iso_timestamps():
+    _, _, data = convert(CSV, 'csv', 'ndjson')
+    first = json.loads(data.decode('utf-8').splitlines()[0])
+    assert first == {'id': 1, 'name': 'a', 'price': 1.5, 'when': '2024-01-02T03:04:05'}
+
+
+def test_latin1_csv():
+    rows, _, data = convert('name\ncafé\n'.encode('latin1'), 'csv', 'ndjson')
+    assert json.loads(data) == {'name': 'café'}
+
+
+def test_late_csv_value_widens_column_to_text(monkeypatch):
+    monkeypatch.setattr(tabular, 'BLOCK_BYTES', 64)
+    data = b'id,code\n' + b''.join(b'%d,%d\n' % (i, i) for i in range(50)) + b'50,A-7\n'
+    rows, schema, output = convert(data, 'csv', 'parquet')
+    assert rows == 51
+    assert schema.field('code').type == pa.string() and schema.field('id').type == pa.int64()
+    assert pq.read_table(io.BytesIO(output)).column('code').to_pylist()[-1] == 'A-7'
+
+
+def test_late_ndjson_value_widens_column_to_text(monkeypatch):
+    monkeypatch.setattr(tabular, 'BLOCK_BYTES', 64)
+    lines = [json.dumps({'id': i, 'v': i}) for i in range(50)] + [json.dumps({'id': 50, 'v': {'nested': True}})]
+    rows, schema, output = convert('\n'.join(lines).encode('utf-8') + b'\n', 'ndjson', 'parquet')
+    assert rows == 51
+    values = pq.read_table(io.BytesIO(output)).column('v').to_pylist()
+    assert values[0] == '0' and json.loads(values[-1]) == {'nested': True}
+
+
+def test_empty_first_block_column_is_text():
+    rows, schema, _ = convert(b'a,b\n1,\n2,\n', 'csv', 'feather')
+    assert schema.field('b').type == pa.string()
+
+
+def table_upload(client, data, filename, **form):
+    return client.post('/api/convert-table', data={'file': (io.BytesIO(data), filename), **form},
+                       content_type='multipart/form-data')
+
+
+def test_convert_table_route(client):
+    response = table_upload(client, CSV, 'prices.csv', to='parquet')
+    assert response.status_code == 200
+    assert response.headers['X-Row-Count'] == '2'
+    assert json.loads(response.headers['X-Column-Types'])['id'] == 'int64'
+    assert 'prices.parquet' in response.headers['Content-Disposition']
+
+
+@pytest.mark.parametrize('data, filename, form', [
+    (CSV, 'prices.csv', {}),
+    (CSV, 'prices.csv', {'to': 'xml'}),
+    (CSV, 'prices.txt', {'to': 'csv'}),
+    (b'not parquet', 'x.parquet', {'to': 'csv'}),
+    (b'{"a": ', 'x.ndjson', {'to': 'csv'}),
+])
+def test_convert_table_route_rejects(client, data, filename, form):
+    response = table_upload(client, data, filename, **form)
+    assert response.status_code == 400
+    assert 'error' in response.json
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+import user_feedback
+
+
+@pytest.fixture(autouse=True)
+def feedback_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(user_feedback, 'FEEDBACK_DB', str(tmp_path / 'instance' / 'users.db'))
+    monkeypatch.setattr(user_feedback, 'FEEDBACK_FILE', str(tmp_path / 'feedback.json'))
+    monkeypatch.setattr(user_feedback, '_initialized', False)
+    return tmp_path
+
+
+def test_save_and_read_back_in_order():
+    for text in ('first', 'second', 'third'):
+        user_feedback.save_feedback({'feedback': text})
+    entries = user_feedback.get_all_feedback()
+    assert [entry['feedback'] for entry in entries] == ['first', 'second', 'third']
+    assert all(entry['timestamp'] for entry in entries)
+
+
+def test_legacy_file_is_imported_once(feedback_store, monkeypatch):
+    legacy = [{'feedback': 'old', 'timestamp': '2020-01-01T00:00:00'}, 'not an entry']
+    (feedback_store / 'feedback.json').write_text(json.dumps(legacy))
+    user_feedback.save_feedback({'feedback': 'new'})
+    monkeypatch.setattr(user_feedback, '_initialized', False)
+    assert [entry['feedback'] for entry in user_feedback.get_all_feedback()] == ['old', 'new']
+
+
+def test_iter_feedback_filters():
+    for i in range(5):
+        user_feedback.save_feedback({'feedback': str(i)})
+    rows = list(user_feedback.iter_feedback(after_id=2, limit=2))
+    assert [entry['feedback'] for _, entry in rows] == ['2', '3']
+    assert list(user_feedback.iter_feedback(since='2999-01-01')) == []
+
+
+def test_feedback_route_pages_with_cursor(client):
+    for i in range(5):
+        assert client.post('/api/feedback', json={'feedback': str(i)}).status_code == 201
+    first = client.get('/api/feedback?limit=2').json
+    assert [entry['feedback'] for entry in first['feedback']] == ['0', '1']
+    second = client.get(f"/api/feedback?limit=2&cursor={first['next_cursor']}").json
+    assert [entry['feedback'] for entry in second['feedback']] == ['2', '3']
+    last = client.get(f"/api/feedback?limit=2&cursor={second['next_cursor']}").json
+    assert [entry['feedback'] for entry in last['feedback']] == ['4'] and last['next_cursor'] is None
+
+
+def test_feedback_route_streams_ndjson(client):
+    for i in range(3):
+        client.post('/api/feedback', json={'feedback': str(i)})
+    response = client.get('/api/feedback?format=ndjson&limit=2')
+    assert response.mimetype == 'application/x-ndjson'
+    assert [json.loads(line)['feedback'] for line in response.get_data(as_text=True).splitlines()] == ['0', '1']
+
+
+@pytest.mark.parametrize('query', ['limit=abc', 'limit=0', 'limit=-1', 'cursor=x', 'since=yesterday', 'until=13/01'])
+def test_feedback_route_rejects(client, query):
+    response = client.get(f'/api/feedback?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.json
+
+
+def test_feedback_route_requires_feedback(client):
+    assert client.post('/api/feedback', json={'other': 1}).status_code == 400
@@ -1,41 +1,151 @@
 import json
 import os
+import sqlite3
+import threading
 from datetime import datetime
 
-FEEDBACK_FILE = os.path.join(os.getcwd(), "feedback.json")
+# Both paths are anchored to this directory so they do not depend on where the server is started.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FEEDBACK_FILE = os.path.join(BASE_DIR, "feedback.json")
 
-def save_feedback(feedback_data):
+# Same SQLite file that app.py configures as 'sqlite:///users.db' (Flask keeps it in instance/).
+FEEDBACK_DB = os.path.join(BASE_DIR, "instance", "users.db")
+
+_init_lock = threading.Lock()
+_initialized = False
+
+def _connect():
+    conn = sqlite3.connect(FEEDBACK_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def _import_legacy_file(conn):
+    """
+    Import the old feedback.json array once, the first time the table is created.
+    """
+    if not os.path.exists(FEEDBACK_FILE):
+        return
+    with open(FEEDBACK_FILE, 'r') as f:
+        try:
+            legacy = json.load(f)
+        except json.JSONDecodeError:
+            legacy = []
+    rows = [
+        (entry.get("timestamp", ""), json.dumps(entry))
+        for entry in legacy if isinstance(entry, dict)
+    ]
+    conn.executemany("INSERT INTO feedback (timestamp, data) VALUES (?, ?)", rows)
+
+def init_feedback_store():
     """
-    Save feedback data to a JSON file.
-    If the file exists, load current feedback, append new entry, and rewrite.
+    Create the feedback table and timestamp index if needed.
+    Existing feedback.json entries are imported the first time the table is created.
+
+    The check, the CREATE and the import run in one BEGIN IMMEDIATE transaction,
+    so several processes starting at once cannot import the file twice.
     """
-    if os.path.exists(FEEDBACK_FILE):
-        with open(FEEDBACK_FILE, 'r') as f:
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        os.makedirs(os.path.dirname(FEEDBACK_DB), exist_ok=True)
+        conn = _connect()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
             try:
-                all_feedback = json.load(f)
-            except json.JSONDecodeError:
-                all_feedback = []
-    else:
-        all_feedback = []
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='feedback'"
+                ).fetchone()
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS feedback ("
+                    "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                    "timestamp TEXT NOT NULL, "
+                    "data TEXT NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback (timestamp)")
+                if not exists:
+                    _import_legacy_file(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        _initialized = True
+
+def save_feedback(feedback_data):
+    """
+    Save feedback data to the feedback store.
+    Each call appends a single row, so the cost does not grow with the history.
+    """
+    init_feedback_store()
 
     # Enrich feedback with a timestamp.
     feedback_data["timestamp"] = datetime.utcnow().isoformat()
-    all_feedback.append(feedback_data)
 
-    with open(FEEDBACK_FILE, 'w') as f:
-        json.dump(all_feedback, f)
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO feedback (timestamp, data) VALUES (?, ?)",
+                (feedback_data["timestamp"], json.dumps(feedback_data))
+            )
+    finally:
+        conn.close()
 
     return feedback_data
 
 def get_all_feedback():
     """
-    Retrieve all feedback entries from the JSON file.
+    Retrieve all feedback entries in the order they were received.
     """
-    if not os.path.exists(FEEDBACK_FILE):
-        return []
-    with open(FEEDBACK_FILE, 'r') as f:
-        try:
-            all_feedback = json.load(f)
-        except json.JSONDecodeError:
-            all_feedback = []
-    return all_feedback
\ No newline at end of file
+    init_feedback_store()
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT data FROM feedback ORDER BY id").fetchall()
+    finally:
+        conn.close()
+    return [json.loads(row[0]) for row in rows]
+
+def iter_feedback(since=None, until=None, after_id=None, limit=None, batch_size=500):
+    """
+    Yield (id, entry) pairs in insertion order without loading the whole history.
+    since/until bound the ISO 'timestamp' field (inclusive), after_id resumes from a cursor.
+    """
+    init_feedback_store()
+
+    clauses = []
+    params = []
+    if after_id is not None:
+        clauses.append("id > ?")
+        params.append(after_id)
+    if since:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        clauses.append("timestamp <= ?")
+        params.append(until)
+
+    query = "SELECT id, data FROM feedback"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    conn = _connect()
+    try:
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row_id, data in rows:
+                yield row_id, json.loads(data)
+    finally:
+        conn.close()